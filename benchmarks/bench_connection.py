@@ -0,0 +1,84 @@
+"""
+Benchmark de latence par appel de DatabaseManager.
+Compare l'ancien modèle (une connexion ouverte/fermée par appel) à la
+connexion persistante par thread.
+
+Usage : python benchmarks/bench_connection.py [nombre_de_prompts] [nombre_d_appels]
+"""
+
+import os
+import sys
+import sqlite3
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from database import DatabaseManager
+
+
+class PerCallConnectionManager(DatabaseManager):
+    """Reproduit l'ancien comportement : une connexion neuve à chaque appel."""
+    
+    def get_connection(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path)
+
+
+def populate(db_path: str, count: int):
+    """Remplit la base de test avec des prompts synthétiques."""
+    conn = sqlite3.connect(db_path)
+    conn.executemany(
+        "INSERT INTO prompts (title, content, category, tags) VALUES (?, ?, ?, ?)",
+        ((f"Prompt {i}", f"Contenu du prompt numéro {i} " * 20, f"Cat{i % 10}", f"tag{i % 50},bench")
+         for i in range(count))
+    )
+    conn.commit()
+    conn.close()
+
+
+def measure(label: str, func, calls: int) -> float:
+    """Mesure la latence moyenne d'un appel, en microsecondes."""
+    func(0)  # Échauffement
+    start = time.perf_counter()
+    for i in range(calls):
+        func(i)
+    elapsed = (time.perf_counter() - start) / calls * 1e6
+    print(f"   {label:<40} {elapsed:10.1f} µs/appel")
+    return elapsed
+
+
+def run(prompt_count: int = 10000, calls: int = 2000):
+    """Lance le benchmark et affiche le gain par opération."""
+    tmp_dir = tempfile.mkdtemp()
+    db_path = os.path.join(tmp_dir, "bench.db")
+    
+    pooled = DatabaseManager(db_path)
+    populate(db_path, prompt_count)
+    legacy = PerCallConnectionManager(db_path)
+    
+    # (nom, fabrique d'appel, nombre d'appels) : la recherche est plus lente, on l'appelle moins
+    operations = [
+        ("get_prompt_by_id", lambda db: (lambda i: db.get_prompt_by_id(i % prompt_count + 1)), calls),
+        ("search_prompts", lambda db: (lambda i: db.search_prompts("prompt 12")), max(calls // 20, 1)),
+        # flush_usage à chaque appel : mesure l'UPDATE lui-même, pas la mise en tampon
+        ("increment_usage + flush_usage",
+         lambda db: (lambda i: (db.increment_usage(i % prompt_count + 1), db.flush_usage())), calls),
+    ]
+    
+    print(f"=== {prompt_count} prompts ===\n")
+    for name, factory, n in operations:
+        print(f"• {name} ({n} appels)")
+        before = measure("avant (connexion par appel)", factory(legacy), n)
+        after = measure("après (connexion persistante)", factory(pooled), n)
+        print(f"   {'gain':<40} {before / after:10.1f} x\n")
+    
+    pooled.close()
+    for suffix in ("", "-wal", "-shm", ".usage"):
+        if os.path.exists(db_path + suffix):
+            os.unlink(db_path + suffix)
+    os.rmdir(tmp_dir)
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:3]]
+    run(*args)
@@ -0,0 +1,108 @@
+"""
+Benchmark du classement contextuel sur une grande bibliothèque de prompts.
+Compare l'ancien calcul (score de chaque prompt puis tri complet) au moteur
+à index inversés de context_ranking, en Python pur et vectorisé (NumPy).
+
+Usage : python benchmarks/bench_context_ranking.py [nombre_de_prompts] [nombre_de_classements]
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from context_ranking import ContextRanker, NUMPY_AVAILABLE
+
+WORDS = ["python", "api", "email", "marketing", "design", "docker", "notion", "réunion",
+         "rapport", "client", "facture", "tests", "sql", "slides", "linkedin", "résumé"]
+CATEGORIES = ["Développement", "Marketing", "Design", "Productivité", "Communication", "Business"]
+CONTEXTS = [
+    ("Développement", "main.py - PromptMaster - Visual Studio Code"),
+    ("Communication", "Boîte de réception (42) - Gmail"),
+    ("Design", "Maquette accueil – Figma"),
+    (None, "Sans titre - Bloc-notes"),
+]
+
+
+def make_rows(count: int):
+    """Génère des tuples (id, title, category, tags, usage_count) synthétiques."""
+    rng = random.Random(0)
+    return [(i, " ".join(rng.sample(WORDS, 3)) + f" {i}", rng.choice(CATEGORIES),
+             ",".join(rng.sample(WORDS, 2)), rng.randrange(50))
+            for i in range(1, count + 1)]
+
+
+def legacy_top_k(rows, category, window_title, limit):
+    """Ancien algorithme de ContextManager.get_contextual_prompts."""
+    window_title = window_title.lower()
+    scored_prompts = []
+    for prompt in rows:
+        prompt_id, title, prompt_cat, tags, usage_count = prompt
+        score = usage_count * 2
+        if category and prompt_cat == category:
+            score += 50
+        if tags:
+            for word in window_title.split():
+                if len(word) > 3:
+                    if word in title.lower() or word in tags.lower():
+                        score += 10
+        if usage_count > 5:
+            score += 20
+        scored_prompts.append((score, prompt))
+    scored_prompts.sort(key=lambda x: x[0], reverse=True)
+    return scored_prompts[:limit]
+
+
+def measure(label: str, func, calls: int) -> float:
+    """Mesure la durée moyenne d'un appel, en millisecondes."""
+    func(0)  # Échauffement
+    start = time.perf_counter()
+    for i in range(calls):
+        func(i)
+    elapsed = (time.perf_counter() - start) / calls * 1e3
+    print(f"   {label:<40} {elapsed:10.3f} ms/appel")
+    return elapsed
+
+
+def run(prompt_count: int = 100000, calls: int = 20):
+    """Lance le benchmark."""
+    rows = make_rows(prompt_count)
+    print(f"=== {prompt_count} prompts, top 50 ===\n")
+
+    ranker = ContextRanker(use_numpy=False)
+    start = time.perf_counter()
+    ranker.load(rows)
+    print(f"• Construction des index : {(time.perf_counter() - start) * 1e3:.0f} ms\n")
+
+    print("• Classement")
+    before = measure("avant (score + tri de toute la table)",
+                     lambda i: legacy_top_k(rows, *CONTEXTS[i % len(CONTEXTS)], 50), calls)
+    after = measure("après (index inversés + tas)",
+                    lambda i: ranker.top_k(*CONTEXTS[i % len(CONTEXTS)], 50), calls)
+    print(f"   {'gain':<40} {before / after:10.1f} x\n")
+
+    if NUMPY_AVAILABLE:
+        vectorized = ContextRanker(use_numpy=True)
+        vectorized.load(rows)
+        start = time.perf_counter()
+        vectorized.top_k(None, "", 50)
+        print(f"• Instantané NumPy : {(time.perf_counter() - start) * 1e3:.0f} ms")
+        after = measure("après (NumPy + argpartition)",
+                        lambda i: vectorized.top_k(*CONTEXTS[i % len(CONTEXTS)], 50), calls)
+        print(f"   {'gain':<40} {before / after:10.1f} x\n")
+    else:
+        print("• NumPy non installé : calcul vectorisé non mesuré\n")
+
+    print("• Mises à jour incrémentales")
+    rng = random.Random(1)
+    measure("add_usage", lambda i: ranker.add_usage(rng.randrange(1, prompt_count + 1)), 2000)
+    measure("upsert (modification d'un prompt)",
+            lambda i: ranker.upsert(rng.randrange(1, prompt_count + 1), f"Prompt modifié {i}",
+                                    rng.choice(CATEGORIES), "python,tests", rng.randrange(50)), 2000)
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:3]]
+    run(*args)
@@ -0,0 +1,102 @@
+"""
+Benchmark de l'ouverture du dialogue d'édition (gui_dracula).
+Compare la construction d'un nouveau PromptEditorDialog à chaque ouverture
+et la réutilisation du même dialogue (bind), jusqu'au premier dessin.
+
+Usage : python benchmarks/bench_dialog_open.py [nombre_de_prompts] [ouvertures]
+(sans écran, lancer avec QT_QPA_PLATFORM=offscreen)
+"""
+
+import contextlib
+import io
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+
+from PySide6.QtCore import QEvent, QObject
+from PySide6.QtWidgets import QApplication, QWidget
+
+from database import DatabaseManager
+from gui_dracula import PromptEditorDialog
+from theme import apply_theme
+from timing import LatencyRecorder
+
+
+class PaintWatcher(QObject):
+    """Note l'arrivée du premier événement Paint."""
+
+    def __init__(self):
+        super().__init__()
+        self.painted = False
+
+    def eventFilter(self, watched, event):
+        if event.type() == QEvent.Type.Paint:
+            self.painted = True
+        return False
+
+
+def open_until_painted(app: QApplication, dialog: PromptEditorDialog, watcher: PaintWatcher,
+                       timeout: float = 10.0):
+    """Affiche le dialogue (sans exec) et traite les événements jusqu'au premier dessin."""
+    watcher.painted = False
+    dialog.show()
+    deadline = time.perf_counter() + timeout
+    while not watcher.painted and time.perf_counter() < deadline:
+        app.processEvents()
+    dialog.hide()
+
+
+def run(prompt_count: int = 5000, opens: int = 30):
+    """Lance le benchmark."""
+    app = QApplication.instance() or QApplication(sys.argv)
+    tmp_dir = tempfile.mkdtemp()
+    db = DatabaseManager(os.path.join(tmp_dir, "bench.db"))
+    parent = QWidget()
+    watcher = PaintWatcher()
+
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            db.import_prompts({"title": f"Prompt {i}", "content": f"Contenu {i}",
+                               "category": f"Cat{i % 40}", "tags": "bench"}
+                              for i in range(prompt_count))
+
+        start = time.perf_counter()
+        apply_theme(app, 'dracula')
+        print(f"Thème appliqué à l'application en {(time.perf_counter() - start) * 1e3:.1f} ms (une fois)\n")
+
+        rebuilt = LatencyRecorder("Nouveau dialogue à chaque ouverture")
+        for i in range(opens):
+            start = time.perf_counter()
+            dialog = PromptEditorDialog(parent, db, prompt_id=i + 1)
+            dialog.installEventFilter(watcher)
+            open_until_painted(app, dialog, watcher)
+            rebuilt.record(time.perf_counter() - start)
+            dialog.deleteLater()
+        app.processEvents()
+
+        reused = LatencyRecorder("Dialogue réutilisé (bind)")
+        dialog = PromptEditorDialog(parent, db)
+        dialog.installEventFilter(watcher)
+        for i in range(opens):
+            start = time.perf_counter()
+            dialog.bind(prompt_id=i + 1)
+            open_until_painted(app, dialog, watcher)
+            reused.record(time.perf_counter() - start)
+    finally:
+        db.close()
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    print(f"=== Ouverture de l'éditeur ({prompt_count} prompts, {opens} ouvertures) ===\n")
+    for recorder in (rebuilt, reused):
+        print(f"   {recorder.report()}")
+    print(f"\n   Gain (p50) : x{rebuilt.percentile(50) / reused.percentile(50):.1f}")
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:3]]
+    run(*args)
@@ -0,0 +1,83 @@
+"""
+Benchmark de la recherche approximative sur une grande bibliothèque de prompts.
+Simule la saisie, lettre par lettre, de requêtes avec fautes de frappe et
+mesure la latence de chaque frappe (objectif : moins de 20 ms à 100 000 prompts).
+
+Usage : python benchmarks/bench_fuzzy_search.py [nombre_de_prompts]
+"""
+
+import gc
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from fuzzy_search import FuzzyIndex
+from timing import LatencyRecorder
+
+WORDS = ["python", "api", "email", "marketing", "design", "docker", "notion", "réunion",
+         "rapport", "client", "facture", "tests", "sql", "slides", "linkedin", "résumé",
+         "traduction", "javascript", "analyse", "stratégie", "contrat", "article", "debug"]
+SYLLABLES = ["ba", "ko", "ri", "tu", "me", "la", "po", "si", "ne", "dra", "vel", "qui", "stor", "mon"]
+CATEGORIES = ["Développement", "Marketing", "Design", "Productivité", "Communication", "Business"]
+
+# Requêtes avec fautes (inversions, lettre manquante, doublée ou remplacée)
+QUERIES = ["pyhton", "emial markting", "rapprot client", "dcoker", "javscript debug",
+           "tradcution article", "linkdin", "stratgie", "factrue", "résumé réunoin"]
+
+BUDGET_MS = 20
+
+
+def make_rows(count: int):
+    """Génère des tuples (id, title, category, tags, usage_count) synthétiques."""
+    rng = random.Random(0)
+
+    def word():
+        if rng.random() < 0.6:
+            return rng.choice(WORDS)
+        return "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4)))
+
+    return [(i, " ".join(word() for _ in range(rng.randint(2, 5))), rng.choice(CATEGORIES),
+             ",".join(word() for _ in range(2)), rng.randrange(50))
+            for i in range(1, count + 1)]
+
+
+def run(prompt_count: int = 100000):
+    """Lance le benchmark."""
+    rows = make_rows(prompt_count)
+    print(f"=== {prompt_count} prompts ===\n")
+
+    index = FuzzyIndex()
+    start = time.perf_counter()
+    index.load(rows)
+    print(f"• Construction de l'index : {(time.perf_counter() - start) * 1e3:.0f} ms\n")
+    # Collecte complète des objets de l'index, sinon déclenchée au milieu des mesures
+    gc.collect()
+
+    # Chaque frappe allonge le dernier mot : ses correspondances ne sont pas en cache
+    latency = LatencyRecorder("Recherche approximative (par frappe)")
+    for query in QUERIES:
+        for end in range(2, len(query) + 1):
+            with latency.measure():
+                results = index.search(query[:end])
+        print(f"   {query:<22} → {results[0].title if results else '(aucun résultat)'}")
+    print()
+    print(latency.report())
+    p99 = latency.percentile(99) * 1e3
+    print(f"   {'objectif':<40} {'atteint' if p99 < BUDGET_MS else 'DÉPASSÉ'} (p99 < {BUDGET_MS} ms)\n")
+
+    print("• Mises à jour incrémentales")
+    rng = random.Random(1)
+    updates = LatencyRecorder("upsert (modification d'un prompt)")
+    for i in range(1000):
+        with updates.measure():
+            index.upsert(rng.randrange(1, prompt_count + 1), f"Prompt modifié {i}",
+                         rng.choice(CATEGORIES), "python,tests", rng.randrange(50))
+    print(updates.report())
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:2]]
+    run(*args)
@@ -0,0 +1,95 @@
+"""
+Benchmark de débit de l'import/export en masse (lignes par seconde).
+Compare import_prompts à l'ancien modèle (un add_prompt par ligne), puis
+mesure l'export JSONL et CSV.
+
+Usage : python benchmarks/bench_import_export.py [nombre_de_prompts] [taille_des_lots]
+"""
+
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from database import DatabaseManager, IMPORT_CHUNK_SIZE
+
+
+def make_records(count: int):
+    """Génère des prompts synthétiques (générateur : mémoire constante)."""
+    for i in range(count):
+        yield {
+            "title": f"Prompt {i}",
+            "content": f"Contenu du prompt numéro {i} " * 20,
+            "category": f"Cat{i % 10}",
+            "tags": f"tag{i % 50},bench",
+        }
+
+
+def report(label: str, rows: int, elapsed: float) -> float:
+    """Affiche et retourne le débit en lignes par seconde."""
+    rate = rows / elapsed if elapsed else float("inf")
+    print(f"   {label:<40} {rate:12.0f} lignes/s  ({elapsed:.2f} s)")
+    return rate
+
+
+def cleanup(db_path: str):
+    """Supprime la base de test et ses fichiers annexes."""
+    for suffix in ("", "-wal", "-shm", ".usage"):
+        if os.path.exists(db_path + suffix):
+            os.unlink(db_path + suffix)
+
+
+def run(prompt_count: int = 50000, chunk_size: int = IMPORT_CHUNK_SIZE):
+    """Lance le benchmark."""
+    tmp_dir = tempfile.mkdtemp()
+    db_path = os.path.join(tmp_dir, "bench.db")
+
+    print(f"=== {prompt_count} prompts ===\n")
+
+    # Ancien modèle : une transaction par ligne (sur un échantillon, c'est lent)
+    sample = max(prompt_count // 50, 1)
+    with DatabaseManager(db_path) as db, contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        for record in make_records(sample):
+            db.add_prompt(**record)
+        legacy_elapsed = time.perf_counter() - start
+    cleanup(db_path)
+
+    print("• Import")
+    before = report(f"add_prompt par ligne ({sample} lignes)", sample, legacy_elapsed)
+
+    with DatabaseManager(db_path) as db:
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            db.import_prompts(make_records(prompt_count), chunk_size)
+            elapsed = time.perf_counter() - start
+        after = report(f"import_prompts (lots de {chunk_size})", prompt_count, elapsed)
+        print(f"   {'gain':<40} {after / before:12.1f} x\n")
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            _, skipped = db.import_prompts(make_records(prompt_count), chunk_size)
+            elapsed = time.perf_counter() - start
+        report(f"réimport dédoublonné ({skipped} ignorés)", prompt_count, elapsed)
+
+        print("\n• Export")
+        for fmt in ("jsonl", "csv"):
+            export_path = os.path.join(tmp_dir, f"export.{fmt}")
+            with open(export_path, "w", encoding="utf-8", newline="") as stream:
+                start = time.perf_counter()
+                count = db.export_prompts(stream, fmt)
+                elapsed = time.perf_counter() - start
+            report(f"export_prompts ({fmt})", count, elapsed)
+            os.unlink(export_path)
+
+    cleanup(db_path)
+    os.rmdir(tmp_dir)
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:3]]
+    run(*args)
@@ -0,0 +1,103 @@
+"""
+Benchmark de la recherche sémantique sur une grande bibliothèque de prompts.
+Mesure la vectorisation, le calcul des centres IVF, la latence d'une
+recherche (IVF contre comparaison exacte de tout le fichier float16) et le
+rappel des 10 plus proches voisins (objectif : moins de 20 ms à 100 000 prompts).
+
+Usage : python benchmarks/bench_semantic_search.py [nombre_de_prompts]
+"""
+
+import gc
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import numpy as np
+
+from semantic_search import VectorIndex, embed_prompts, embed_texts, prompt_digest
+from timing import LatencyRecorder
+
+WORDS = ["python", "api", "email", "marketing", "design", "docker", "notion", "réunion",
+         "rapport", "client", "facture", "tests", "sql", "slides", "linkedin", "résumé",
+         "traduction", "javascript", "analyse", "stratégie", "contrat", "article", "debug",
+         "rédigez", "créez", "expliquez", "corrigez", "traduisez", "résumez", "optimisez"]
+SYLLABLES = ["ba", "ko", "ri", "tu", "me", "la", "po", "si", "ne", "dra", "vel", "qui", "stor", "mon"]
+CATEGORIES = ["Développement", "Marketing", "Design", "Productivité", "Communication", "Business"]
+
+QUERIES = ["traduire un article en anglais", "corriger un bug javascript", "résumer la réunion client",
+           "analyser les ventes", "écrire un email de relance", "optimiser une requête sql",
+           "stratégie linkedin", "expliquer le contrat", "créer des slides", "tests python"]
+
+BUDGET_MS = 20
+
+
+def make_prompts(count: int):
+    """Génère des tuples (title, content, category, tags) synthétiques."""
+    rng = random.Random(0)
+
+    def word():
+        if rng.random() < 0.6:
+            return rng.choice(WORDS)
+        return "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4)))
+
+    return [(" ".join(word() for _ in range(rng.randint(2, 5))),
+             " ".join(word() for _ in range(rng.randint(10, 60))),
+             rng.choice(CATEGORIES), ",".join(word() for _ in range(2)))
+            for _ in range(count)]
+
+
+def run(prompt_count: int = 100000):
+    """Lance le benchmark."""
+    prompts = make_prompts(prompt_count)
+    print(f"=== {prompt_count} prompts ===\n")
+
+    with tempfile.TemporaryDirectory() as directory:
+        start = time.perf_counter()
+        vectors = np.concatenate([embed_prompts(prompts[i:i + 1000]) for i in range(0, prompt_count, 1000)])
+        elapsed = time.perf_counter() - start
+        print(f"• Vectorisation : {elapsed:.2f} s ({prompt_count / elapsed:,.0f} prompts/s)")
+
+        index = VectorIndex(os.path.join(directory, "bench.vectors"))
+        digests = [prompt_digest(*prompt) for prompt in prompts]
+        start = time.perf_counter()
+        index.upsert_many(list(range(1, prompt_count + 1)), digests, vectors)
+        print(f"• Écriture des vecteurs et calcul des centres : {(time.perf_counter() - start) * 1e3:.0f} ms "
+              f"({len(index.centroids) if index.centroids is not None else 0} listes)")
+        print(f"• Fichier de vecteurs : {os.path.getsize(index.store.path) / 2 ** 20:.1f} Mo (float16)\n")
+        gc.collect()
+
+        approximate = LatencyRecorder("Recherche IVF (vectorisation comprise)")
+        exact = LatencyRecorder("Comparaison exacte (toutes les lignes)")
+        found = 0
+        for _ in range(5):
+            for query in QUERIES:
+                with approximate.measure():
+                    hits = index.search(embed_texts([query])[0], 10)
+                with exact.measure():
+                    scores = index.store.vectors[:prompt_count].astype(np.float32) @ embed_texts([query])[0]
+                    expected = np.argpartition(-scores, 9)[:10] + 1
+                found += len({prompt_id for prompt_id, _ in hits} & set(expected.tolist()))
+        print(approximate.report())
+        print(exact.report())
+        p99 = approximate.percentile(99) * 1e3
+        print(f"   {'objectif':<40} {'atteint' if p99 < BUDGET_MS else 'DÉPASSÉ'} (p99 < {BUDGET_MS} ms)")
+        print(f"   {'rappel des 10 plus proches voisins':<40} {found / (len(QUERIES) * 50):.0%}\n")
+
+        print("• Mises à jour incrémentales")
+        rng = random.Random(1)
+        updates = LatencyRecorder("upsert (modification d'un prompt)")
+        for i in range(1000):
+            prompt = (f"Prompt modifié {i}", "Traduisez ce texte", rng.choice(CATEGORIES), "python")
+            with updates.measure():
+                index.upsert(rng.randrange(1, prompt_count + 1), prompt_digest(*prompt), embed_prompts([prompt])[0])
+        print(updates.report())
+        index.close()
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:2]]
+    run(*args)
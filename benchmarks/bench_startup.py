@@ -0,0 +1,97 @@
+"""
+Benchmark du temps entre Ctrl+Space et le premier affichage de la fenêtre.
+Compare le démarrage à froid (fenêtre construite au premier appui), le
+démarrage à chaud (fenêtre préparée en arrière-plan) et un réaffichage.
+
+Usage : python benchmarks/bench_startup.py [nombre_de_prompts] [répétitions]
+(sans écran, lancer avec QT_QPA_PLATFORM=offscreen)
+"""
+
+import contextlib
+import io
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+
+from PySide6.QtWidgets import QApplication
+
+from database import DatabaseManager
+from main import HotkeyListener
+from timing import LatencyRecorder
+
+
+def populate(count: int):
+    """Crée promptmaster.db dans le dossier courant avec des prompts synthétiques."""
+    with DatabaseManager() as db:
+        db.import_prompts({"title": f"Prompt {i}", "content": f"Contenu du prompt numéro {i} " * 20,
+                           "category": f"Cat{i % 10}", "tags": f"tag{i % 50},bench"}
+                          for i in range(count))
+
+
+def show_until_painted(app: QApplication, listener: HotkeyListener, timeout: float = 10.0) -> float:
+    """
+    Simule Ctrl+Space et traite les événements jusqu'au premier dessin.
+
+    Returns:
+        Durée entre l'appui et le premier dessin, en secondes
+    """
+    measured = len(listener.show_latency)
+    start = time.perf_counter()
+    listener._toggle_window_slot()
+    deadline = start + timeout
+    while len(listener.show_latency) == measured and time.perf_counter() < deadline:
+        app.processEvents()
+    return time.perf_counter() - start
+
+
+def close_window(listener: HotkeyListener):
+    """Ferme la fenêtre d'un essai et ses connexions."""
+    window = listener.window
+    window.search_executor.shutdown()
+    window.hide()
+    window.db.close()
+    window.deleteLater()
+    listener.window = None
+
+
+def run(prompt_count: int = 5000, repeats: int = 5):
+    """Lance le benchmark."""
+    app = QApplication.instance() or QApplication(sys.argv)
+    tmp_dir = tempfile.mkdtemp()
+    previous_dir = os.getcwd()
+    os.chdir(tmp_dir)
+
+    results = {name: LatencyRecorder(name) for name in ("à froid", "à chaud", "réaffichage")}
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            populate(prompt_count)
+            for _ in range(repeats):
+                cold = HotkeyListener(app, warm_start=False)
+                results["à froid"].record(show_until_painted(app, cold))
+                close_window(cold)
+
+                warm = HotkeyListener(app, warm_start=True)
+                warm.prewarm_window()
+                app.processEvents()  # Temps d'inactivité après le lancement
+                results["à chaud"].record(show_until_painted(app, warm))
+                warm._toggle_window_slot()  # Masquer
+                results["réaffichage"].record(show_until_painted(app, warm))
+                close_window(warm)
+                app.processEvents()
+    finally:
+        os.chdir(previous_dir)
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    print(f"=== Raccourci → premier affichage ({prompt_count} prompts, {repeats} essais) ===\n")
+    for recorder in results.values():
+        print(f"   {recorder.report()}")
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:3]]
+    run(*args)
@@ -0,0 +1,51 @@
+"""
+Benchmark du remplissage des prompts à variables ([PRODUIT], [SUJET]...).
+Compare un remplacement par expression régulière à chaque rendu et le
+modèle compilé une fois (CompiledTemplate.render_many).
+
+Usage : python benchmarks/bench_templates.py [nombre_de_variantes]
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from prompt_templates import PLACEHOLDER_PATTERN, CompiledTemplate
+
+
+TEXT = ("Rédigez un email marketing convaincant pour promouvoir [PRODUIT] auprès de [CIBLE]. "
+        "Le ton doit être professionnel mais chaleureux. " * 10 +
+        "Rappelez [PRODUIT] en conclusion, avec un call-to-action vers [LIEN].")
+
+
+def render_with_regex(text: str, values: dict) -> str:
+    """Ancien modèle : nouvelle analyse du texte à chaque rendu."""
+    return PLACEHOLDER_PATTERN.sub(lambda match: values.get(match.group(1), match.group(0)), text)
+
+
+def run(count: int = 100000):
+    """Lance le benchmark."""
+    fills = [{"PRODUIT": f"Produit {i}", "CIBLE": "les développeurs", "LIEN": f"https://exemple.fr/{i}"}
+             for i in range(count)]
+
+    print(f"=== Remplissage de {count} variantes ===\n")
+
+    start = time.perf_counter()
+    expected = [render_with_regex(TEXT, values) for values in fills]
+    regex_time = time.perf_counter() - start
+    print(f"   Expression régulière à chaque rendu : {regex_time * 1e3:8.1f} ms")
+
+    start = time.perf_counter()
+    template = CompiledTemplate(TEXT)
+    variants = template.render_many(fills)
+    compiled_time = time.perf_counter() - start
+    print(f"   Modèle compilé (render_many)        : {compiled_time * 1e3:8.1f} ms")
+
+    assert variants == expected
+    print(f"\n   Gain : x{regex_time / compiled_time:.1f}")
+
+
+if __name__ == "__main__":
+    run(*[int(arg) for arg in sys.argv[1:2]])
@@ -0,0 +1,167 @@
+"""
+Capture du texte sélectionné pour PromptMaster.
+Simule Ctrl+C puis attend que le presse-papiers change, en l'interrogeant à
+intervalles croissants : la capture se termine dès que la copie arrive, au
+lieu d'attendre des délais fixes.
+"""
+
+import threading
+import time
+from importlib.util import find_spec
+from typing import Callable, Optional
+
+from timing import LatencyRecorder
+
+# pyperclip et win32clipboard ne sont importés qu'au premier accès au presse-papiers
+PYPERCLIP_AVAILABLE = find_spec("pyperclip") is not None
+SEQUENCE_NUMBER_SUPPORT = find_spec("win32clipboard") is not None
+
+
+# Délai maximal d'attente de la copie, en secondes : un peu plus que les
+# 0,2 s qu'attendait l'ancienne capture après Ctrl+C, mais moins que ses
+# 0,35 s de délais fixes (sans sélection, la capture n'est pas plus lente)
+CAPTURE_TIMEOUT = 0.25
+
+# Premier intervalle d'interrogation du presse-papiers, doublé à chaque essai
+POLL_INITIAL_DELAY = 0.002
+
+# Intervalle d'interrogation maximal
+POLL_MAX_DELAY = 0.04
+
+
+def wait_for(condition: Callable[[], bool], timeout: float = CAPTURE_TIMEOUT,
+             initial_delay: float = POLL_INITIAL_DELAY, max_delay: float = POLL_MAX_DELAY) -> bool:
+    """
+    Attend qu'une condition devienne vraie, avec un recul exponentiel.
+
+    Args:
+        condition: Fonction testée à chaque essai
+        timeout: Durée maximale d'attente, en secondes
+        initial_delay: Premier intervalle entre deux essais
+        max_delay: Intervalle maximal entre deux essais
+
+    Returns:
+        True si la condition est devenue vraie avant l'expiration du délai
+    """
+    deadline = time.monotonic() + timeout
+    delay = initial_delay
+    while True:
+        if condition():
+            return True
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return False
+        time.sleep(min(delay, remaining))
+        delay = min(delay * 2, max_delay)
+
+
+class SystemClipboard:
+    """Presse-papiers du système (pyperclip, numéro de séquence Windows si disponible)."""
+
+    def paste(self) -> str:
+        import pyperclip
+        return pyperclip.paste()
+
+    def copy(self, text: str):
+        import pyperclip
+        pyperclip.copy(text)
+
+    def sequence_number(self) -> Optional[int]:
+        """Compteur incrémenté par Windows à chaque modification, ou None."""
+        if not SEQUENCE_NUMBER_SUPPORT:
+            return None
+        import win32clipboard
+        return win32clipboard.GetClipboardSequenceNumber()
+
+
+class SelectionCapture:
+    """
+    Copie la sélection de l'application active sans délais fixes.
+
+    Le changement du presse-papiers est détecté par son numéro de séquence
+    (Windows) ou, à défaut, en le vidant avant la copie puis en attendant un
+    contenu. Le contenu d'origine est restauré dans un thread d'arrière-plan.
+    """
+
+    def __init__(self, send_copy: Callable[[], None], clipboard=None,
+                 timeout: float = CAPTURE_TIMEOUT, recorder: Optional[LatencyRecorder] = None):
+        """
+        Initialise la capture.
+
+        Args:
+            send_copy: Fonction qui simule Ctrl+C dans l'application active
+            clipboard: Accès au presse-papiers (SystemClipboard par défaut)
+            timeout: Délai maximal d'attente de la copie, en secondes
+            recorder: Enregistreur des durées de capture (créé si absent)
+        """
+        self.send_copy = send_copy
+        self.clipboard = clipboard if clipboard is not None else SystemClipboard()
+        self.timeout = timeout
+        self.latency = recorder if recorder is not None else LatencyRecorder("Capture de la sélection")
+        self._restore_thread: Optional[threading.Thread] = None
+
+    def capture(self) -> Optional[str]:
+        """
+        Capture le texte sélectionné.
+
+        Returns:
+            Le texte sélectionné, ou None si rien n'a été copié
+        """
+        start = time.perf_counter()
+        try:
+            return self._capture()
+        finally:
+            self.latency.record(time.perf_counter() - start)
+
+    def wait_restored(self, timeout: Optional[float] = None):
+        """Attend la fin de la restauration du presse-papiers en cours."""
+        if self._restore_thread is not None:
+            self._restore_thread.join(timeout)
+
+    def _capture(self) -> Optional[str]:
+        """Capture sans mesure de durée (voir capture)."""
+        clipboard = self.clipboard
+        self.wait_restored()  # Ne pas sauvegarder un presse-papiers en cours de restauration
+
+        # Sauvegarder le presse-papiers actuel
+        try:
+            old_clipboard = clipboard.paste() or ""
+        except Exception:
+            old_clipboard = ""
+
+        sequence = clipboard.sequence_number()
+        if sequence is None:
+            # Sans numéro de séquence, un presse-papiers vidé permet de voir la copie
+            clipboard.copy("")
+
+        def copied() -> bool:
+            # L'application peut encore tenir le presse-papiers ouvert : réessayer
+            try:
+                if sequence is not None and clipboard.sequence_number() == sequence:
+                    return False
+                return bool(clipboard.paste())
+            except Exception:
+                return False
+
+        self.send_copy()
+        changed = wait_for(copied, self.timeout)
+        selected_text = clipboard.paste() if changed else ""
+
+        if old_clipboard and (changed or sequence is None):
+            self._restore_async(old_clipboard)
+
+        # Retourner le texte seulement s'il n'est pas vide et différent de l'ancien
+        if selected_text and selected_text.strip() and selected_text != old_clipboard:
+            return selected_text.strip()
+        return None
+
+    def _restore_async(self, text: str):
+        """Remet l'ancien contenu du presse-papiers sans bloquer l'appelant."""
+        def restore():
+            try:
+                self.clipboard.copy(text)
+            except Exception as e:
+                print(f"Erreur lors de la restauration du presse-papiers : {e}")
+
+        self._restore_thread = threading.Thread(target=restore, name="clipboard-restore", daemon=True)
+        self._restore_thread.start()
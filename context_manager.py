@@ -3,39 +3,45 @@ Gestionnaire de contexte pour PromptMaster.
 Détecte l'application active, capture le texte sélectionné, et fournit des recommandations contextuelles.
 """
 
-import pyperclip
-import time
+from importlib.util import find_spec
 from typing import Optional, Dict, List
-from datetime import datetime
 
-try:
-    import win32gui
-    import win32process
-    import psutil
-    WINDOWS_SUPPORT = True
-except ImportError:
-    WINDOWS_SUPPORT = False
-    print("⚠️ win32gui non disponible. Installez pywin32 pour le support complet du contexte.")
+from clipboard_capture import SelectionCapture, PYPERCLIP_AVAILABLE
+from context_ranking import ContextRanker
+from keyword_extraction import KeywordExtractor
+from database import PromptSummary
+from index_state import IndexState
+from window_context import ActiveWindowContext, Win32WindowBackend, UNKNOWN_CONTEXT, WINDOWS_SUPPORT
 
-try:
-    from pynput.keyboard import Key, Controller as KeyboardController
-    PYNPUT_AVAILABLE = True
-except ImportError:
-    PYNPUT_AVAILABLE = False
+# pynput n'est importé qu'à la première capture (voir _send_copy_shortcut)
+PYNPUT_AVAILABLE = find_spec("pynput") is not None
 
 
 class ContextManager:
     """Gère le contexte de l'utilisateur pour des recommandations intelligentes."""
     
-    def __init__(self, db_manager=None):
+    def __init__(self, db_manager=None, window_backend=None):
         """
         Initialise le gestionnaire de contexte.
         
         Args:
             db_manager: Instance de DatabaseManager pour les recommandations
+            window_backend: Accès à la fenêtre active (par défaut pywin32 si
+                disponible ; StubWindowBackend pour les tests)
         """
         self.db = db_manager
-        self.keyboard = KeyboardController() if PYNPUT_AVAILABLE else None
+        # Capture de la sélection (Ctrl+C simulé, attente adaptative du presse-papiers)
+        self.selection_capture = (SelectionCapture(self._send_copy_shortcut)
+                                  if PYNPUT_AVAILABLE and PYPERCLIP_AVAILABLE else None)
+        
+        # Index de classement, chargé au premier besoin puis tenu à jour
+        self.ranker = ContextRanker()
+        self._ranker_state = IndexState(self._refresh_ranker)
+        # Fréquences des mots de la bibliothèque, pour les suggestions de tags
+        self.keyword_extractor = KeywordExtractor()
+        self._keywords_state = IndexState(self._refresh_keywords)
+        if self.db:
+            self.db.add_change_listener(self._on_prompt_changed)
         
         # Mapping d'applications vers catégories
         self.app_categories = {
@@ -81,180 +87,163 @@ class ContextManager:
             'docs.google': ['Rédaction', 'document'],
             'youtube': ['Vidéo', 'contenu'],
         }
+        
+        # Contexte de la fenêtre active, résolu une fois puis réutilisé
+        if window_backend is None and WINDOWS_SUPPORT:
+            window_backend = Win32WindowBackend()
+        self.window_context = (ActiveWindowContext(window_backend, self.categorize_window)
+                               if window_backend is not None else None)
     
     def get_active_window_info(self) -> Dict[str, str]:
         """
         Récupère les informations sur la fenêtre active.
         
+        Le résultat est mis en cache (voir ActiveWindowContext) : les appels
+        rapprochés ne refont pas les appels système.
+        
         Returns:
             Dict avec app_name, window_title, process_name, category
         """
-        if not WINDOWS_SUPPORT:
-            return {
-                'app_name': 'Unknown',
-                'window_title': '',
-                'process_name': 'unknown',
-                'category': None
-            }
+        if self.window_context is None:
+            return dict(UNKNOWN_CONTEXT)
+        return self.window_context.get()
+    
+    def invalidate_context(self):
+        """Force la relecture de la fenêtre active au prochain appel."""
+        if self.window_context is not None:
+            self.window_context.invalidate()
+    
+    def categorize_window(self, process_name: str, window_title: str) -> Optional[str]:
+        """
+        Déduit la catégorie d'une fenêtre de son processus et de son titre.
         
-        try:
-            # Obtenir le handle de la fenêtre active
-            hwnd = win32gui.GetForegroundWindow()
-            
-            # Obtenir le titre de la fenêtre
-            window_title = win32gui.GetWindowText(hwnd)
-            
-            # Obtenir le PID du processus
-            _, pid = win32process.GetWindowThreadProcessId(hwnd)
-            
-            # Obtenir le nom du processus
-            try:
-                process = psutil.Process(pid)
-                process_name = process.name()
-                app_name = process.name().replace('.exe', '').title()
-            except (psutil.NoSuchProcess, psutil.AccessDenied):
-                process_name = 'unknown'
-                app_name = 'Unknown'
-            
-            # Déterminer la catégorie
-            category = self.app_categories.get(process_name.lower())
-            
-            # Analyse du titre pour les navigateurs
-            if category == 'Navigation':
-                for keyword, tags in self.web_keywords.items():
-                    if keyword in window_title.lower():
-                        category = tags[0]
-                        break
-            
-            return {
-                'app_name': app_name,
-                'window_title': window_title,
-                'process_name': process_name,
-                'category': category,
-                'timestamp': datetime.now()
-            }
+        Args:
+            process_name: Nom de l'exécutable (ex : code.exe)
+            window_title: Titre de la fenêtre
             
-        except Exception as e:
-            print(f"Erreur lors de la récupération du contexte : {e}")
-            return {
-                'app_name': 'Unknown',
-                'window_title': '',
-                'process_name': 'unknown',
-                'category': None
-            }
+        Returns:
+            Nom de la catégorie ou None
+        """
+        category = self.app_categories.get(process_name.lower())
+        
+        # Analyse du titre pour les navigateurs
+        if category == 'Navigation':
+            window_title = window_title.lower()
+            for keyword, tags in self.web_keywords.items():
+                if keyword in window_title:
+                    category = tags[0]
+                    break
+        
+        return category
     
     def capture_selected_text(self) -> Optional[str]:
         """
         Capture le texte actuellement sélectionné dans n'importe quelle application.
-        Utilise Ctrl+C pour copier temporairement la sélection.
+        Utilise Ctrl+C pour copier temporairement la sélection, puis restaure
+        l'ancien presse-papiers en arrière-plan.
+        
+        La durée de chaque capture est enregistrée dans
+        self.selection_capture.latency (p50/p99 via summary() ou report()).
         
         Returns:
             Le texte sélectionné ou None si aucun texte n'est sélectionné
         """
-        if not self.keyboard:
+        if not self.selection_capture:
             return None
         
         try:
-            # Sauvegarder le presse-papiers actuel
-            old_clipboard = ""
-            try:
-                old_clipboard = pyperclip.paste()
-            except:
-                pass
-            
-            # Vider le presse-papiers
-            pyperclip.copy("")
-            
-            # Petit délai pour s'assurer que le presse-papiers est vide
-            time.sleep(0.1)
-            
-            # Créer un nouveau controller keyboard temporaire pour éviter les conflits
-            temp_keyboard = KeyboardController()
-            
-            # Simuler Ctrl+C pour copier la sélection
-            temp_keyboard.press(Key.ctrl)
-            time.sleep(0.05)
-            temp_keyboard.press('c')
-            temp_keyboard.release('c')
-            temp_keyboard.release(Key.ctrl)
-            
-            # Attendre que le texte soit copié
-            time.sleep(0.2)
-            
-            # Récupérer le texte copié
-            selected_text = pyperclip.paste()
-            
-            # Restaurer l'ancien presse-papiers
-            if old_clipboard:
-                time.sleep(0.05)
-                pyperclip.copy(old_clipboard)
-            
-            # Retourner le texte seulement s'il n'est pas vide et différent de l'ancien
-            if selected_text and selected_text.strip() and selected_text != old_clipboard:
-                return selected_text.strip()
-            
-            return None
-            
+            return self.selection_capture.capture()
         except Exception as e:
             print(f"Erreur lors de la capture du texte : {e}")
             return None
     
-    def get_contextual_prompts(self, limit: int = 10) -> List[tuple]:
+    def _send_copy_shortcut(self):
+        """Simule Ctrl+C dans l'application active."""
+        from pynput.keyboard import Key, Controller as KeyboardController
+        
+        temp_keyboard = KeyboardController()
+        temp_keyboard.press(Key.ctrl)
+        temp_keyboard.press('c')
+        temp_keyboard.release('c')
+        temp_keyboard.release(Key.ctrl)
+    
+    def get_contextual_prompts(self, limit: int = 10,
+                               context: Optional[Dict] = None) -> List[PromptSummary]:
         """
         Récupère les prompts les plus pertinents selon le contexte actuel.
         
         Args:
             limit: Nombre maximum de prompts à retourner
+            context: Contexte déjà résolu (get_active_window_info), sinon relu
             
         Returns:
-            Liste de tuples (id, title, content, category, tags, usage_count)
+            Liste de PromptSummary (id, title, category, usage_count, snippet)
         """
         if not self.db:
             return []
         
-        context = self.get_active_window_info()
-        category = context.get('category')
-        window_title = context.get('window_title', '').lower()
-        
-        all_prompts = self.db.get_all_prompts()
+        if context is None:
+            context = self.get_active_window_info()
         
-        # Scoring des prompts
-        scored_prompts = []
-        for prompt in all_prompts:
-            prompt_id, title, content, prompt_cat, tags, usage_count = prompt
-            score = usage_count * 2  # Score de base avec usage_count
-            
-            # Bonus si la catégorie correspond
-            if category and prompt_cat == category:
-                score += 50
-            
-            # Bonus si des mots du titre de la fenêtre sont dans le titre ou tags
-            if tags:
-                for word in window_title.split():
-                    if len(word) > 3:  # Mots significatifs seulement
-                        if word in title.lower() or word in tags.lower():
-                            score += 10
-            
-            # Bonus si utilisé récemment (usage_count élevé)
-            if usage_count > 5:
-                score += 20
-            
-            scored_prompts.append((score, prompt))
+        # Le contenu n'intervient pas dans le score : ne pas le charger
+        self._ranker_state.ensure_loaded(lambda: self.ranker.load(self.db.get_prompt_metadata()))
         
-        # Trier par score décroissant
-        scored_prompts.sort(key=lambda x: x[0], reverse=True)
+        return self.ranker.top_k(context.get('category'), context.get('window_title', ''), limit)
+    
+    def _on_prompt_changed(self, event: str, prompt_id: Optional[int]):
+        """Répercute une modification de la base sur les index en mémoire."""
+        update_ranker = self._ranker_state.accept(event, prompt_id)
+        update_keywords = self._keywords_state.accept(event, prompt_id)
+        if not (update_ranker or update_keywords):
+            return  # Index à charger, en chargement, ou import en masse (rechargement au prochain besoin)
         
-        # Retourner les meilleurs prompts
-        return [prompt for score, prompt in scored_prompts[:limit]]
+        if event == "usage":
+            if update_ranker:
+                self.ranker.add_usage(prompt_id)
+        elif event == "deleted":
+            if update_ranker:
+                self.ranker.remove(prompt_id)
+            if update_keywords:
+                self.keyword_extractor.remove(prompt_id)
+        elif event in ("added", "updated"):
+            prompt = self.db.get_prompt_by_id(prompt_id)
+            if prompt:
+                _, title, content, category, tags, usage_count = prompt
+                if update_ranker:
+                    self.ranker.upsert(prompt_id, title, category, tags, usage_count)
+                if update_keywords:
+                    self.keyword_extractor.upsert(prompt_id, keyword_document(title, content, tags))
+    
+    def _refresh_ranker(self, prompt_id: int):
+        """Remet un prompt du classement en accord avec la base (voir IndexState)."""
+        prompt = self.db.get_prompt_by_id(prompt_id)
+        if prompt is None:
+            self.ranker.remove(prompt_id)
+        else:
+            _, title, _, category, tags, usage_count = prompt
+            self.ranker.upsert(prompt_id, title, category, tags, usage_count)
     
-    def get_context_summary(self) -> str:
+    def _refresh_keywords(self, prompt_id: int):
+        """Remet un prompt des fréquences de mots en accord avec la base (voir IndexState)."""
+        prompt = self.db.get_prompt_by_id(prompt_id)
+        if prompt is None:
+            self.keyword_extractor.remove(prompt_id)
+        else:
+            _, title, content, _, tags, _ = prompt
+            self.keyword_extractor.upsert(prompt_id, keyword_document(title, content, tags))
+    
+    def get_context_summary(self, context: Optional[Dict] = None) -> str:
         """
         Génère un résumé textuel du contexte actuel.
         
+        Args:
+            context: Contexte déjà résolu (get_active_window_info), sinon relu
+            
         Returns:
             String décrivant le contexte
         """
-        context = self.get_active_window_info()
+        if context is None:
+            context = self.get_active_window_info()
         app_name = context.get('app_name', 'Unknown')
         category = context.get('category', 'Général')
         window_title = context.get('window_title', '')
@@ -271,6 +260,9 @@ class ContextManager:
         """
         Extrait des mots-clés d'un texte pour suggérer des tags.
         
+        Les mots sont classés par TF-IDF par rapport à la bibliothèque (voir
+        KeywordExtractor), chargée au premier appel puis tenue à jour.
+        
         Args:
             text: Le texte à analyser
             max_keywords: Nombre maximum de mots-clés
@@ -278,48 +270,34 @@ class ContextManager:
         Returns:
             Liste de mots-clés
         """
-        # Mots communs à ignorer
-        stopwords = {
-            'le', 'la', 'les', 'un', 'une', 'des', 'de', 'du', 'et', 'ou', 'mais',
-            'est', 'sont', 'a', 'ont', 'pour', 'dans', 'sur', 'avec', 'sans',
-            'the', 'a', 'an', 'and', 'or', 'but', 'is', 'are', 'was', 'were',
-            'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by'
-        }
-        
-        # Nettoyer et découper le texte
-        words = text.lower().replace('\n', ' ').split()
+        if self.db:
+            self._keywords_state.ensure_loaded(lambda: self.keyword_extractor.load(
+                (row['id'], keyword_document(row['title'], row['content'], row['tags']))
+                for row in self.db.iter_prompts(fields=("id", "title", "content", "tags"))))
         
-        # Compter les occurrences
-        word_count = {}
-        for word in words:
-            # Nettoyer le mot
-            word = ''.join(c for c in word if c.isalnum())
-            # Ignorer les mots courts et les stopwords
-            if len(word) > 3 and word not in stopwords:
-                word_count[word] = word_count.get(word, 0) + 1
-        
-        # Trier par fréquence
-        sorted_words = sorted(word_count.items(), key=lambda x: x[1], reverse=True)
-        
-        # Retourner les mots les plus fréquents
-        return [word for word, count in sorted_words[:max_keywords]]
+        return self.keyword_extractor.keywords(text, max_keywords)
     
-    def suggest_category_from_context(self) -> Optional[str]:
+    def suggest_category_from_context(self, context: Optional[Dict] = None) -> Optional[str]:
         """
         Suggère une catégorie basée sur le contexte actuel.
         
+        Args:
+            context: Contexte déjà résolu (get_active_window_info), sinon relu
+            
         Returns:
             Nom de la catégorie suggérée ou None
         """
-        context = self.get_active_window_info()
+        if context is None:
+            context = self.get_active_window_info()
         return context.get('category')
     
-    def suggest_tags_from_text(self, text: str) -> str:
+    def suggest_tags_from_text(self, text: str, context: Optional[Dict] = None) -> str:
         """
         Suggère des tags basés sur le texte et le contexte.
         
         Args:
             text: Le texte du prompt
+            context: Contexte déjà résolu (get_active_window_info), sinon relu
             
         Returns:
             String de tags séparés par des virgules
@@ -327,7 +305,8 @@ class ContextManager:
         keywords = self.extract_keywords_from_text(text, max_keywords=5)
         
         # Ajouter le contexte de l'application
-        context = self.get_active_window_info()
+        if context is None:
+            context = self.get_active_window_info()
         app_name = context.get('app_name', '').lower()
         
         if app_name and app_name not in keywords:
@@ -336,6 +315,11 @@ class ContextManager:
         return ','.join(keywords[:5])
 
 
+def keyword_document(title: str, content: str, tags: Optional[str]) -> str:
+    """Texte d'un prompt pris en compte dans les fréquences de mots."""
+    return f"{title}\n{content}\n{tags or ''}"
+
+
 # Fonction utilitaire pour installer pywin32 si nécessaire
 def check_dependencies():
     """Vérifie et suggère l'installation des dépendances manquantes."""
@@ -378,6 +362,8 @@ if __name__ == "__main__":
         input()
         
         selected = cm.capture_selected_text()
+        if cm.selection_capture:
+            print(f"   {cm.selection_capture.latency.report()}")
         if selected:
             print(f"   ✓ Texte capturé : {selected[:100]}...")
             
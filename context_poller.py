@@ -0,0 +1,177 @@
+"""
+Préchargement des recommandations contextuelles pour PromptMaster.
+Un thread d'arrière-plan suit la fenêtre au premier plan et recalcule les
+prompts contextuels à chaque changement : à l'appui sur Ctrl+Space, la liste
+est déjà prête.
+
+Le suivi se fait par une lecture périodique et peu coûteuse du handle et du
+titre de la fenêtre active ; le calcul complet n'a lieu que s'ils changent.
+"""
+
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from database import PromptSummary
+from window_context import ActiveWindowContext
+
+
+# Intervalle (secondes) entre deux lectures de la fenêtre active
+POLL_INTERVAL = 0.25
+
+# Part maximale d'un cœur CPU utilisée par le thread (0.02 = 2 %)
+CPU_BUDGET = 0.02
+
+
+class ContextPoller:
+    """
+    Suit la fenêtre active et précalcule les recommandations associées.
+
+    Le thread respecte un budget CPU : après un calcul qui a coûté c secondes
+    de CPU, il attend au moins c / cpu_budget - c secondes avant la lecture
+    suivante. pause() le met en sommeil (par exemple pendant que la fenêtre
+    PromptMaster est affichée, pour ne pas la prendre pour le contexte).
+    """
+
+    def __init__(self, window_context: ActiveWindowContext,
+                 recommend: Callable[[Dict], List[PromptSummary]],
+                 interval: float = POLL_INTERVAL, cpu_budget: float = CPU_BUDGET,
+                 ignore: Optional[Callable[[int, str], bool]] = None):
+        """
+        Initialise le préchargement (sans le démarrer, voir start).
+
+        Args:
+            window_context: Cache de contexte dont le backend est interrogé
+            recommend: Fonction contexte -> prompts recommandés
+                (ex : lambda context: cm.get_contextual_prompts(50, context))
+            interval: Intervalle minimal entre deux lectures, en secondes
+            cpu_budget: Part maximale d'un cœur CPU (entre 0 et 1)
+            ignore: Fonction (hwnd, titre) -> True pour ignorer une fenêtre
+                (la fenêtre PromptMaster elle-même, par exemple)
+        """
+        self.window_context = window_context
+        self.recommend = recommend
+        self.interval = interval
+        self.cpu_budget = cpu_budget
+        self.ignore = ignore
+
+        self._lock = threading.Lock()
+        # (hwnd, titre) -> (contexte, prompts) de la dernière fenêtre suivie
+        self._window: Optional[Tuple[int, str]] = None
+        self._result: Optional[Tuple[Dict, List[PromptSummary]]] = None
+        self._dirty = False
+
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._running = threading.Event()  # Effacé pendant une pause
+        self._running.set()
+
+        # Statistiques
+        self.polls = 0
+        self.refreshes = 0
+        self.cpu_time = 0.0
+
+    def start(self):
+        """Démarre le thread de suivi (sans effet s'il tourne déjà)."""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="context-poller", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Arrête le thread et attend sa fin."""
+        self._stop.set()
+        self._running.set()  # Réveiller un thread en pause
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def pause(self):
+        """Suspend le suivi jusqu'à resume()."""
+        self._running.clear()
+
+    def resume(self):
+        """Reprend le suivi après pause()."""
+        self._running.set()
+
+    def mark_dirty(self):
+        """Demande un nouveau calcul (les prompts ont changé)."""
+        with self._lock:
+            self._dirty = True
+
+    def latest(self) -> Optional[Tuple[Dict, List[PromptSummary]]]:
+        """
+        Retourne le contexte et les prompts précalculés, s'ils sont à jour.
+
+        Returns:
+            (contexte, prompts) si la fenêtre active est celle du dernier calcul
+            et que les prompts n'ont pas changé depuis ; None sinon
+        """
+        try:
+            window = self.window_context.backend.foreground_window()
+        except Exception:
+            return None
+        with self._lock:
+            if self._dirty or self._result is None or window != self._window:
+                return None
+            context, prompts = self._result
+            return dict(context), list(prompts)
+
+    def poll_once(self) -> bool:
+        """
+        Lit la fenêtre active et recalcule les recommandations si elle a changé.
+
+        Returns:
+            True si un calcul a eu lieu
+        """
+        self.polls += 1
+        try:
+            window = self.window_context.backend.foreground_window()
+        except Exception as e:
+            print(f"Erreur lors du suivi de la fenêtre active : {e}")
+            return False
+
+        with self._lock:
+            if (window == self._window and not self._dirty) or (self.ignore and self.ignore(*window)):
+                return False
+            self._dirty = False
+
+        self.window_context.invalidate()
+        context = self.window_context.get()
+        try:
+            prompts = self.recommend(context)
+        except Exception as e:
+            print(f"Erreur lors du préchargement des recommandations : {e}")
+            return False
+
+        with self._lock:
+            self._window = window
+            self._result = (context, prompts)
+        self.refreshes += 1
+        return True
+
+    def next_delay(self, cost: float) -> float:
+        """
+        Attente avant la prochaine lecture, pour respecter le budget CPU.
+
+        Args:
+            cost: Temps CPU consommé par la dernière lecture, en secondes
+        """
+        if self.cpu_budget <= 0:
+            return self.interval
+        return max(self.interval, cost / self.cpu_budget - cost)
+
+    def _run(self):
+        """Boucle du thread : lecture, calcul éventuel, attente selon le budget CPU."""
+        while not self._stop.is_set():
+            self._running.wait()
+            if self._stop.is_set():
+                break
+
+            started = time.thread_time()
+            self.poll_once()
+            cost = time.thread_time() - started
+            self.cpu_time += cost
+
+            self._stop.wait(self.next_delay(cost))
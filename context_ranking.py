@@ -0,0 +1,378 @@
+"""
+Moteur de classement contextuel pour PromptMaster.
+Garde en mémoire des index inversés (par catégorie et par mot du titre et
+des tags) pour calculer les meilleurs prompts d'un contexte sans parcourir
+ni trier toute la table à chaque affichage de la fenêtre.
+
+Si NumPy est installé, les grandes bibliothèques sont notées par opérations
+vectorisées sur un instantané en tableaux ; sinon (ou pour les petites
+bibliothèques) le calcul reste en Python pur. Les deux donnent le même classement.
+"""
+
+import heapq
+import threading
+from importlib.util import find_spec
+from bisect import bisect_left, insort
+from collections import Counter, namedtuple
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from database import PromptSummary
+from search_session import tokenize
+
+# NumPy n'est importé qu'au premier calcul vectorisé : son import coûte
+# autant que celui du reste de l'application
+NUMPY_AVAILABLE = find_spec("numpy") is not None
+
+
+# Poids du score contextuel
+USAGE_WEIGHT = 2             # Points par utilisation
+FREQUENT_USAGE_THRESHOLD = 5  # Au-delà, le prompt est considéré comme habituel
+FREQUENT_USAGE_BONUS = 20
+CATEGORY_BONUS = 50          # Catégorie du prompt = catégorie de l'application active
+KEYWORD_BONUS = 10           # Par mot du titre de la fenêtre retrouvé dans le titre ou les tags
+MIN_KEYWORD_LENGTH = 4       # Les mots plus courts du titre de la fenêtre sont ignorés
+
+# En dessous, le calcul en Python pur est plus rapide que la version NumPy
+VECTORIZE_MIN_PROMPTS = 2000
+
+# Prompts modifiés depuis l'instantané NumPy (notés en Python) avant reconstruction
+STALE_REBUILD_MIN = 256
+
+# Prompt indexé : mots normalisés du titre et des tags
+RankedPrompt = namedtuple("RankedPrompt", ["title", "category", "tokens", "usage_count"])
+
+
+def usage_score(usage_count: int) -> int:
+    """Part du score qui ne dépend que du nombre d'utilisations."""
+    score = usage_count * USAGE_WEIGHT
+    if usage_count > FREQUENT_USAGE_THRESHOLD:
+        score += FREQUENT_USAGE_BONUS
+    return score
+
+
+def window_keywords(window_title: str) -> Counter:
+    """Mots significatifs du titre de la fenêtre, avec leur nombre d'occurrences."""
+    return Counter(word for word in tokenize(window_title or "") if len(word) >= MIN_KEYWORD_LENGTH)
+
+
+def prefix_upper_bound(prefix: str) -> str:
+    """Plus petite chaîne supérieure à tous les mots qui commencent par prefix."""
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+def score_prompt(prompt: "RankedPrompt", category: Optional[str], keywords: Counter) -> int:
+    """Score contextuel complet d'un prompt (voir ContextRanker)."""
+    score = usage_score(prompt.usage_count)
+    if category and prompt.category == category:
+        score += CATEGORY_BONUS
+    for word, occurrences in keywords.items():
+        if any(token.startswith(word) for token in prompt.tokens):
+            score += KEYWORD_BONUS * occurrences
+    return score
+
+
+class _VectorSnapshot:
+    """
+    Copie en tableaux NumPy des prompts indexés.
+
+    Les mots sont stockés comme une matrice creuse mots × prompts au format
+    CSR (indptr, rows) dont les lignes suivent l'ordre alphabétique : les mots
+    qui commencent par un préfixe forment une tranche contiguë.
+    """
+
+    def __init__(self, prompts: Dict[int, RankedPrompt], by_token: Dict[str, Set[int]],
+                 vocabulary: List[str]):
+        import numpy as np
+        self.ids = np.fromiter(prompts, dtype=np.int64, count=len(prompts))
+        self.row_of = {prompt_id: row for row, prompt_id in enumerate(prompts)}
+        self.usage = np.fromiter((prompt.usage_count for prompt in prompts.values()),
+                                 dtype=np.int64, count=len(prompts))
+
+        self.category_codes: Dict[Optional[str], int] = {}
+        self.categories = np.fromiter(
+            (self.category_codes.setdefault(prompt.category, len(self.category_codes))
+             for prompt in prompts.values()),
+            dtype=np.int32, count=len(prompts))
+
+        self.vocabulary = vocabulary
+        lengths = np.fromiter((len(by_token[token]) for token in vocabulary),
+                              dtype=np.int64, count=len(vocabulary))
+        self.indptr = np.zeros(len(vocabulary) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=self.indptr[1:])
+        row_of = self.row_of
+        self.rows = np.fromiter((row_of[prompt_id] for token in vocabulary for prompt_id in by_token[token]),
+                                dtype=np.int64, count=int(self.indptr[-1]))
+
+    def scores(self, category: Optional[str], keywords: Counter) -> "np.ndarray":
+        """Scores de tous les prompts de l'instantané."""
+        import numpy as np
+        scores = self.usage * USAGE_WEIGHT
+        scores += (self.usage > FREQUENT_USAGE_THRESHOLD) * FREQUENT_USAGE_BONUS
+
+        code = self.category_codes.get(category) if category else None
+        if code is not None:
+            scores += (self.categories == code) * CATEGORY_BONUS
+
+        for word, occurrences in keywords.items():
+            # Produit matrice creuse × vecteur : chaque prompt compte une fois par mot
+            first = bisect_left(self.vocabulary, word)
+            last = bisect_left(self.vocabulary, prefix_upper_bound(word))
+            if first == last:
+                continue
+            rows = np.unique(self.rows[self.indptr[first]:self.indptr[last]])
+            scores[rows] += KEYWORD_BONUS * occurrences
+        return scores
+
+
+class ContextRanker:
+    """
+    Classement des prompts selon le contexte (catégorie, titre de fenêtre).
+
+    Score = usage_score(usage_count)
+            + CATEGORY_BONUS si la catégorie correspond
+            + KEYWORD_BONUS par mot du titre de la fenêtre qui préfixe un mot
+              du titre ou des tags du prompt
+
+    Seuls les prompts qui reçoivent un bonus contextuel sont notés à chaque
+    requête ; les autres n'ont que leur score d'usage, et les meilleurs d'entre
+    eux sont lus en tête d'une liste maintenue triée par usage.
+
+    Les méthodes peuvent être appelées depuis plusieurs threads.
+    """
+
+    def __init__(self, use_numpy: bool = True, vectorize_min_prompts: int = VECTORIZE_MIN_PROMPTS):
+        """
+        Initialise un moteur vide (voir load).
+
+        Args:
+            use_numpy: Utiliser le calcul vectorisé quand NumPy est installé
+            vectorize_min_prompts: Nombre de prompts à partir duquel il est utilisé
+        """
+        self.use_numpy = use_numpy and NUMPY_AVAILABLE
+        self.vectorize_min_prompts = vectorize_min_prompts
+        self._lock = threading.Lock()
+        self._prompts: Dict[int, RankedPrompt] = {}
+        self._by_category: Dict[Optional[str], Set[int]] = {}
+        self._by_token: Dict[str, Set[int]] = {}
+        # Mots triés pour retrouver ceux qui commencent par un préfixe (bisect),
+        # reconstruit à la demande quand le vocabulaire a changé
+        self._vocabulary: List[str] = []
+        self._vocabulary_dirty = False
+        # (-usage_count, -id) trié : les prompts les plus utilisés en tête
+        self._usage_order: List[Tuple[int, int]] = []
+        # Instantané NumPy, et prompts modifiés depuis (notés à part en Python)
+        self._snapshot: Optional[_VectorSnapshot] = None
+        self._stale_ids: Set[int] = set()
+
+    def load(self, rows: Iterable[Tuple]):
+        """
+        Remplace le contenu du moteur.
+
+        Args:
+            rows: Tuples (id, title, category, tags, usage_count),
+                par exemple DatabaseManager.get_prompt_metadata()
+        """
+        with self._lock:
+            self._prompts.clear()
+            self._by_category.clear()
+            self._by_token.clear()
+            self._usage_order = []
+            for prompt_id, title, category, tags, usage_count in rows:
+                self._index(prompt_id, title, category, tags, usage_count)
+                self._usage_order.append((-usage_count, -prompt_id))
+            self._usage_order.sort()
+            self._vocabulary_dirty = True
+            self._snapshot = None
+            self._stale_ids.clear()
+
+    def upsert(self, prompt_id: int, title: str, category: Optional[str],
+               tags: Optional[str], usage_count: int):
+        """Ajoute un prompt ou remplace sa version indexée."""
+        with self._lock:
+            self._unindex(prompt_id)
+            self._index(prompt_id, title, category, tags, usage_count)
+            insort(self._usage_order, (-usage_count, -prompt_id))
+            self._stale_ids.add(prompt_id)
+
+    def remove(self, prompt_id: int):
+        """Retire un prompt du moteur (sans effet s'il est absent)."""
+        with self._lock:
+            self._unindex(prompt_id)
+            self._stale_ids.add(prompt_id)
+
+    def add_usage(self, prompt_id: int, delta: int = 1):
+        """Met à jour le compteur d'utilisation d'un prompt indexé."""
+        with self._lock:
+            prompt = self._prompts.get(prompt_id)
+            if prompt is None:
+                return
+            self._remove_usage_key(prompt_id, prompt.usage_count)
+            usage_count = prompt.usage_count + delta
+            self._prompts[prompt_id] = prompt._replace(usage_count=usage_count)
+            insort(self._usage_order, (-usage_count, -prompt_id))
+            if self._snapshot is not None and prompt_id not in self._stale_ids:
+                self._snapshot.usage[self._snapshot.row_of[prompt_id]] = usage_count
+
+    def top_k(self, category: Optional[str], window_title: str, k: int = 10) -> List[PromptSummary]:
+        """
+        Retourne les k prompts les mieux classés pour un contexte.
+
+        Args:
+            category: Catégorie de l'application active (ou None)
+            window_title: Titre de la fenêtre active
+            k: Nombre de prompts à retourner
+
+        Returns:
+            Liste de PromptSummary (snippet à None), du meilleur au moins bon ;
+            à score égal, le plus utilisé puis le plus récent d'abord
+        """
+        if k <= 0:
+            return []
+        keywords = window_keywords(window_title)
+
+        with self._lock:
+            if self.use_numpy and len(self._prompts) >= self.vectorize_min_prompts:
+                best = self._top_k_vectorized(category, keywords, k)
+            else:
+                best = self._top_k_python(category, keywords, k)
+
+            prompts = self._prompts
+            return [PromptSummary(prompt_id, prompts[prompt_id].title, prompts[prompt_id].category,
+                                  prompts[prompt_id].usage_count, None)
+                    for prompt_id in best]
+
+    def score(self, prompt_id: int, category: Optional[str], window_title: str) -> Optional[int]:
+        """
+        Calcule le score d'un seul prompt (référence du classement top_k).
+
+        Returns:
+            Le score, ou None si le prompt n'est pas indexé
+        """
+        with self._lock:
+            prompt = self._prompts.get(prompt_id)
+        if prompt is None:
+            return None
+        return score_prompt(prompt, category, window_keywords(window_title))
+
+    def __len__(self) -> int:
+        return len(self._prompts)
+
+    # --- Classement (appelées avec le verrou) ---
+
+    def _top_k_python(self, category: Optional[str], keywords: Counter, k: int) -> List[int]:
+        """IDs du top k, en notant seulement les prompts qui reçoivent un bonus."""
+        bonus: Dict[int, int] = {}
+        if category:
+            for prompt_id in self._by_category.get(category, ()):
+                bonus[prompt_id] = CATEGORY_BONUS
+        for word, occurrences in keywords.items():
+            for prompt_id in self._ids_with_prefix(word):
+                bonus[prompt_id] = bonus.get(prompt_id, 0) + KEYWORD_BONUS * occurrences
+
+        # Un prompt sans bonus ne peut entrer dans le top k que s'il est
+        # parmi les k plus utilisés
+        candidates = set(bonus)
+        candidates.update(-neg_id for _, neg_id in self._usage_order[:k])
+
+        prompts = self._prompts
+        return heapq.nlargest(k, candidates, key=lambda prompt_id: (
+            usage_score(prompts[prompt_id].usage_count) + bonus.get(prompt_id, 0),
+            prompts[prompt_id].usage_count,
+            prompt_id,
+        ))
+
+    def _top_k_vectorized(self, category: Optional[str], keywords: Counter, k: int) -> List[int]:
+        """IDs du top k, en notant tous les prompts par opérations NumPy."""
+        import numpy as np
+        if self._snapshot is None or len(self._stale_ids) > max(STALE_REBUILD_MIN, len(self._prompts) // 20):
+            if self._vocabulary_dirty:
+                self._vocabulary = sorted(self._by_token)
+                self._vocabulary_dirty = False
+            self._snapshot = _VectorSnapshot(self._prompts, self._by_token, self._vocabulary)
+            self._stale_ids.clear()
+        snapshot = self._snapshot
+
+        scores = snapshot.scores(category, keywords)
+        # Les lignes des prompts modifiés depuis l'instantané sont périmées
+        stale_rows = [snapshot.row_of[prompt_id] for prompt_id in self._stale_ids
+                      if prompt_id in snapshot.row_of]
+        if stale_rows:
+            scores[stale_rows] = -1
+
+        ranked: List[Tuple[int, int, int]] = []
+        count = min(k, len(scores))
+        if count:
+            # Seuil du k-ième score, puis tri complet des seules lignes au-dessus
+            # (égalités comprises, pour départager comme en Python)
+            partition = np.argpartition(-scores, count - 1)
+            threshold = max(scores[partition[count - 1]], 0)
+            rows = np.flatnonzero(scores >= threshold)
+            order = np.lexsort((snapshot.ids[rows], snapshot.usage[rows], scores[rows]))[::-1][:k]
+            rows = rows[order]
+            ranked = list(zip(scores[rows].tolist(), snapshot.usage[rows].tolist(),
+                              snapshot.ids[rows].tolist()))
+
+        # Prompts ajoutés ou modifiés depuis l'instantané
+        for prompt_id in self._stale_ids:
+            prompt = self._prompts.get(prompt_id)
+            if prompt is not None:
+                ranked.append((score_prompt(prompt, category, keywords), prompt.usage_count, prompt_id))
+
+        return [prompt_id for _, _, prompt_id in heapq.nlargest(k, ranked)]
+
+    # --- Index (appelées avec le verrou) ---
+
+    def _index(self, prompt_id: int, title: str, category: Optional[str],
+               tags: Optional[str], usage_count: int):
+        """Ajoute un prompt aux index inversés (sans la liste par usage)."""
+        tokens = frozenset(tokenize(f"{title or ''} {tags or ''}"))
+        self._prompts[prompt_id] = RankedPrompt(title, category, tokens, usage_count)
+        self._by_category.setdefault(category, set()).add(prompt_id)
+        for token in tokens:
+            postings = self._by_token.get(token)
+            if postings is None:
+                postings = self._by_token[token] = set()
+                self._vocabulary_dirty = True
+            postings.add(prompt_id)
+
+    def _unindex(self, prompt_id: int):
+        """Retire un prompt de tous les index."""
+        prompt = self._prompts.pop(prompt_id, None)
+        if prompt is None:
+            return
+        self._remove_usage_key(prompt_id, prompt.usage_count)
+
+        ids = self._by_category.get(prompt.category)
+        if ids is not None:
+            ids.discard(prompt_id)
+            if not ids:
+                del self._by_category[prompt.category]
+
+        for token in prompt.tokens:
+            postings = self._by_token.get(token)
+            if postings is None:
+                continue
+            postings.discard(prompt_id)
+            if not postings:
+                del self._by_token[token]
+                self._vocabulary_dirty = True
+
+    def _remove_usage_key(self, prompt_id: int, usage_count: int):
+        """Retire un prompt de la liste triée par usage."""
+        key = (-usage_count, -prompt_id)
+        position = bisect_left(self._usage_order, key)
+        if position < len(self._usage_order) and self._usage_order[position] == key:
+            del self._usage_order[position]
+
+    def _ids_with_prefix(self, prefix: str) -> Set[int]:
+        """IDs des prompts dont un mot du titre ou des tags commence par prefix."""
+        if self._vocabulary_dirty:
+            self._vocabulary = sorted(self._by_token)
+            self._vocabulary_dirty = False
+
+        ids: Set[int] = set()
+        first = bisect_left(self._vocabulary, prefix)
+        last = bisect_left(self._vocabulary, prefix_upper_bound(prefix), first)
+        for token in self._vocabulary[first:last]:
+            ids.update(self._by_token[token])
+        return ids
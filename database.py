@@ -4,27 +4,464 @@ Gère le stockage et la récupération des prompts.
 """
 
 import sqlite3
+import csv
+import hashlib
+import json
 import os
+import re
+import string
+import threading
+from collections import namedtuple
 from datetime import datetime
-from typing import List, Tuple, Optional
+from importlib.util import find_spec
+from typing import Callable, Dict, Iterable, Iterator, List, TextIO, Tuple, Optional
+
+from prompt_cache import PromptCache
+
+
+# Pragmas appliqués une seule fois à l'ouverture de chaque connexion
+CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA cache_size = -16000",  # ~16 Mo de cache de pages
+    "PRAGMA temp_store = MEMORY",
+)
+
+# La recherche sémantique (semantic_search) a besoin de NumPy, importé à sa première utilisation
+SEMANTIC_AVAILABLE = find_spec("numpy") is not None
+
+# Voisins sémantiques fusionnés avec les résultats par mots-clés
+SEMANTIC_CANDIDATES = 50
+
+# Nombre de requêtes préparées gardées en cache par connexion
+STATEMENT_CACHE_SIZE = 256
+
+# Index plein texte synchronisé avec la table prompts par des triggers.
+# remove_diacritics 2 : "developpement" trouve "Développement"
+FTS_SCHEMA = (
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS prompts_fts USING fts5(
+        title, content, tags, category,
+        content='prompts', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS prompts_fts_insert AFTER INSERT ON prompts BEGIN
+        INSERT INTO prompts_fts(rowid, title, content, tags, category)
+        VALUES (new.id, new.title, new.content, new.tags, new.category);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS prompts_fts_delete AFTER DELETE ON prompts BEGIN
+        INSERT INTO prompts_fts(prompts_fts, rowid, title, content, tags, category)
+        VALUES ('delete', old.id, old.title, old.content, old.tags, old.category);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS prompts_fts_update
+    AFTER UPDATE OF title, content, tags, category ON prompts BEGIN
+        INSERT INTO prompts_fts(prompts_fts, rowid, title, content, tags, category)
+        VALUES ('delete', old.id, old.title, old.content, old.tags, old.category);
+        INSERT INTO prompts_fts(rowid, title, content, tags, category)
+        VALUES (new.id, new.title, new.content, new.tags, new.category);
+    END
+    """,
+)
+
+# Classement bm25 pondéré par colonne (title, content, tags, category) : le titre compte le plus
+FTS_RANK = "bm25(prompts_fts, 10.0, 1.0, 5.0, 3.0)"
+
+# Découpage aligné sur le tokenizer unicode61 (lettres et chiffres uniquement)
+FTS_TOKEN_PATTERN = re.compile(r"[^\W_]+")
+
+# Tags normalisés comme en SQL : lower(trim(tag)) (espaces retirés, A-Z en minuscules)
+_ASCII_LOWER = str.maketrans(string.ascii_uppercase, string.ascii_lowercase)
+
+
+def normalize_tag(tag: str) -> str:
+    """Forme d'un tag dans la table tags (même règle que SQL lower(trim(...)))."""
+    return tag.strip(" ").translate(_ASCII_LOWER)
+
+
+def _tag_values(column: str) -> str:
+    """
+    Table json_each des tags d'une colonne séparée par des virgules (ex :
+    new.tags) : json_quote échappe tous les caractères spéciaux (guillemets,
+    barres obliques inverses, caractères de contrôle), le tableau JSON obtenu
+    est donc toujours valide.
+    """
+    return (f"""json_each('[' || replace(json_quote(replace(replace(replace({column}, """
+            f"""char(9), ' '), char(10), ' '), char(13), ' ')), ',', '","') || ']')""")
+
+
+# Tables des tags : un tag par ligne, prompt_count = nombre de prompts qui le
+# portent (tenu à jour par les triggers de prompt_tags)
+TAG_TABLES = (
+    """
+    CREATE TABLE IF NOT EXISTS tags (
+        id INTEGER PRIMARY KEY,
+        name TEXT NOT NULL UNIQUE,
+        prompt_count INTEGER NOT NULL DEFAULT 0
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS prompt_tags (
+        prompt_id INTEGER NOT NULL,
+        tag_id INTEGER NOT NULL,
+        PRIMARY KEY (prompt_id, tag_id)
+    ) WITHOUT ROWID
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_prompt_tags_tag ON prompt_tags(tag_id, prompt_id)",
+    "CREATE INDEX IF NOT EXISTS idx_tags_count ON tags(prompt_count DESC, name)",
+    """
+    CREATE TRIGGER IF NOT EXISTS prompt_tags_count_insert AFTER INSERT ON prompt_tags BEGIN
+        UPDATE tags SET prompt_count = prompt_count + 1 WHERE id = new.tag_id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS prompt_tags_count_delete AFTER DELETE ON prompt_tags BEGIN
+        UPDATE tags SET prompt_count = prompt_count - 1 WHERE id = old.tag_id;
+        DELETE FROM tags WHERE id = old.tag_id AND prompt_count <= 0;
+    END
+    """,
+)
+
+# Remplissage initial de prompt_tags depuis la colonne prompts.tags
+TAG_BACKFILL = (
+    f"""
+    INSERT OR IGNORE INTO tags(name)
+    SELECT lower(trim(j.value)) FROM prompts p, {_tag_values("p.tags")} AS j
+    WHERE trim(j.value) != ''
+    """,
+    f"""
+    INSERT OR IGNORE INTO prompt_tags(prompt_id, tag_id)
+    SELECT p.id, t.id FROM prompts p, {_tag_values("p.tags")} AS j
+    JOIN tags t ON t.name = lower(trim(j.value))
+    """,
+)
+
+# Synchronisation de prompt_tags avec la colonne prompts.tags
+TAG_TRIGGERS = (
+    f"""
+    CREATE TRIGGER IF NOT EXISTS prompts_tags_insert AFTER INSERT ON prompts BEGIN
+        INSERT OR IGNORE INTO tags(name)
+        SELECT lower(trim(value)) FROM {_tag_values("new.tags")} WHERE trim(value) != '';
+        INSERT OR IGNORE INTO prompt_tags(prompt_id, tag_id)
+        SELECT new.id, t.id FROM {_tag_values("new.tags")} AS j JOIN tags t ON t.name = lower(trim(j.value));
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS prompts_tags_update
+    AFTER UPDATE OF tags ON prompts WHEN old.tags IS NOT new.tags BEGIN
+        DELETE FROM prompt_tags WHERE prompt_id = new.id;
+        INSERT OR IGNORE INTO tags(name)
+        SELECT lower(trim(value)) FROM {_tag_values("new.tags")} WHERE trim(value) != '';
+        INSERT OR IGNORE INTO prompt_tags(prompt_id, tag_id)
+        SELECT new.id, t.id FROM {_tag_values("new.tags")} AS j JOIN tags t ON t.name = lower(trim(j.value));
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS prompts_tags_delete AFTER DELETE ON prompts BEGIN
+        DELETE FROM prompt_tags WHERE prompt_id = old.id;
+    END
+    """,
+)
+
+# Migrations du schéma, appliquées dans l'ordre : la migration n porte la base
+# à PRAGMA user_version = n. Ne jamais modifier une migration publiée,
+# en ajouter une nouvelle à la fin.
+SCHEMA_MIGRATIONS = (
+    # 1 : index du tri par défaut (usage_count DESC, created_at DESC), couvrant
+    # pour les listes sans contenu, et index des catégories
+    (
+        """
+        CREATE INDEX IF NOT EXISTS idx_prompts_ranking
+        ON prompts(usage_count DESC, created_at DESC, title, category, tags)
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_prompts_category ON prompts(category)",
+    ),
+    # 2 : tags normalisés (tags, prompt_tags) remplis depuis prompts.tags, puis
+    # tenus à jour par triggers, avec le nombre de prompts par tag
+    TAG_TABLES + TAG_BACKFILL + TAG_TRIGGERS,
+)
+
+# Longueur par défaut des extraits de contenu renvoyés avec les listes
+SNIPPET_LENGTH = 120
+
+# Nombre maximal de paramètres liés dans une clause IN (...)
+SQL_VARIABLE_CHUNK = 500
+
+# Ligne légère pour l'affichage des listes : le contenu complet n'est chargé
+# qu'à la demande avec get_prompt_by_id
+PromptSummary = namedtuple("PromptSummary", ["id", "title", "category", "usage_count", "snippet"])
+
+# Champs des enregistrements importés/exportés (JSONL et CSV)
+EXPORT_FIELDS = ("title", "content", "category", "tags", "usage_count", "created_at")
+
+# Formats acceptés par import/export
+EXPORT_FORMATS = ("jsonl", "csv")
+
+# Nombre de lignes insérées par transaction lors d'un import
+IMPORT_CHUNK_SIZE = 1000
+
+
+def _tag_name_filter(name: str, prefix: bool) -> Tuple[str, Tuple]:
+    """
+    Condition SQL sur tags.name (tag normalisé, non vide) : égalité, ou
+    intervalle [name, name suivant[ pour un préfixe, qui utilise l'index
+    UNIQUE contrairement à LIKE.
+    """
+    if not prefix:
+        return "tags.name = ?", (name,)
+    upper = name[:-1] + chr(ord(name[-1]) + 1)
+    return "tags.name >= ? AND tags.name < ?", (name, upper)
+
+
+def build_fts_query(query: str) -> Optional[str]:
+    """
+    Construit une expression MATCH FTS5 à partir d'une saisie utilisateur.
+    
+    Chaque mot devient une requête préfixe entre guillemets (ce qui neutralise
+    la syntaxe FTS5), et tous les mots doivent être présents.
+    
+    Args:
+        query: Texte saisi dans la barre de recherche
+        
+    Returns:
+        L'expression MATCH, ou None si la saisie ne contient aucun mot
+    """
+    tokens = FTS_TOKEN_PATTERN.findall(query)
+    if not tokens:
+        return None
+    return " ".join(f'"{token}"*' for token in tokens)
+
+
+def _dedup_key(title: str, content: str) -> bytes:
+    """Empreinte compacte (16 octets) d'un couple titre + contenu."""
+    return content_digest(f"{title}\0{content}")
+
+
+def content_digest(text: str) -> bytes:
+    """Empreinte compacte (16 octets) d'un texte, pour détecter une modification."""
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+
+def try_lock_file(f) -> bool:
+    """
+    Pose un verrou exclusif non bloquant sur un fichier ouvert.
+    
+    Le verrou est libéré à la fermeture du fichier ou à la fin du processus
+    (même brutale).
+    
+    Returns:
+        False si un autre fichier ouvert (de ce processus ou d'un autre) le tient déjà
+    """
+    try:
+        if os.name == "nt":
+            import msvcrt
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        return False
+    return True
+
+
+def unlock_file(f):
+    """Lève le verrou posé par try_lock_file (Windows ne le lève pas toujours à la fermeture)."""
+    if os.name == "nt":
+        import msvcrt
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def read_prompt_records(stream: TextIO, fmt: str = "jsonl") -> Iterator[Dict]:
+    """
+    Lit des prompts au format JSONL ou CSV, un enregistrement à la fois.
+    
+    Args:
+        stream: Fichier texte ouvert en lecture (newline='' pour le CSV)
+        fmt: "jsonl" ou "csv"
+        
+    Returns:
+        Générateur de dicts (clés de EXPORT_FIELDS, toutes optionnelles sauf
+        title et content)
+    """
+    if fmt == "jsonl":
+        for line in stream:
+            if line.strip():
+                yield json.loads(line)
+    elif fmt == "csv":
+        yield from csv.DictReader(stream)
+    else:
+        raise ValueError(f"Format inconnu : {fmt} (attendu : {', '.join(EXPORT_FORMATS)})")
 
 
 class DatabaseManager:
     """Gestionnaire de base de données pour PromptMaster."""
     
-    def __init__(self, db_path: str = "promptmaster.db"):
+    def __init__(self, db_path: str = "promptmaster.db", cache_size: int = 256,
+                 usage_flush_interval: float = 5.0):
         """
         Initialise le gestionnaire de base de données.
         
+        Une connexion persistante est ouverte par thread et réutilisée par
+        toutes les méthodes ; appelez close() à l'arrêt de l'application.
+        
         Args:
             db_path: Chemin vers le fichier de base de données SQLite
+            cache_size: Nombre de prompts complets gardés en cache (LRU)
+            usage_flush_interval: Délai (secondes) entre deux écritures groupées
+                des compteurs d'utilisation
         """
         self.db_path = db_path
+        self.prompt_cache = PromptCache(cache_size)
+        self._local = threading.local()
+        self._connections: Dict[int, sqlite3.Connection] = {}  # ident du thread -> connexion
+        self._connections_lock = threading.Lock()
+        self.fts_enabled = False
+        
+        # Compteurs d'utilisation en attente d'écriture (id -> incrément)
+        self.usage_flush_interval = usage_flush_interval
+        self.usage_journal_path = None if db_path == ":memory:" else db_path + ".usage"
+        self._pending_usage: Dict[int, int] = {}
+        self._usage_lock = threading.Lock()
+        self._usage_seq = 0  # Numéro du dernier événement écrit dans le journal
+        self._usage_journal = None  # Ouvert et verrouillé si ce gestionnaire tient le journal
+        self._usage_flusher: Optional[threading.Thread] = None
+        self._usage_stop = threading.Event()
+        
+        # Fonctions appelées après chaque modification (voir add_change_listener)
+        self._change_listeners: List[Callable[[str, Optional[int]], None]] = []
+        
+        # Vecteurs de la recherche sémantique (voir enable_semantic_search)
+        self.vectors_path = None if db_path == ":memory:" else db_path + ".vectors"
+        self.semantic_index = None
+        self._semantic_lock = threading.Lock()
+        
+        # Index des catégories, recalculé au premier appel après une modification
+        self._categories: Optional[List[str]] = None
+        self._categories_generation = 0  # Incrémenté à chaque invalidation
+        self._categories_lock = threading.Lock()
+        
         self.init_database()
     
     def get_connection(self) -> sqlite3.Connection:
-        """Crée et retourne une connexion à la base de données."""
-        return sqlite3.connect(self.db_path)
+        """
+        Retourne la connexion persistante du thread courant.
+        
+        La connexion est créée et configurée au premier appel dans chaque
+        thread, puis réutilisée (avec son cache de requêtes préparées).
+        """
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._create_connection()
+            self._local.conn = conn
+            with self._connections_lock:
+                # Un identifiant de thread peut être réutilisé après la fin d'un thread
+                stale = self._connections.pop(threading.get_ident(), None)
+                self._connections[threading.get_ident()] = conn
+            if stale is not None:
+                stale.close()
+        return conn
+    
+    def _create_connection(self) -> sqlite3.Connection:
+        """Ouvre une nouvelle connexion et applique les pragmas de performance."""
+        # check_same_thread=False : chaque connexion reste propre à son thread,
+        # mais close() doit pouvoir la fermer depuis le thread principal
+        conn = sqlite3.connect(
+            self.db_path,
+            check_same_thread=False,
+            cached_statements=STATEMENT_CACHE_SIZE
+        )
+        for pragma in CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        return conn
+    
+    def close(self):
+        """
+        Écrit les compteurs d'utilisation en attente puis ferme le fichier
+        de vecteurs et toutes les connexions ouvertes par ce gestionnaire.
+        """
+        self._usage_stop.set()
+        if self._usage_flusher is not None:
+            self._usage_flusher.join()
+        self.flush_usage()
+        with self._usage_lock:
+            self._usage_flusher = None
+            self._usage_stop = threading.Event()
+            if self._usage_journal is not None:
+                unlock_file(self._usage_journal)
+                self._usage_journal.close()
+                self._usage_journal = None
+        
+        with self._semantic_lock:
+            semantic_index, self.semantic_index = self.semantic_index, None
+        if semantic_index is not None:
+            semantic_index.close()
+        
+        with self._connections_lock:
+            connections, self._connections = list(self._connections.values()), {}
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+        self._local = threading.local()
+    
+    def interrupt(self, thread_id: int):
+        """
+        Interrompt la requête en cours sur la connexion d'un autre thread.
+        
+        La requête interrompue lève sqlite3.OperationalError ("interrupted")
+        dans le thread concerné.
+        
+        Args:
+            thread_id: Identifiant du thread (threading.get_ident())
+        """
+        with self._connections_lock:
+            conn = self._connections.get(thread_id)
+        if conn is not None:
+            conn.interrupt()
+    
+    def add_change_listener(self, callback: Callable[[str, Optional[int]], None]):
+        """
+        Abonne une fonction aux modifications des prompts.
+        
+        La fonction est appelée, dans le thread qui a fait la modification,
+        avec (événement, id du prompt) : "added", "updated", "deleted",
+        "usage", ou ("imported", None) après un import en masse.
+        
+        Args:
+            callback: Fonction à appeler
+        """
+        self._change_listeners.append(callback)
+    
+    def remove_change_listener(self, callback: Callable[[str, Optional[int]], None]):
+        """Désabonne une fonction ajoutée par add_change_listener."""
+        if callback in self._change_listeners:
+            self._change_listeners.remove(callback)
+    
+    def _notify_change(self, event: str, prompt_id: Optional[int] = None):
+        """Prévient les abonnés d'une modification."""
+        if event != "usage":
+            with self._categories_lock:
+                self._categories = None
+                self._categories_generation += 1
+        for callback in list(self._change_listeners):
+            try:
+                callback(event, prompt_id)
+            except Exception as e:
+                print(f"Erreur dans un abonné aux modifications : {e}")
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
     
     def init_database(self):
         """Crée la table prompts si elle n'existe pas."""
@@ -43,10 +480,72 @@ class DatabaseManager:
             )
         """)
         
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS app_meta (
+                key TEXT PRIMARY KEY,
+                value INTEGER
+            )
+        """)
+        
+        self.fts_enabled = self._init_fts(cursor)
+        
         conn.commit()
-        conn.close()
+        self._migrate(conn)
+        with self._usage_lock:
+            self._acquire_usage_journal()
         print(f"✓ Base de données initialisée : {self.db_path}")
     
+    def _migrate(self, conn: sqlite3.Connection):
+        """
+        Applique les migrations de SCHEMA_MIGRATIONS que la base n'a pas encore
+        reçues, chacune dans sa propre transaction.
+        """
+        if conn.execute("PRAGMA user_version").fetchone()[0] >= len(SCHEMA_MIGRATIONS):
+            return
+        
+        for version, statements in enumerate(SCHEMA_MIGRATIONS, start=1):
+            # BEGIN IMMEDIATE : une autre instance qui migre en même temps attend,
+            # puis voit la nouvelle version et n'applique rien deux fois
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                current = conn.execute("PRAGMA user_version").fetchone()[0]
+                if current >= version:
+                    conn.rollback()
+                    continue
+                for statement in statements:
+                    conn.execute(statement)
+                conn.execute(f"PRAGMA user_version = {version}")
+                conn.commit()
+            except sqlite3.Error:
+                conn.rollback()
+                raise
+            print(f"✓ Schéma de la base migré en version {version}")
+    
+    def _init_fts(self, cursor: sqlite3.Cursor) -> bool:
+        """
+        Crée l'index plein texte et ses triggers, puis indexe les prompts
+        existants lors de la migration d'une ancienne base.
+        
+        Returns:
+            True si FTS5 est disponible, False sinon (recherche LIKE en repli)
+        """
+        cursor.execute("""
+            SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'prompts_fts'
+        """)
+        existed = cursor.fetchone() is not None
+        
+        try:
+            for statement in FTS_SCHEMA:
+                cursor.execute(statement)
+        except sqlite3.OperationalError as e:
+            print(f"⚠️ FTS5 indisponible, recherche LIKE utilisée : {e}")
+            return False
+        
+        if not existed:
+            cursor.execute("INSERT INTO prompts_fts(prompts_fts) VALUES ('rebuild')")
+        
+        return True
+    
     def add_prompt(self, title: str, content: str, category: Optional[str] = None, 
                    tags: Optional[str] = None) -> int:
         """
@@ -71,21 +570,160 @@ class DatabaseManager:
         
         prompt_id = cursor.lastrowid
         conn.commit()
-        conn.close()
+        self._notify_change("added", prompt_id)
         
         print(f"✓ Prompt ajouté : '{title}' (ID: {prompt_id})")
         return prompt_id
     
-    def search_prompts(self, query: str) -> List[Tuple]:
+    def search_prompts(self, query: str, semantic: bool = False) -> List[Tuple]:
         """
-        Recherche des prompts par titre, contenu ou tags.
+        Recherche des prompts par titre, contenu, tags ou catégorie.
+        
+        Utilise l'index FTS5 (préfixes, insensible aux accents, classement bm25)
+        et se replie sur une recherche LIKE si FTS5 est indisponible ou si la
+        saisie ne contient aucun mot.
         
         Args:
             query: Terme de recherche
+            semantic: Fusionner le classement avec les prompts de sens proche
+                (voir enable_semantic_search) ; ignoré sans NumPy
             
         Returns:
             Liste de tuples (id, title, content, category, tags, usage_count)
         """
+        match_query = build_fts_query(query) if self.fts_enabled else None
+        if match_query is None:
+            results = self._search_prompts_like(query)
+        else:
+            conn = self.get_connection()
+            cursor = conn.cursor()
+            
+            cursor.execute(f"""
+                SELECT p.id, p.title, p.content, p.category, p.tags, p.usage_count
+                FROM prompts_fts
+                JOIN prompts p ON p.id = prompts_fts.rowid
+                WHERE prompts_fts MATCH ?
+                ORDER BY {FTS_RANK}, p.usage_count DESC, p.created_at DESC
+            """, (match_query,))
+            
+            results = self._merge_pending_usage(cursor.fetchall(), 5)
+        
+        if semantic:
+            results = self._blend_semantic(query, results, "id, title, content, category, tags, usage_count", 5)
+        return results
+    
+    def search_prompt_summaries(self, query: str, with_snippet: bool = False,
+                                semantic: bool = False) -> List[PromptSummary]:
+        """
+        Recherche des prompts comme search_prompts, sans transférer leur contenu.
+        
+        Args:
+            query: Terme de recherche
+            with_snippet: Inclure un court extrait du contenu autour des mots trouvés
+            semantic: Fusionner le classement avec les prompts de sens proche
+            
+        Returns:
+            Liste de PromptSummary (id, title, category, usage_count, snippet)
+        """
+        match_query = build_fts_query(query) if self.fts_enabled else None
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        if match_query is None:
+            search_pattern = f"%{query}%"
+            snippet = f"substr(content, 1, {SNIPPET_LENGTH})" if with_snippet else "NULL"
+            cursor.execute(f"""
+                SELECT id, title, category, usage_count, {snippet}
+                FROM prompts
+                WHERE title LIKE ? OR content LIKE ? OR tags LIKE ? OR category LIKE ?
+                ORDER BY usage_count DESC, created_at DESC
+            """, (search_pattern, search_pattern, search_pattern, search_pattern))
+        else:
+            snippet = "snippet(prompts_fts, 1, '', '', '…', 16)" if with_snippet else "NULL"
+            cursor.execute(f"""
+                SELECT p.id, p.title, p.category, p.usage_count, {snippet}
+                FROM prompts_fts
+                JOIN prompts p ON p.id = prompts_fts.rowid
+                WHERE prompts_fts MATCH ?
+                ORDER BY {FTS_RANK}, p.usage_count DESC, p.created_at DESC
+            """, (match_query,))
+        
+        summaries = [PromptSummary(*row) for row in cursor.fetchall()]
+        summaries = self._merge_pending_usage(summaries, 3, resort=match_query is None)
+        
+        if semantic:
+            snippet = f"substr(content, 1, {SNIPPET_LENGTH})" if with_snippet else "NULL"
+            summaries = self._blend_semantic(query, summaries, f"id, title, category, usage_count, {snippet}",
+                                             3, PromptSummary._make)
+        return summaries
+    
+    def enable_semantic_search(self) -> bool:
+        """
+        Active la recherche sémantique hors ligne (voir semantic_search).
+        
+        Les vecteurs des prompts sont relus dans <base>.vectors et complétés
+        dans un thread d'arrière-plan, puis tenus à jour à chaque modification.
+        
+        Returns:
+            False si NumPy n'est pas installé
+        """
+        if not SEMANTIC_AVAILABLE:
+            return False
+        with self._semantic_lock:
+            if self.semantic_index is None:
+                from semantic_search import SemanticIndex
+                self.semantic_index = SemanticIndex(self, self.vectors_path)
+                self.semantic_index.sync_in_background()
+        return True
+    
+    def semantic_index_building(self) -> bool:
+        """
+        Indique si les vecteurs sont en cours de calcul en arrière-plan : la
+        recherche sémantique ne trouve alors qu'une partie des prompts (les
+        résultats par mots-clés restent complets).
+        """
+        semantic_index = self.semantic_index
+        return semantic_index is not None and semantic_index.building
+    
+    def _blend_semantic(self, query: str, rows: List[Tuple], columns: str, usage_index: int,
+                        make_row: Callable[[Tuple], Tuple] = tuple) -> List[Tuple]:
+        """
+        Fusionne des résultats par mots-clés avec les voisins sémantiques de la requête.
+        
+        Les deux classements sont combinés par rangs réciproques (RRF) ; les
+        prompts trouvés seulement par le sens sont lus avec les mêmes colonnes.
+        
+        Args:
+            query: Terme de recherche
+            rows: Résultats par mots-clés, du meilleur au moins bon
+            columns: Colonnes SQL des lignes (la première est l'ID)
+            usage_index: Position de usage_count dans chaque ligne
+            make_row: Construit une ligne à partir d'un tuple lu en base
+        """
+        if not self.enable_semantic_search():
+            return rows
+        from semantic_search import reciprocal_rank_fusion
+        
+        neighbours = [prompt_id for prompt_id, _ in self.semantic_index.search(query, SEMANTIC_CANDIDATES)]
+        if not neighbours:
+            return rows
+        
+        keyword_ids = [row[0] for row in rows]
+        by_id = dict(zip(keyword_ids, rows))
+        missing = [prompt_id for prompt_id in neighbours if prompt_id not in by_id]
+        if missing:
+            cursor = self.get_connection().cursor()
+            placeholders = ", ".join("?" * len(missing))
+            cursor.execute(f"SELECT {columns} FROM prompts WHERE id IN ({placeholders})", missing)
+            fetched = self._merge_pending_usage([make_row(row) for row in cursor.fetchall()], usage_index)
+            by_id.update((row[0], row) for row in fetched)
+        
+        # Un voisin supprimé entre-temps n'est plus dans by_id
+        return [by_id[prompt_id] for prompt_id in reciprocal_rank_fusion([keyword_ids, neighbours])
+                if prompt_id in by_id]
+    
+    def _search_prompts_like(self, query: str) -> List[Tuple]:
+        """Recherche par sous-chaîne (LIKE), sans index."""
         conn = self.get_connection()
         cursor = conn.cursor()
         
@@ -97,10 +735,7 @@ class DatabaseManager:
             ORDER BY usage_count DESC, created_at DESC
         """, (search_pattern, search_pattern, search_pattern, search_pattern))
         
-        results = cursor.fetchall()
-        conn.close()
-        
-        return results
+        return self._merge_pending_usage(cursor.fetchall(), 5, resort=True)
     
     def get_all_prompts(self) -> List[Tuple]:
         """
@@ -118,8 +753,75 @@ class DatabaseManager:
             ORDER BY usage_count DESC, created_at DESC
         """)
         
-        results = cursor.fetchall()
-        conn.close()
+        return self._merge_pending_usage(cursor.fetchall(), 5, resort=True)
+    
+    def list_prompts(self, with_snippet: bool = False) -> List[PromptSummary]:
+        """
+        Liste tous les prompts sans transférer leur contenu complet.
+        
+        Args:
+            with_snippet: Inclure le début du contenu (SNIPPET_LENGTH caractères)
+            
+        Returns:
+            Liste de PromptSummary (id, title, category, usage_count, snippet),
+            triée comme get_all_prompts
+        """
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        snippet = f"substr(content, 1, {SNIPPET_LENGTH})" if with_snippet else "NULL"
+        cursor.execute(f"""
+            SELECT id, title, category, usage_count, {snippet}
+            FROM prompts
+            ORDER BY usage_count DESC, created_at DESC
+        """)
+        
+        summaries = [PromptSummary(*row) for row in cursor.fetchall()]
+        return self._merge_pending_usage(summaries, 3, resort=True)
+    
+    def get_prompt_metadata(self) -> List[Tuple]:
+        """
+        Récupère les colonnes utiles au classement contextuel, sans le contenu.
+        
+        Returns:
+            Liste de tuples (id, title, category, tags, usage_count),
+            triée comme get_all_prompts
+        """
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        cursor.execute("""
+            SELECT id, title, category, tags, usage_count
+            FROM prompts
+            ORDER BY usage_count DESC, created_at DESC
+        """)
+        
+        return self._merge_pending_usage(cursor.fetchall(), 4, resort=True)
+    
+    def get_search_texts(self, prompt_ids: Iterable[int]) -> List[Tuple]:
+        """
+        Récupère les colonnes indexées en plein texte de plusieurs prompts.
+        
+        Args:
+            prompt_ids: IDs des prompts
+            
+        Returns:
+            Liste de tuples (id, title, content, tags, category), sans ordre garanti
+        """
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        prompt_ids = list(prompt_ids)
+        results = []
+        for start in range(0, len(prompt_ids), SQL_VARIABLE_CHUNK):
+            chunk = prompt_ids[start:start + SQL_VARIABLE_CHUNK]
+            placeholders = ", ".join("?" * len(chunk))
+            cursor.execute(f"""
+                SELECT id, title, content, tags, category
+                FROM prompts
+                WHERE id IN ({placeholders})
+            """, chunk)
+            results.extend(cursor.fetchall())
         
         return results
     
@@ -133,6 +835,11 @@ class DatabaseManager:
         Returns:
             Tuple (id, title, content, category, tags, usage_count) ou None
         """
+        cached = self.prompt_cache.get(prompt_id)
+        if cached is not None:
+            return self._merge_pending_usage([cached], 5)[0]
+        
+        generation = self.prompt_cache.generation
         conn = self.get_connection()
         cursor = conn.cursor()
         
@@ -143,9 +850,37 @@ class DatabaseManager:
         """, (prompt_id,))
         
         result = cursor.fetchone()
-        conn.close()
+        if result is None:
+            return None
         
-        return result
+        self.prompt_cache.put(result, generation)
+        return self._merge_pending_usage([result], 5)[0]
+    
+    def prefetch_prompts(self, prompt_ids: Iterable[int]):
+        """
+        Charge en cache, en une seule requête, les prompts qui n'y sont pas encore.
+        
+        Args:
+            prompt_ids: IDs des prompts à précharger (par ex. les voisins de la sélection)
+        """
+        missing = self.prompt_cache.missing(prompt_ids)
+        if not missing:
+            return
+        
+        generation = self.prompt_cache.generation
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        for start in range(0, len(missing), SQL_VARIABLE_CHUNK):
+            chunk = missing[start:start + SQL_VARIABLE_CHUNK]
+            placeholders = ", ".join("?" * len(chunk))
+            cursor.execute(f"""
+                SELECT id, title, content, category, tags, usage_count
+                FROM prompts
+                WHERE id IN ({placeholders})
+            """, chunk)
+            for prompt in cursor.fetchall():
+                self.prompt_cache.put(prompt, generation)
     
     def update_prompt(self, prompt_id: int, title: Optional[str] = None, 
                      content: Optional[str] = None, category: Optional[str] = None,
@@ -153,6 +888,9 @@ class DatabaseManager:
         """
         Met à jour un prompt existant.
         
+        Seules les colonnes fournies (différentes de None) sont écrites, en
+        une seule requête UPDATE, sans relire le prompt au préalable.
+        
         Args:
             prompt_id: ID du prompt à modifier
             title: Nouveau titre (optionnel)
@@ -163,29 +901,30 @@ class DatabaseManager:
         Returns:
             True si la mise à jour a réussi, False sinon
         """
-        # Récupérer le prompt actuel
-        current = self.get_prompt_by_id(prompt_id)
-        if not current:
-            print(f"✗ Prompt ID {prompt_id} introuvable")
-            return False
-        
-        # Utiliser les valeurs actuelles si les nouvelles ne sont pas fournies
-        new_title = title if title is not None else current[1]
-        new_content = content if content is not None else current[2]
-        new_category = category if category is not None else current[3]
-        new_tags = tags if tags is not None else current[4]
+        changes = {column: value for column, value in
+                   (("title", title), ("content", content), ("category", category), ("tags", tags))
+                   if value is not None}
         
         conn = self.get_connection()
         cursor = conn.cursor()
         
-        cursor.execute("""
-            UPDATE prompts
-            SET title = ?, content = ?, category = ?, tags = ?
-            WHERE id = ?
-        """, (new_title, new_content, new_category, new_tags, prompt_id))
+        if changes:
+            # Noms de colonnes fixes ci-dessus : seules les valeurs sont liées
+            assignments = ", ".join(f"{column} = ?" for column in changes)
+            cursor.execute(f"UPDATE prompts SET {assignments} WHERE id = ?",
+                           (*changes.values(), prompt_id))
+            found = cursor.rowcount > 0
+            conn.commit()
+        else:
+            found = cursor.execute("SELECT 1 FROM prompts WHERE id = ?", (prompt_id,)).fetchone() is not None
         
-        conn.commit()
-        conn.close()
+        if not found:
+            print(f"✗ Prompt ID {prompt_id} introuvable")
+            return False
+        
+        if changes:
+            self.prompt_cache.invalidate(prompt_id)
+            self._notify_change("updated", prompt_id)
         
         print(f"✓ Prompt mis à jour : ID {prompt_id}")
         return True
@@ -207,9 +946,10 @@ class DatabaseManager:
         deleted = cursor.rowcount > 0
         
         conn.commit()
-        conn.close()
+        self.prompt_cache.invalidate(prompt_id)
         
         if deleted:
+            self._notify_change("deleted", prompt_id)
             print(f"✓ Prompt supprimé : ID {prompt_id}")
         else:
             print(f"✗ Prompt ID {prompt_id} introuvable")
@@ -220,28 +960,205 @@ class DatabaseManager:
         """
         Incrémente le compteur d'utilisation d'un prompt.
         
+        L'incrément est gardé en mémoire et écrit plus tard par flush_usage()
+        (pas de transaction ni de fsync sur le thread appelant). Il est ajouté
+        au journal, si ce gestionnaire le tient, pour survivre à un arrêt
+        brutal, et les lectures en tiennent compte immédiatement.
+        
         Args:
             prompt_id: ID du prompt utilisé
         """
+        with self._usage_lock:
+            # Le journal a pu être libéré par close() ou par l'instance qui le tenait
+            if self._usage_journal is None:
+                self._acquire_usage_journal()
+            self._usage_seq += 1
+            if self._usage_journal is not None:
+                self._usage_journal.write(f"{self._usage_seq} {prompt_id}\n")
+            
+            self._pending_usage[prompt_id] = self._pending_usage.get(prompt_id, 0) + 1
+            
+            if self._usage_flusher is None:
+                self._usage_flusher = threading.Thread(
+                    target=self._usage_flush_loop, name="usage-flush", daemon=True
+                )
+                self._usage_flusher.start()
+        
+        self._notify_change("usage", prompt_id)
+    
+    def flush_usage(self) -> int:
+        """
+        Écrit les compteurs d'utilisation en attente en une seule transaction.
+        
+        Appelée périodiquement par un thread d'arrière-plan et par close().
+        
+        Returns:
+            Nombre d'utilisations écrites
+        """
+        with self._usage_lock:
+            if not self._pending_usage:
+                return 0
+            
+            conn = self.get_connection()
+            cursor = conn.cursor()
+            
+            cursor.executemany("""
+                UPDATE prompts
+                SET usage_count = usage_count + ?
+                WHERE id = ?
+            """, [(count, prompt_id) for prompt_id, count in self._pending_usage.items()])
+            if self._usage_journal is not None:
+                # Dans la même transaction : les événements jusqu'à ce numéro sont appliqués
+                cursor.execute("""
+                    INSERT OR REPLACE INTO app_meta (key, value) VALUES ('usage_journal_seq', ?)
+                """, (self._usage_seq,))
+            
+            conn.commit()
+            
+            flushed = sum(self._pending_usage.values())
+            for prompt_id in self._pending_usage:
+                self.prompt_cache.invalidate(prompt_id)
+            self._pending_usage.clear()
+            
+            if self._usage_journal is not None:
+                self._usage_journal.truncate(0)
+            
+            return flushed
+    
+    def _acquire_usage_journal(self) -> bool:
+        """
+        Ouvre et verrouille le journal des utilisations (<base>.usage).
+        
+        Un seul gestionnaire à la fois, tous processus confondus, tient le
+        journal d'une base : il rejoue les utilisations laissées par une
+        session interrompue, puis y ajoute les siennes. Les autres (import en
+        ligne de commande ou benchmark lancés pendant que l'application
+        tourne) ne le lisent ni ne l'écrivent : leurs utilisations restent en
+        mémoire jusqu'à flush_usage(). Appelée avec _usage_lock tenu.
+        
+        Returns:
+            True si ce gestionnaire tient le journal
+        """
+        if self._usage_journal is not None:
+            return True
+        if self.usage_journal_path is None:
+            return False
+        
+        # Mode ajout, tampon par ligne : chaque événement est écrit tout de suite
+        journal = open(self.usage_journal_path, "a+", encoding="utf-8", buffering=1)
+        if not try_lock_file(journal):
+            journal.close()
+            return False
+        try:
+            self._replay_usage_journal(journal)
+        except BaseException:
+            unlock_file(journal)
+            journal.close()
+            raise
+        self._usage_journal = journal
+        return True
+    
+    def _replay_usage_journal(self, journal: TextIO):
+        """
+        Applique les utilisations du journal qu'une session interrompue n'a pas
+        eu le temps d'écrire en base, puis vide le journal.
+        
+        Args:
+            journal: Journal ouvert et verrouillé (voir _acquire_usage_journal)
+        """
         conn = self.get_connection()
         cursor = conn.cursor()
         
-        cursor.execute("""
-            UPDATE prompts
-            SET usage_count = usage_count + 1
-            WHERE id = ?
-        """, (prompt_id,))
+        # Lu même si le journal est vide ou a disparu : les prochains numéros
+        # doivent dépasser ceux déjà appliqués
+        cursor.execute("SELECT value FROM app_meta WHERE key = 'usage_journal_seq'")
+        row = cursor.fetchone()
+        applied_seq = row[0] if row else 0
         
+        counts: Dict[int, int] = {}
+        last_seq = applied_seq
+        journal.seek(0)
+        for line in journal:
+            try:
+                seq, prompt_id = (int(part) for part in line.split())
+            except ValueError:
+                continue  # Ligne tronquée par un arrêt brutal
+            if seq > applied_seq:
+                counts[prompt_id] = counts.get(prompt_id, 0) + 1
+            last_seq = max(last_seq, seq)
+        
+        if counts:
+            cursor.executemany("""
+                UPDATE prompts
+                SET usage_count = usage_count + ?
+                WHERE id = ?
+            """, [(count, prompt_id) for prompt_id, count in counts.items()])
+            for prompt_id in counts:
+                self.prompt_cache.invalidate(prompt_id)
+        if last_seq != applied_seq:
+            cursor.execute("""
+                INSERT OR REPLACE INTO app_meta (key, value) VALUES ('usage_journal_seq', ?)
+            """, (last_seq,))
         conn.commit()
-        conn.close()
+        if counts:
+            print(f"✓ {sum(counts.values())} utilisation(s) restaurée(s) depuis le journal")
+        
+        self._usage_seq = last_seq
+        journal.truncate(0)
+    
+    def _usage_flush_loop(self):
+        """Boucle du thread d'écriture groupée des compteurs d'utilisation."""
+        stop = self._usage_stop
+        while not stop.wait(self.usage_flush_interval):
+            try:
+                self.flush_usage()
+            except sqlite3.Error as e:
+                print(f"Erreur lors de l'écriture des compteurs d'utilisation : {e}")
+    
+    def _merge_pending_usage(self, rows: List[Tuple], usage_index: int,
+                             resort: bool = False) -> List[Tuple]:
+        """
+        Ajoute aux lignes lues en base les utilisations pas encore écrites.
+        
+        Args:
+            rows: Lignes dont la première colonne est l'ID du prompt
+            usage_index: Position de usage_count dans chaque ligne
+            resort: Retrier par usage décroissant (tri stable) pour les listes
+                ordonnées par usage_count
+        """
+        with self._usage_lock:
+            if not self._pending_usage:
+                return rows
+            pending = dict(self._pending_usage)
+        
+        merged = []
+        for row in rows:
+            extra = pending.get(row[0])
+            if extra:
+                values = list(row)
+                values[usage_index] += extra
+                row = PromptSummary(*values) if isinstance(row, PromptSummary) else tuple(values)
+            merged.append(row)
+        
+        if resort:
+            merged.sort(key=lambda row: -row[usage_index])
+        return merged
     
     def get_categories(self) -> List[str]:
         """
         Récupère toutes les catégories uniques.
         
+        La liste est gardée en mémoire et recalculée seulement après un
+        ajout, une modification, une suppression ou un import.
+        
         Returns:
-            Liste des catégories
+            Liste des catégories (copie, triée)
         """
+        with self._categories_lock:
+            if self._categories is not None:
+                return list(self._categories)
+            generation = self._categories_generation
+        
         conn = self.get_connection()
         cursor = conn.cursor()
         
@@ -253,9 +1170,212 @@ class DatabaseManager:
         """)
         
         categories = [row[0] for row in cursor.fetchall()]
-        conn.close()
         
-        return categories
+        with self._categories_lock:
+            # Ne pas garder une liste lue avant une modification concurrente
+            if generation == self._categories_generation:
+                self._categories = categories
+        return list(categories)
+    
+    def get_tag_counts(self, prefix: str = "", limit: Optional[int] = None) -> List[Tuple[str, int]]:
+        """
+        Nombre de prompts par tag (facettes), lu dans la table tags.
+        
+        Args:
+            prefix: Ne garder que les tags qui commencent par ce préfixe
+            limit: Nombre maximum de tags retournés (tous si None)
+            
+        Returns:
+            Liste de tuples (tag, nombre de prompts), du plus au moins utilisé
+        """
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        prefix = normalize_tag(prefix)
+        where, params = _tag_name_filter(prefix, True) if prefix else ("1", ())
+        cursor.execute(f"""
+            SELECT name, prompt_count
+            FROM tags
+            WHERE {where}
+            ORDER BY prompt_count DESC, name
+            LIMIT ?
+        """, (*params, -1 if limit is None else limit))
+        
+        return cursor.fetchall()
+    
+    def find_prompts_by_tag(self, tag: str, prefix: bool = False) -> List[PromptSummary]:
+        """
+        Prompts qui portent un tag, via l'index de prompt_tags.
+        
+        Contrairement à une recherche LIKE sur la colonne tags, "api" ne
+        trouve pas les prompts tagués "rapide".
+        
+        Args:
+            tag: Tag recherché (casse et espaces ignorés)
+            prefix: Accepter aussi les tags qui commencent par tag
+            
+        Returns:
+            Liste de PromptSummary (sans extrait), triée comme list_prompts
+        """
+        name = normalize_tag(tag)
+        if not name:
+            return []
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        where, params = _tag_name_filter(name, prefix)
+        cursor.execute(f"""
+            SELECT p.id, p.title, p.category, p.usage_count, NULL
+            FROM prompts p
+            WHERE p.id IN (
+                SELECT pt.prompt_id FROM tags
+                JOIN prompt_tags pt ON pt.tag_id = tags.id
+                WHERE {where}
+            )
+            ORDER BY p.usage_count DESC, p.created_at DESC
+        """, params)
+        
+        summaries = [PromptSummary(*row) for row in cursor.fetchall()]
+        return self._merge_pending_usage(summaries, 3, resort=True)
+    
+    def import_prompts(self, records: Iterable[Dict],
+                       chunk_size: int = IMPORT_CHUNK_SIZE) -> Tuple[int, int]:
+        """
+        Importe des prompts en masse, par transactions de chunk_size lignes.
+        
+        Les prompts dont le couple titre + contenu existe déjà (en base ou plus
+        tôt dans l'import) sont ignorés, ainsi que ceux sans titre ou contenu.
+        Les enregistrements sont consommés au fil de l'eau : seule une empreinte
+        de 16 octets par prompt est gardée en mémoire pour le dédoublonnage.
+        Les lignes dont usage_count n'est pas un entier sont ignorées et
+        signalées, sans interrompre l'import.
+        
+        Args:
+            records: Dicts avec title, content et optionnellement category,
+                tags, usage_count et created_at (voir read_prompt_records)
+            chunk_size: Nombre de lignes insérées par transaction
+            
+        Returns:
+            Tuple (prompts importés, prompts ignorés)
+        """
+        conn = self.get_connection()
+        
+        seen = {_dedup_key(title, content)
+                for title, content in conn.execute("SELECT title, content FROM prompts")}
+        
+        imported = skipped = 0
+        batch = []
+        
+        def insert_batch():
+            # Le gestionnaire de contexte valide le lot, ou l'annule en cas d'erreur
+            with conn:
+                conn.executemany("""
+                    INSERT INTO prompts (title, content, category, tags, usage_count, created_at)
+                    VALUES (?, ?, ?, ?, ?, COALESCE(?, CURRENT_TIMESTAMP))
+                """, batch)
+        
+        for line_number, record in enumerate(records, 1):
+            title, content = record.get("title"), record.get("content")
+            key = _dedup_key(title, content) if title and content else None
+            if key is None or key in seen:
+                skipped += 1
+                continue
+            
+            # Une ligne invalide est ignorée plutôt que d'interrompre l'import
+            # alors que les lots précédents sont déjà validés
+            try:
+                usage_count = int(record.get("usage_count") or 0)
+            except (TypeError, ValueError):
+                print(f"⚠️ Ligne {line_number} ignorée : usage_count invalide "
+                      f"({record.get('usage_count')!r})")
+                skipped += 1
+                continue
+            seen.add(key)
+            
+            # Les champs CSV vides arrivent sous forme de chaînes vides
+            batch.append((
+                title,
+                content,
+                record.get("category") or None,
+                record.get("tags") or None,
+                usage_count,
+                record.get("created_at") or None,
+            ))
+            if len(batch) >= chunk_size:
+                insert_batch()
+                imported += len(batch)
+                batch = []
+        
+        if batch:
+            insert_batch()
+            imported += len(batch)
+        
+        if imported:
+            self._notify_change("imported")
+        print(f"✓ Import terminé : {imported} prompt(s) ajouté(s), {skipped} ignoré(s)")
+        return imported, skipped
+    
+    def iter_prompts(self, batch_size: int = IMPORT_CHUNK_SIZE,
+                     fields: Tuple[str, ...] = EXPORT_FIELDS, flush: bool = False) -> Iterator[Dict]:
+        """
+        Parcourt tous les prompts par lots, sans les charger tous en mémoire.
+        
+        Args:
+            batch_size: Nombre de lignes lues à chaque fetchmany
+            fields: Colonnes lues ("id" ou champs de EXPORT_FIELDS)
+            flush: Écrire d'abord les compteurs d'utilisation en attente, pour
+                que usage_count soit à jour (une transaction : à éviter sur le
+                thread de l'interface)
+            
+        Returns:
+            Générateur de dicts (clés : fields), dans l'ordre des IDs
+        """
+        unknown = [field for field in fields if field != "id" and field not in EXPORT_FIELDS]
+        if unknown:
+            raise ValueError(f"Champs inconnus : {', '.join(unknown)}")
+        
+        if flush:
+            self.flush_usage()
+        
+        cursor = self.get_connection().cursor()
+        cursor.execute(f"SELECT {', '.join(fields)} FROM prompts ORDER BY id")
+        try:
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                for row in rows:
+                    yield dict(zip(fields, row))
+        finally:
+            cursor.close()
+    
+    def export_prompts(self, stream: TextIO, fmt: str = "jsonl") -> int:
+        """
+        Écrit tous les prompts dans un flux texte, au fil de la lecture.
+        
+        Args:
+            stream: Fichier texte ouvert en écriture (newline='' pour le CSV)
+            fmt: "jsonl" ou "csv"
+            
+        Returns:
+            Nombre de prompts exportés
+        """
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"Format inconnu : {fmt} (attendu : {', '.join(EXPORT_FORMATS)})")
+        
+        count = 0
+        if fmt == "csv":
+            writer = csv.DictWriter(stream, fieldnames=EXPORT_FIELDS)
+            writer.writeheader()
+            # Les compteurs en attente doivent figurer dans l'export
+            for record in self.iter_prompts(flush=True):
+                writer.writerow(record)
+                count += 1
+        else:
+            for record in self.iter_prompts(flush=True):
+                stream.write(json.dumps(record, ensure_ascii=False) + "\n")
+                count += 1
+        return count
 
 
 # Fonction pratique pour les tests
@@ -302,10 +1422,9 @@ def populate_sample_data():
         }
     ]
     
-    for prompt in sample_prompts:
-        db.add_prompt(**prompt)
+    imported, _ = db.import_prompts(sample_prompts)
     
-    print(f"\n✓ {len(sample_prompts)} prompts d'exemple ajoutés !")
+    print(f"\n✓ {imported} prompts d'exemple ajoutés !")
 
 
 if __name__ == "__main__":
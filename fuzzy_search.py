@@ -0,0 +1,527 @@
+"""
+Recherche approximative (tolérante aux fautes de frappe) pour PromptMaster.
+"pyhton" retrouve "Python", "emial" retrouve "Email".
+
+Les mots du titre, des tags et de la catégorie des prompts sont indexés par
+trigrammes. Chaque mot de la requête est comparé aux seuls mots du
+vocabulaire qui partagent assez de trigrammes avec lui, par une distance
+d'édition calculée bit à bit (un mot court, qui peut ne partager aucun
+trigramme avec un mot à une faute près, est cherché en parcourant les débuts
+de mots du vocabulaire trié) ; les prompts sont ensuite classés d'après la
+qualité de leurs correspondances.
+
+Le vocabulaire est bien plus petit que la bibliothèque (les prompts partagent
+leurs mots) : une recherche prend quelques millisecondes à 100 000 prompts
+(voir benchmarks/bench_fuzzy_search.py).
+"""
+
+import heapq
+import threading
+from bisect import bisect_left, insort
+from collections import Counter, OrderedDict, namedtuple
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from database import PromptSummary
+from search_session import tokenize
+
+
+# Début de mot dans les trigrammes : "py" donne "$$p" et "$py"
+TRIGRAM_PADDING = "$$"
+
+# Mots de la requête plus courts ignorés : une lettre seule est le début
+# d'une bonne partie du vocabulaire
+MIN_TERM_LENGTH = 2
+
+# Fautes tolérées selon la longueur du mot saisi : aucune en dessous de 4 lettres
+MAX_TYPOS = ((4, 1), (8, 2))
+
+# Bonus quand le mot saisi est un mot entier du prompt (et pas seulement un préfixe)
+WHOLE_WORD_BONUS = 0.25
+
+# Mots de requête dont les correspondances sont gardées en cache
+TERM_CACHE_SIZE = 256
+
+# Trigrammes communs exigés d'un mot candidat, au minimum : un seul (la
+# première lettre, par exemple) retiendrait une bonne partie du vocabulaire.
+# En dessous, prefix_matches parcourt les débuts de mots du vocabulaire
+MIN_SHARED_TRIGRAMS = 2
+
+# Au-delà de ce nombre de prompts trouvés, le classement part des scores
+# distincts (peu nombreux) au lieu de trier tous les prompts
+RANK_THRESHOLD_MIN = 2000
+
+# Un mot de la requête est vérifié prompt par prompt sur les candidats déjà
+# retenus quand ses prompts sont plus de CANDIDATE_CHECK_RATIO fois plus nombreux
+CANDIDATE_CHECK_RATIO = 10
+
+# Prompt indexé : mots normalisés du titre, des tags et de la catégorie
+FuzzyPrompt = namedtuple("FuzzyPrompt", ["title", "category", "words", "usage_count"])
+
+# Mots du vocabulaire qui correspondent à un mot de la requête avec la même
+# qualité : mot -> prompts, et somme des tailles (majorant du nombre de prompts)
+QualityTier = namedtuple("QualityTier", ["quality", "words", "size"])
+
+
+def fuzzy_terms(query: str) -> List[str]:
+    """Mots de la requête pris en compte (normalisés, sans doublon ni mot trop court)."""
+    return [term for term in dict.fromkeys(tokenize(query)) if len(term) >= MIN_TERM_LENGTH]
+
+
+def max_typos(term: str) -> int:
+    """Nombre de fautes tolérées pour un mot de la requête."""
+    typos = 0
+    for length, allowed in MAX_TYPOS:
+        if len(term) >= length:
+            typos = allowed
+    return typos
+
+
+def trigrams(word: str) -> Set[str]:
+    """Trigrammes d'un mot normalisé, début de mot compris."""
+    padded = TRIGRAM_PADDING + word
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def prefix_distance(term: str, word: str, limit: Optional[int] = None) -> int:
+    """
+    Distance d'édition entre term et le plus proche début de word.
+
+    Insertions, suppressions, substitutions et inversions de deux lettres
+    voisines ("emial" → "email") comptent chacune pour une faute (distance de
+    Damerau-Levenshtein restreinte).
+
+    Args:
+        term: Mot saisi
+        word: Mot du prompt
+        limit: Distance au-delà de laquelle le résultat exact importe peu
+            (seuls les len(term) + limit premiers caractères de word sont lus)
+
+    Returns:
+        La distance minimale entre term et word[:j], pour tout j
+    """
+    return prefix_distances(term, [word], limit)[0]
+
+
+def prefix_distances(term: str, words: List[str], limit: Optional[int] = None) -> List[int]:
+    """
+    prefix_distance de term à chacun des mots d'une liste.
+
+    Calcul bit à bit (Hyyrö) : une colonne de la matrice de programmation
+    dynamique par caractère, en quelques opérations sur des entiers. L'état
+    après chaque caractère est gardé : un mot qui commence comme le
+    précédent reprend le calcul là où leurs débuts divergent (d'où l'intérêt
+    de trier la liste).
+
+    Returns:
+        Les distances, dans l'ordre de words
+    """
+    m = len(term)
+    if m == 0:
+        return [0] * len(words)
+    masks: Dict[str, int] = {}
+    for i, char in enumerate(term):
+        masks[char] = masks.get(char, 0) | (1 << i)
+
+    full = (1 << m) - 1
+    high = 1 << (m - 1)
+    # États (vp, vn, d0, previous_eq, score, best) après 0, 1, 2... caractères
+    states = [(full, 0, 0, 0, m, m)]
+    previous = ""
+    distances = []
+    for word in words:
+        if limit is not None:
+            word = word[:m + limit]
+        common = 0
+        for a, b in zip(previous, word):
+            if a != b:
+                break
+            common += 1
+        del states[common + 1:]
+        vp, vn, d0, previous_eq, score, best = states[common]
+
+        for char in word[common:]:
+            eq = masks.get(char, 0)
+            transposition = (((~d0) & eq) << 1) & previous_eq
+            d0 = ((((eq & vp) + vp) ^ vp) | eq | vn | transposition) & full
+            hp = vn | (~(d0 | vp) & full)
+            hn = vp & d0
+            if hp & high:
+                score += 1
+            elif hn & high:
+                score -= 1
+            # Première ligne D[0][j] = j : chaque colonne ajoute 1 en haut
+            hp = ((hp << 1) | 1) & full
+            hn = (hn << 1) & full
+            vp = hn | (~(d0 | hp) & full)
+            vn = d0 & hp
+            previous_eq = eq
+            if score < best:
+                best = score
+            states.append((vp, vn, d0, previous_eq, score, best))
+
+        distances.append(best)
+        previous = word
+    return distances
+
+
+def prefix_matches(term: str, vocabulary: List[str], limit: int) -> Dict[str, int]:
+    """
+    Mots d'une liste triée dont le début est à au plus limit fautes de term
+    (même distance que prefix_distance).
+
+    Les débuts de mots sont parcourus comme un arbre de préfixes (les mots
+    qui partagent un préfixe sont contigus dans la liste triée) ; une branche
+    est abandonnée dès que toute la ligne de distances dépasse limit. Sert
+    aux mots trop courts pour que les trigrammes garantissent un candidat.
+
+    Returns:
+        Dictionnaire mot -> distance
+    """
+    m = len(term)
+    matches: Dict[str, int] = {}
+
+    def visit(depth: int, lo: int, hi: int, previous: Optional[List[int]], row: List[int],
+              last_char: str, best: int):
+        # vocabulary[lo:hi] : mots qui commencent par le même préfixe de
+        # longueur depth ; row[i] = distance entre term[:i] et ce préfixe
+        if min(row) > limit or depth == m + limit:
+            if best <= limit:
+                matches.update((word, best) for word in vocabulary[lo:hi])
+            return
+        while lo < hi and len(vocabulary[lo]) == depth:
+            if best <= limit:
+                matches[vocabulary[lo]] = best
+            lo += 1
+        while lo < hi:
+            char = vocabulary[lo][depth]
+            end = bisect_left(vocabulary, vocabulary[lo][:depth] + chr(ord(char) + 1), lo, hi)
+            new = [row[0] + 1]
+            for i in range(1, m + 1):
+                value = min(row[i] + 1, new[i - 1] + 1, row[i - 1] + (term[i - 1] != char))
+                if i > 1 and previous is not None and term[i - 1] == last_char and term[i - 2] == char:
+                    value = min(value, previous[i - 2] + 1)  # Inversion de deux lettres voisines
+                new.append(value)
+            visit(depth + 1, lo, end, row, new, char, min(best, new[m]))
+            lo = end
+
+    visit(0, 0, len(vocabulary), None, list(range(m + 1)), "", m)
+    return matches
+
+
+class FuzzyIndex:
+    """
+    Index de trigrammes des mots des prompts.
+
+    Un prompt correspond à la requête si chaque mot saisi (voir fuzzy_terms)
+    est, à max_typos fautes près, le début d'un de ses mots. Score d'un
+    prompt : somme, pour chaque mot saisi, de (len - fautes) / len, plus
+    WHOLE_WORD_BONUS pour un mot entier ; à égalité, le plus utilisé puis le
+    plus récent d'abord.
+
+    Les méthodes peuvent être appelées depuis plusieurs threads.
+    """
+
+    def __init__(self, term_cache_size: int = TERM_CACHE_SIZE):
+        """
+        Initialise un index vide (voir load).
+
+        Args:
+            term_cache_size: Nombre de mots de requête dont les correspondances
+                sont gardées en cache
+        """
+        self.term_cache_size = term_cache_size
+        self._lock = threading.Lock()
+        self._prompts: Dict[int, FuzzyPrompt] = {}
+        self._by_word: Dict[str, Set[int]] = {}        # mot -> prompts
+        self._by_trigram: Dict[str, Set[str]] = {}     # trigramme -> mots
+        self._vocabulary: List[str] = []               # mots triés (préfixes exacts)
+        # (-usage_count, -id) trié : les prompts les plus utilisés en tête
+        self._usage_order: List[Tuple[int, int]] = []
+        # mot saisi -> [(mot du vocabulaire, qualité)], vidé à chaque changement de vocabulaire
+        self._term_matches: "OrderedDict[str, List[Tuple[str, float]]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._prompts)
+
+    def load(self, rows: Iterable[Tuple]):
+        """
+        Remplace le contenu de l'index.
+
+        Args:
+            rows: Tuples (id, title, category, tags, usage_count),
+                par exemple DatabaseManager.get_prompt_metadata()
+        """
+        with self._lock:
+            self._prompts.clear()
+            self._by_word.clear()
+            self._by_trigram.clear()
+            self._term_matches.clear()
+            self._usage_order = []
+            for prompt_id, title, category, tags, usage_count in rows:
+                words = self._words(title, category, tags)
+                self._prompts[prompt_id] = FuzzyPrompt(title, category, words, usage_count)
+                self._usage_order.append((-usage_count, -prompt_id))
+                for word in words:
+                    self._by_word.setdefault(word, set()).add(prompt_id)
+            self._usage_order.sort()
+            for word in self._by_word:
+                for trigram in trigrams(word):
+                    self._by_trigram.setdefault(trigram, set()).add(word)
+            self._vocabulary = sorted(self._by_word)
+
+    def upsert(self, prompt_id: int, title: str, category: Optional[str],
+               tags: Optional[str], usage_count: int):
+        """Ajoute un prompt ou remplace sa version indexée."""
+        words = self._words(title, category, tags)
+        with self._lock:
+            self._unindex(prompt_id)
+            self._prompts[prompt_id] = FuzzyPrompt(title, category, words, usage_count)
+            insort(self._usage_order, (-usage_count, -prompt_id))
+            for word in words:
+                prompt_ids = self._by_word.get(word)
+                if prompt_ids is None:
+                    prompt_ids = self._by_word[word] = set()
+                    for trigram in trigrams(word):
+                        self._by_trigram.setdefault(trigram, set()).add(word)
+                    insort(self._vocabulary, word)
+                    self._term_matches.clear()
+                prompt_ids.add(prompt_id)
+
+    def remove(self, prompt_id: int):
+        """Retire un prompt de l'index (sans effet s'il est absent)."""
+        with self._lock:
+            self._unindex(prompt_id)
+
+    def add_usage(self, prompt_id: int, delta: int = 1):
+        """Met à jour le compteur d'utilisation d'un prompt indexé."""
+        with self._lock:
+            prompt = self._prompts.get(prompt_id)
+            if prompt is None:
+                return
+            self._remove_usage_key(prompt_id, prompt.usage_count)
+            usage_count = prompt.usage_count + delta
+            self._prompts[prompt_id] = prompt._replace(usage_count=usage_count)
+            insort(self._usage_order, (-usage_count, -prompt_id))
+
+    def search(self, query: str, limit: int = 50) -> List[PromptSummary]:
+        """
+        Recherche approximative.
+
+        Args:
+            query: Mots recherchés (fautes de frappe tolérées)
+            limit: Nombre maximum de résultats
+
+        Returns:
+            Liste de PromptSummary (snippet à None), du meilleur au moins bon
+        """
+        terms = fuzzy_terms(query)
+        if not terms or limit <= 0:
+            return []
+
+        with self._lock:
+            # Les mots les plus sélectifs d'abord : l'intersection rétrécit vite
+            per_term = sorted((self._tiers(term) for term in terms),
+                              key=lambda tiers: sum(tier.size for tier in tiers))
+            if len(per_term) == 1:
+                best = self._best_in_tiers(per_term[0], limit)
+            else:
+                scores = self._qualities(per_term[0])
+                for tiers in per_term[1:]:
+                    if not scores:
+                        return []
+                    scores = self._add_term(scores, tiers)
+                best = self._best(scores, limit)
+
+            prompts = self._prompts
+            return [PromptSummary(prompt_id, prompts[prompt_id].title, prompts[prompt_id].category,
+                                  prompts[prompt_id].usage_count, None)
+                    for prompt_id in best]
+
+    # --- Appelées avec le verrou ---
+
+    def _best(self, scores: Dict[int, float], limit: int) -> List[int]:
+        """
+        IDs des limit meilleurs prompts, par (score, usage_count, id) décroissants.
+
+        Les scores ne prennent que quelques valeurs distinctes : le seuil du
+        limit-ième score est trouvé en les comptant, et seuls les ex æquo à
+        ce seuil sont départagés par l'usage.
+        """
+        prompts = self._prompts
+
+        def rank_key(prompt_id):
+            return scores[prompt_id], prompts[prompt_id].usage_count, prompt_id
+
+        if len(scores) <= RANK_THRESHOLD_MIN:
+            return heapq.nlargest(limit, scores, key=rank_key)
+
+        counts = Counter(scores.values())
+        remaining = limit
+        for threshold in sorted(counts, reverse=True):
+            remaining -= counts[threshold]
+            if remaining <= 0:
+                break
+        best = sorted((prompt_id for prompt_id, score in scores.items() if score > threshold),
+                      key=rank_key, reverse=True)
+        needed = limit - len(best)
+
+        if needed * len(self._usage_order) <= counts[threshold] ** 2:
+            # Nombreux ex æquo : parcourir l'ordre d'usage global (environ
+            # needed × len / ex æquo lignes) coûte moins que les trier
+            for _, negative_id in self._usage_order:
+                if needed <= 0:
+                    break
+                if scores.get(-negative_id) == threshold:
+                    best.append(-negative_id)
+                    needed -= 1
+        else:
+            best.extend(heapq.nlargest(
+                needed, (prompt_id for prompt_id, score in scores.items() if score == threshold),
+                key=rank_key))
+        return best
+
+    def _best_in_tiers(self, tiers: List[QualityTier], limit: int) -> List[int]:
+        """
+        IDs des limit meilleurs prompts d'une requête d'un seul mot.
+
+        Le score d'un prompt est la qualité de son meilleur palier : les
+        paliers sont pris du meilleur au moins bon, chacun trié par usage.
+        Un palier très peuplé ("st" au début de milliers de mots) n'est pas
+        construit : l'ordre d'usage global est parcouru jusqu'à en trouver
+        assez (environ needed × len / taille du palier lignes).
+        """
+        prompts = self._prompts
+        best: List[int] = []
+        chosen: Set[int] = set()
+        for tier in tiers:
+            needed = limit - len(best)
+            if needed <= 0:
+                break
+            if needed * len(self._usage_order) <= tier.size ** 2:
+                words = tier.words.keys()
+                for _, negative_id in self._usage_order:
+                    prompt_id = -negative_id
+                    if prompt_id not in chosen and not words.isdisjoint(prompts[prompt_id].words):
+                        best.append(prompt_id)
+                        chosen.add(prompt_id)
+                        needed -= 1
+                        if needed == 0:
+                            break
+            else:
+                candidates = set().union(*tier.words.values()) - chosen
+                tier_best = heapq.nlargest(needed, candidates, key=lambda prompt_id: (
+                    prompts[prompt_id].usage_count, prompt_id))
+                best.extend(tier_best)
+                chosen.update(tier_best)
+        return best
+
+    def _add_term(self, scores: Dict[int, float], tiers: List[QualityTier]) -> Dict[int, float]:
+        """Ajoute aux scores la qualité d'un mot de plus ; les prompts sans correspondance sont écartés."""
+        if len(scores) * CANDIDATE_CHECK_RATIO < sum(tier.size for tier in tiers):
+            # Peu de candidats : chercher leurs mots parmi ceux du palier
+            quality_of = {word: tier.quality for tier in tiers for word in tier.words}
+            prompts = self._prompts
+            combined = {}
+            for prompt_id, score in scores.items():
+                quality = max((quality_of[word] for word in prompts[prompt_id].words if word in quality_of),
+                              default=None)
+                if quality is not None:
+                    combined[prompt_id] = score + quality
+            return combined
+
+        qualities = self._qualities(tiers)
+        return {prompt_id: scores[prompt_id] + qualities[prompt_id]
+                for prompt_id in scores.keys() & qualities.keys()}
+
+    @staticmethod
+    def _qualities(tiers: List[QualityTier]) -> Dict[int, float]:
+        """Meilleure qualité de correspondance de chaque prompt qui en a une."""
+        qualities: Dict[int, float] = {}
+        # Du moins bon au meilleur palier : la meilleure qualité d'un prompt l'emporte
+        for tier in reversed(tiers):
+            qualities.update(dict.fromkeys(set().union(*tier.words.values()), tier.quality))
+        return qualities
+
+    def _tiers(self, term: str) -> List[QualityTier]:
+        """Paliers de qualité des correspondances de term, du meilleur au moins bon."""
+        by_quality: Dict[float, Dict[str, Set[int]]] = {}
+        for word, quality in self._matching_words(term):
+            prompt_ids = self._by_word.get(word)
+            if prompt_ids:
+                by_quality.setdefault(quality, {})[word] = prompt_ids
+        return [QualityTier(quality, words, sum(len(prompt_ids) for prompt_ids in words.values()))
+                for quality, words in sorted(by_quality.items(), key=lambda item: -item[0])]
+
+    def _matching_words(self, term: str) -> List[Tuple[str, float]]:
+        """Mots du vocabulaire dont le début est à max_typos(term) fautes de term."""
+        matches = self._term_matches.get(term)
+        if matches is not None:
+            self._term_matches.move_to_end(term)
+            return matches
+
+        typos = max_typos(term)
+        if typos == 0:
+            # Mot court : début exact, trouvé par dichotomie dans le vocabulaire
+            first = bisect_left(self._vocabulary, term)
+            last = bisect_left(self._vocabulary, term[:-1] + chr(ord(term[-1]) + 1))
+            candidates = {word: 0 for word in self._vocabulary[first:last]}
+        else:
+            # Une faute détruit au plus 4 trigrammes du mot saisi (inversion)
+            term_trigrams = trigrams(term)
+            min_shared = len(term_trigrams) - 4 * typos
+            if min_shared < MIN_SHARED_TRIGRAMS:
+                # Mot court ("ptyh") : trop peu de trigrammes communs garantis
+                candidates = prefix_matches(term, self._vocabulary, typos)
+            else:
+                shared = Counter()
+                for trigram in term_trigrams:
+                    shared.update(self._by_trigram.get(trigram, ()))
+                words = sorted(word for word, count in shared.items() if count >= min_shared)
+                candidates = {word: distance
+                              for word, distance in zip(words, prefix_distances(term, words, typos))
+                              if distance <= typos}
+
+        length = len(term)
+        matches = sorted(
+            ((word, (length - distance) / length + (WHOLE_WORD_BONUS if word == term else 0))
+             for word, distance in candidates.items()),
+            key=lambda match: -match[1])
+
+        self._term_matches[term] = matches
+        while len(self._term_matches) > self.term_cache_size:
+            self._term_matches.popitem(last=False)
+        return matches
+
+    def _unindex(self, prompt_id: int):
+        """Retire un prompt des index ; les mots qui n'ont plus de prompt sont oubliés."""
+        prompt = self._prompts.pop(prompt_id, None)
+        if prompt is None:
+            return
+        self._remove_usage_key(prompt_id, prompt.usage_count)
+        for word in prompt.words:
+            prompt_ids = self._by_word.get(word)
+            if prompt_ids is None:
+                continue
+            prompt_ids.discard(prompt_id)
+            if not prompt_ids:
+                del self._by_word[word]
+                for trigram in trigrams(word):
+                    words = self._by_trigram.get(trigram)
+                    if words is not None:
+                        words.discard(word)
+                        if not words:
+                            del self._by_trigram[trigram]
+                del self._vocabulary[bisect_left(self._vocabulary, word)]
+                self._term_matches.clear()
+
+    def _remove_usage_key(self, prompt_id: int, usage_count: int):
+        """Retire un prompt de la liste triée par usage."""
+        key = (-usage_count, -prompt_id)
+        position = bisect_left(self._usage_order, key)
+        if position < len(self._usage_order) and self._usage_order[position] == key:
+            del self._usage_order[position]
+
+    @staticmethod
+    def _words(title: str, category: Optional[str], tags: Optional[str]) -> frozenset:
+        """Mots normalisés indexés pour un prompt."""
+        return frozenset(tokenize(f"{title or ''} {tags or ''} {category or ''}"))
@@ -10,14 +10,23 @@ from PySide6.QtGui import QIcon
 
 from qfluentwidgets import (
     FluentWindow, NavigationItemPosition, FluentIcon,
-    SearchLineEdit, ListWidget, PushButton, TextEdit,
+    SearchLineEdit, ListView, PushButton, TextEdit,
     LineEdit, ComboBox, EditableComboBox, MessageBoxBase, BodyLabel, SubtitleLabel,
     TitleLabel, CaptionLabel, PrimaryPushButton, TransparentPushButton,
     setTheme, Theme, isDarkTheme, setThemeColor, SplitFluentWindow,
-    InfoBar, InfoBarPosition, CardWidget, ScrollArea
+    InfoBar, InfoBarPosition, CardWidget, ScrollArea, ToggleButton
 )
 
-from database import DatabaseManager
+from database import DatabaseManager, SNIPPET_LENGTH, content_digest
+from search_session import (SearchSession, FUZZY_PREFIX, SEMANTIC_PREFIX, SEMANTIC_BUILDING_HINT,
+                            SEMANTIC_REFRESH_MS, fuzzy_query)
+from search_worker import SearchExecutor
+from prompt_list_model import PromptListModel
+from context_manager import ContextManager
+from prompt_templates import TemplateEngine, context_fills
+
+# Libellé du contenu dans l'aperçu, suivi des variables du prompt s'il en a
+CONTENT_HINT = "Contenu • Édition automatique"
 
 
 class PromptMasterWindow(FluentWindow):
@@ -26,7 +35,24 @@ class PromptMasterWindow(FluentWindow):
     def __init__(self):
         super().__init__()
         self.db = DatabaseManager()
+        self.search_session = SearchSession(self.db)
+        self.search_executor = SearchExecutor(self.search_session.search, self.db, parent=self)
+        self.search_executor.results_ready.connect(self.on_search_results)
+        # Arrêter la recherche en arrière-plan puis fermer les connexions SQLite
+        QApplication.instance().aboutToQuit.connect(self.search_executor.shutdown)
+        QApplication.instance().aboutToQuit.connect(self.db.close)
         self.current_prompts = []
+        self.editor_dialog = None  # Construit au premier besoin puis réutilisé
+        # Modèles compilés des prompts à variables ([PRODUIT], [SUJET]...),
+        # remplis à la copie d'après la fenêtre active à l'affichage
+        self.templates = TemplateEngine(self.db)
+        self.context_manager = ContextManager(self.db)
+        self.current_context = None
+        
+        # Liste préchargée gardée d'un affichage à l'autre : rechargée
+        # seulement si la base a changé entre-temps
+        self._library_dirty = False
+        self.db.add_change_listener(self._on_library_changed)
         
         self.init_ui()
         self.init_navigation()
@@ -89,7 +115,18 @@ class PromptMasterWindow(FluentWindow):
         self.search_input.textChanged.connect(self.on_search)
         self.search_input.returnPressed.connect(self.on_enter_pressed)
         self.search_input.setFixedHeight(45)
-        layout.addWidget(self.search_input)
+        
+        # Bascule de la recherche approximative (tolérante aux fautes de frappe)
+        self.fuzzy_button = ToggleButton("≈ Approx.")
+        self.fuzzy_button.setFixedHeight(45)
+        self.fuzzy_button.setToolTip(f"Recherche approximative, tolérante aux fautes de frappe "
+                                     f"(ou commencez la saisie par {FUZZY_PREFIX})")
+        self.fuzzy_button.toggled.connect(lambda checked: self.on_search(self.search_input.text()))
+        
+        search_layout = QHBoxLayout()
+        search_layout.addWidget(self.search_input)
+        search_layout.addWidget(self.fuzzy_button)
+        layout.addLayout(search_layout)
         
         # Conteneur pour liste et prévisualisation
         content_layout = QHBoxLayout()
@@ -100,9 +137,13 @@ class PromptMasterWindow(FluentWindow):
         list_layout = QVBoxLayout(list_card)
         list_layout.setContentsMargins(5, 5, 5, 5)
         
-        self.results_list = ListWidget()
+        # Modèle virtualisé : seules les lignes visibles sont dessinées
+        self.prompt_model = PromptListModel(separator="  •  ", parent=self)
+        self.results_list = ListView()
         self.results_list.setAlternatingRowColors(True)
-        self.results_list.currentItemChanged.connect(self.on_selection_changed)
+        self.results_list.setUniformItemSizes(True)
+        self.results_list.setModel(self.prompt_model)
+        self.results_list.selectionModel().currentChanged.connect(self.on_selection_changed)
         list_layout.addWidget(self.results_list)
         
         content_layout.addWidget(list_card, 4)
@@ -134,7 +175,7 @@ class PromptMasterWindow(FluentWindow):
         cat_layout.addWidget(cat_hint)
         self.preview_category = LineEdit()
         self.preview_category.setPlaceholderText("Catégorie...")
-        self.preview_category.textChanged.connect(self.on_meta_changed)
+        self.preview_category.textChanged.connect(self.on_category_changed)
         cat_layout.addWidget(self.preview_category)
         meta_layout.addLayout(cat_layout)
         
@@ -144,16 +185,16 @@ class PromptMasterWindow(FluentWindow):
         tags_layout.addWidget(tags_hint)
         self.preview_tags = LineEdit()
         self.preview_tags.setPlaceholderText("tag1, tag2...")
-        self.preview_tags.textChanged.connect(self.on_meta_changed)
+        self.preview_tags.textChanged.connect(self.on_tags_changed)
         tags_layout.addWidget(self.preview_tags)
         meta_layout.addLayout(tags_layout)
         
         preview_layout.addLayout(meta_layout)
         
         # Contenu (éditable)
-        content_hint = CaptionLabel("Contenu • Édition automatique")
-        content_hint.setStyleSheet("color: #8be9fd;")
-        preview_layout.addWidget(content_hint)
+        self.content_hint = CaptionLabel(CONTENT_HINT)
+        self.content_hint.setStyleSheet("color: #8be9fd;")
+        preview_layout.addWidget(self.content_hint)
         
         self.preview_content = TextEdit()
         self.preview_content.setReadOnly(False)
@@ -166,10 +207,11 @@ class PromptMasterWindow(FluentWindow):
         layout.addLayout(content_layout, 1)
         
         # Footer
-        footer = CaptionLabel("↵ Copier | Del Supprimer | ↑↓ Naviguer | Échap Fermer • 💾 Sauvegarde automatique")
-        footer.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        footer.setStyleSheet("color: #6272a4;")
-        layout.addWidget(footer)
+        self.footer_hint = "↵ Copier | Del Supprimer | ↑↓ Naviguer | Échap Fermer • 💾 Sauvegarde automatique"
+        self.footer = CaptionLabel(self.footer_hint)
+        self.footer.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.footer.setStyleSheet("color: #6272a4;")
+        layout.addWidget(self.footer)
         
         # Variables pour l'autosave
         self.current_prompt_id = None
@@ -177,6 +219,9 @@ class PromptMasterWindow(FluentWindow):
         self.autosave_timer.setSingleShot(True)
         self.autosave_timer.timeout.connect(self.save_current_prompt)
         self.is_loading = False  # Flag pour éviter les sauvegardes pendant le chargement
+        self.dirty_fields = set()  # Champs modifiés depuis la dernière sauvegarde
+        self.saved_values = {}  # Titre, catégorie et tags tels qu'enregistrés
+        self.saved_content_digest = None  # Empreinte du contenu tel qu'enregistré
         
         # Ajouter à la fenêtre en tant que widget central
         self.search_interface.setObjectName("searchInterface")
@@ -191,54 +236,76 @@ class PromptMasterWindow(FluentWindow):
     
     def load_all_prompts(self):
         """Charge tous les prompts."""
-        all_prompts = self.db.get_all_prompts()
+        all_prompts = self.db.list_prompts()
         # Trier par usage décroissant puis par titre
-        self.current_prompts = sorted(all_prompts, key=lambda x: (-x[5], x[1].lower()))
+        self.current_prompts = sorted(all_prompts, key=lambda x: (-x.usage_count, x.title.lower()))
         self.update_results_list()
     
     def on_search(self, text: str):
-        """Gère la recherche en temps réel."""
-        if text.strip():
-            self.current_prompts = self.db.search_prompts(text)
+        """Gère la recherche en temps réel (exécutée en arrière-plan)."""
+        if text.strip(FUZZY_PREFIX + SEMANTIC_PREFIX + " "):
+            self.search_executor.request(fuzzy_query(text) if self.fuzzy_button.isChecked() else text)
         else:
+            self.search_executor.cancel()
             self.load_all_prompts()
+    
+    def on_search_results(self, query: str, results: list):
+        """Reçoit les résultats de la dernière recherche lancée."""
+        self.current_prompts = results
         self.update_results_list()
+        self.show_search_status(query)
+    
+    def show_search_status(self, query: str):
+        """Signale des résultats partiels et relance la recherche jusqu'à ce qu'ils soient complets."""
+        if self.search_session.is_partial(query):
+            self.footer.setText(SEMANTIC_BUILDING_HINT)
+            QTimer.singleShot(SEMANTIC_REFRESH_MS, lambda: self.refresh_partial_search(query))
+        else:
+            self.footer.setText(self.footer_hint)
+    
+    def refresh_partial_search(self, query: str):
+        """Relance une recherche aux résultats partiels si elle est toujours affichée."""
+        if self.isVisible() and self.search_input.text() == query:
+            self.search_executor.request(query)
+        else:
+            self.footer.setText(self.footer_hint)
     
     def update_results_list(self):
         """Met à jour la liste des résultats."""
-        self.results_list.clear()
-        
-        for prompt in self.current_prompts:
-            prompt_id, title, content, category, tags, usage_count = prompt
-            
-            display_text = f"{title}"
-            if category:
-                display_text += f"  •  {category}"
-            if usage_count > 0:
-                display_text += f"  •  ✨ {usage_count}"
-            
-            # Utiliser la méthode correcte de ListWidget de Fluent
-            self.results_list.addItem(display_text)
-            # Stocker l'ID dans une structure parallèle
-            if not hasattr(self, 'prompt_ids'):
-                self.prompt_ids = {}
-            self.prompt_ids[self.results_list.count() - 1] = prompt_id
+        self.prompt_model.set_prompts(self.current_prompts)
         
-        if self.results_list.count() > 0:
-            self.results_list.setCurrentRow(0)
+        if self.prompt_model.rowCount() > 0:
+            self.set_current_row(0)
+    
+    def set_current_row(self, row: int):
+        """Sélectionne une ligne (charge les lots suivants si besoin)."""
+        if row < 0 or not self.prompt_model.ensure_row_loaded(row):
+            return
+        index = self.prompt_model.index(row)
+        if self.results_list.currentIndex() == index:
+            # Mise à jour en place : currentChanged n'est pas émis, recharger l'éditeur
+            self.on_selection_changed(index, index)
+        else:
+            self.results_list.setCurrentIndex(index)
     
     def on_selection_changed(self, current, previous):
         """Gère le changement de sélection."""
-        if current:
-            row = self.results_list.row(current)
-            if hasattr(self, 'prompt_ids') and row in self.prompt_ids:
-                prompt_id = self.prompt_ids[row]
-                self.load_prompt_for_editing(prompt_id)
+        if current.isValid():
+            prompt_id = current.data(PromptListModel.PromptIdRole)
+            self.load_prompt_for_editing(prompt_id)
+            # Précharger les voisins : la navigation aux flèches ne touche plus le disque
+            self.db.prefetch_prompts(self.prompt_model.neighbour_ids(current.row()))
     
     def load_prompt_for_editing(self, prompt_id: int):
         """Charge un prompt pour édition inline."""
+        # Ne pas perdre une modification en attente de sauvegarde
+        if self.autosave_timer.isActive():
+            self.autosave_timer.stop()
+            self.save_current_prompt()
+        
         self.is_loading = True  # Bloquer l'autosave pendant le chargement
         self.current_prompt_id = prompt_id
+        self.dirty_fields.clear()
         
         prompt = self.db.get_prompt_by_id(prompt_id)
         
@@ -249,6 +316,11 @@ class PromptMasterWindow(FluentWindow):
             self.preview_category.setText(category or "")
             self.preview_tags.setText(tags or "")
             self.preview_content.setPlainText(content)
+            variables = self.templates.get(prompt_id, content).variables
+            self.content_hint.setText(f"{CONTENT_HINT} • 🧩 {', '.join(variables)}" if variables else CONTENT_HINT)
+            self.saved_values = {'title': title.strip(), 'category': (category or "").strip(),
+                                 'tags': (tags or "").strip()}
+            self.saved_content_digest = content_digest(content.strip())
             
             # Réactiver l'autosave après chargement
             QTimer.singleShot(100, lambda: setattr(self, 'is_loading', False))
@@ -259,70 +331,100 @@ class PromptMasterWindow(FluentWindow):
         """Efface la prévisualisation."""
         self.is_loading = True
         self.current_prompt_id = None
+        self.dirty_fields.clear()
         self.preview_title.clear()
         self.preview_category.clear()
         self.preview_tags.clear()
         self.preview_content.clear()
+        self.content_hint.setText(CONTENT_HINT)
         self.is_loading = False
     
+    def mark_dirty(self, field: str, delay_ms: int):
+        """Note un champ modifié et relance le délai d'autosave."""
+        if not self.is_loading and self.current_prompt_id:
+            self.dirty_fields.add(field)
+            self.autosave_timer.start(delay_ms)
+    
     def on_title_changed(self):
         """Déclenche l'autosave quand le titre change."""
-        if not self.is_loading and self.current_prompt_id:
-            self.autosave_timer.start(1000)  # Sauvegarder après 1 seconde d'inactivité
+        self.mark_dirty('title', 1000)  # Sauvegarder après 1 seconde d'inactivité
     
-    def on_meta_changed(self):
-        """Déclenche l'autosave quand catégorie/tags changent."""
-        if not self.is_loading and self.current_prompt_id:
-            self.autosave_timer.start(1000)
+    def on_category_changed(self):
+        """Déclenche l'autosave quand la catégorie change."""
+        self.mark_dirty('category', 1000)
+    
+    def on_tags_changed(self):
+        """Déclenche l'autosave quand les tags changent."""
+        self.mark_dirty('tags', 1000)
     
     def on_content_changed(self):
         """Déclenche l'autosave quand le contenu change."""
-        if not self.is_loading and self.current_prompt_id:
-            self.autosave_timer.start(800)  # Plus rapide pour le contenu
+        self.mark_dirty('content', 800)  # Plus rapide pour le contenu
     
     def save_current_prompt(self):
-        """Sauvegarde automatique du prompt en cours d'édition."""
-        if not self.current_prompt_id or self.is_loading:
+        """
+        Sauvegarde automatique du prompt en cours d'édition.
+        
+        Seuls les champs modifiés et différents de la version enregistrée
+        sont écrits ; la ligne du prompt est mise à jour dans la liste sans
+        relancer la recherche.
+        """
+        if not self.current_prompt_id or self.is_loading or not self.dirty_fields:
             return
         
         title = self.preview_title.text().strip()
-        content = self.preview_content.toPlainText().strip()
-        category = self.preview_category.text().strip()
-        tags = self.preview_tags.text().strip()
-        
-        if not title or not content:
+        if not title:
             return
         
-        # Mettre à jour en base
-        self.db.update_prompt(
-            self.current_prompt_id,
-            title=title,
-            content=content,
-            category=category,
-            tags=tags
-        )
-        
-        # Mettre à jour la liste sans perdre la sélection
-        current_row = self.results_list.currentRow()
-        search_text = self.search_input.text()
-        
-        if search_text.strip():
-            self.current_prompts = self.db.search_prompts(search_text)
-        else:
-            self.load_all_prompts()
-        
-        self.update_results_list()
-        self.results_list.setCurrentRow(current_row)
+        changes = {}
+        for field in ('title', 'category', 'tags'):
+            if field in self.dirty_fields:
+                value = title if field == 'title' else getattr(self, f"preview_{field}").text().strip()
+                if value != self.saved_values.get(field):
+                    changes[field] = value
+        
+        digest = None
+        if 'content' in self.dirty_fields:
+            content = self.preview_content.toPlainText().strip()
+            if not content:
+                return
+            digest = content_digest(content)
+            if digest != self.saved_content_digest:
+                changes['content'] = content
+        
+        self.dirty_fields.clear()
+        if not changes:
+            return  # Saisie revenue à l'état enregistré
+        
+        # Mettre à jour en base (colonnes modifiées uniquement)
+        if not self.db.update_prompt(self.current_prompt_id, **changes):
+            return
+        self.saved_values.update((field, value) for field, value in changes.items() if field != 'content')
+        if 'content' in changes:
+            self.saved_content_digest = digest
+        
+        # Mettre à jour la seule ligne concernée, sans perdre la sélection
+        self.search_session.invalidate()
+        prompt = next((p for p in self.current_prompts if p.id == self.current_prompt_id), None)
+        if prompt is not None:
+            updated = prompt._replace(title=self.saved_values['title'],
+                                      category=self.saved_values['category'])
+            if 'content' in changes and prompt.snippet is not None:
+                updated = updated._replace(snippet=changes['content'][:SNIPPET_LENGTH])
+            self.prompt_model.replace_prompt(updated)
+            self.current_prompts = [updated if p.id == updated.id else p for p in self.current_prompts]
         
         # Feedback discret
-        print(f"💾 Sauvegardé : {title[:30]}...")
+        print(f"💾 Sauvegardé : {title[:30]}... ({', '.join(changes)})")
     
     def on_enter_pressed(self):
         """Copie le prompt sélectionné."""
         if self.current_prompt_id:
             prompt = self.db.get_prompt_by_id(self.current_prompt_id)
             if prompt:
-                content = prompt[2]
+                # Remplir les variables déduites du contexte ([APPLICATION], [FENETRE]...)
+                template = self.templates.get(self.current_prompt_id, prompt[2])
+                content = template.render(context_fills(template, context=self.current_context))
                 clipboard = QApplication.clipboard()
                 clipboard.setText(content)
                 
@@ -341,19 +443,22 @@ class PromptMasterWindow(FluentWindow):
                 QTimer.singleShot(500, self.hide)
     
     def show_add_dialog(self):
-        """Affiche le dialogue d'ajout."""
-        dialog = PromptEditorDialog(self, self.db)
-        if dialog.exec():
+        """Affiche le dialogue d'ajout (construit une fois puis réutilisé)."""
+        if self.editor_dialog is None:
+            self.editor_dialog = PromptEditorDialog(self, self.db)
+        else:
+            self.editor_dialog.reset()
+        if self.editor_dialog.exec():
+            self.search_session.invalidate()
             self.load_all_prompts()
             self.search_input.clear()
     
-    def delete_prompt_quick(self, item):
+    def delete_prompt_quick(self, index):
         """Supprime rapidement un prompt avec confirmation."""
         from qfluentwidgets import MessageBox
         
-        row = self.results_list.row(item)
-        if hasattr(self, 'prompt_ids') and row in self.prompt_ids:
-            prompt_id = self.prompt_ids[row]
+        prompt_id = index.data(PromptListModel.PromptIdRole)
+        if prompt_id is not None:
             prompt = self.db.get_prompt_by_id(prompt_id)
             
             if prompt:
@@ -370,6 +475,7 @@ class PromptMasterWindow(FluentWindow):
                 
                 if msg_box.exec():
                     self.db.delete_prompt(prompt_id)
+                    self.search_session.invalidate()
                     
                     InfoBar.success(
                         title="Succès",
@@ -397,35 +503,45 @@ class PromptMasterWindow(FluentWindow):
             self.hide()
         elif event.key() == Qt.Key.Key_Delete:
             # Supprimer le prompt sélectionné
-            current_item = self.results_list.currentItem()
-            if current_item:
-                self.delete_prompt_quick(current_item)
+            current_index = self.results_list.currentIndex()
+            if current_index.isValid():
+                self.delete_prompt_quick(current_index)
         elif event.key() == Qt.Key.Key_Down:
-            current_row = self.results_list.currentRow()
-            if current_row < self.results_list.count() - 1:
-                self.results_list.setCurrentRow(current_row + 1)
+            self.set_current_row(self.results_list.currentIndex().row() + 1)
         elif event.key() == Qt.Key.Key_Up:
-            current_row = self.results_list.currentRow()
-            if current_row > 0:
-                self.results_list.setCurrentRow(current_row - 1)
+            self.set_current_row(self.results_list.currentIndex().row() - 1)
         else:
             super().keyPressEvent(event)
     
     def showEvent(self, event):
         """Appelé quand la fenêtre s'affiche."""
         super().showEvent(event)
+        # Fenêtre encore au premier plan : celle depuis laquelle PromptMaster est appelé
+        self.context_manager.invalidate_context()
+        self.current_context = self.context_manager.get_active_window_info()
+        dirty, self._library_dirty = self._library_dirty, False
+        if dirty:
+            self.search_session.invalidate()
+        
         self.search_input.setFocus()
-        self.search_input.clear()
-        self.load_all_prompts()
+        if self.search_input.text():
+            self.search_input.clear()  # on_search("") réaffiche toute la liste
+        elif dirty:
+            self.load_all_prompts()
+    
+    def _on_library_changed(self, event: str, prompt_id):
+        """Note une modification de la base (appelé dans le thread qui l'a faite)."""
+        self._library_dirty = True
 
 
 class PromptEditorDialog(MessageBoxBase):
-    """Dialogue Fluent pour ajouter un prompt."""
+    """Dialogue Fluent pour ajouter un prompt (réutilisable, voir reset)."""
     
     def __init__(self, parent, db: DatabaseManager):
         super().__init__(parent)
         
         self.db = db
+        self._categories = None  # Liste affichée dans category_input
         
         # Titre du dialogue
         self.titleLabel = SubtitleLabel("➕ Nouveau Prompt")
@@ -461,8 +577,7 @@ class PromptEditorDialog(MessageBoxBase):
         self.viewLayout.addWidget(cat_label)
         
         self.category_input = EditableComboBox()
-        categories = [""] + self.db.get_categories() + ["Développement", "Marketing", "Rédaction", "Business", "Design", "Communication"]
-        self.category_input.addItems(list(dict.fromkeys(categories)))
+        self.load_categories()
         self.category_input.setPlaceholderText("Choisissez ou créez une catégorie")
         self.viewLayout.addWidget(self.category_input)
         
@@ -487,6 +602,25 @@ class PromptEditorDialog(MessageBoxBase):
         # Focus sur le titre
         self.title_input.setFocus()
     
+    def load_categories(self):
+        """Remplit la liste des catégories (existantes puis par défaut), si elle a changé."""
+        categories = [""] + self.db.get_categories() + ["Développement", "Marketing", "Rédaction", "Business", "Design", "Communication"]
+        categories = list(dict.fromkeys(categories))
+        if categories == self._categories:
+            return
+        self._categories = categories
+        self.category_input.clear()
+        self.category_input.addItems(categories)
+    
+    def reset(self):
+        """Efface la saisie précédente pour réutiliser le dialogue."""
+        self.load_categories()
+        self.title_input.clear()
+        self.category_input.setCurrentIndex(0)
+        self.tags_input.clear()
+        self.content_input.clear()
+        self.title_input.setFocus()
+    
     def save_prompt(self):
         """Enregistre le prompt."""
         title = self.title_input.text().strip()
@@ -3,15 +3,26 @@ Interface graphique principale de PromptMaster avec fonctionnalités avancées.
 Application style Raycast pour rechercher et utiliser des prompts avec contexte intelligent.
 """
 
+import os
 import sys
+import time
+from typing import Optional
 from PySide6.QtWidgets import (QApplication, QWidget, QVBoxLayout, QHBoxLayout,
-                             QLineEdit, QListWidget, QListWidgetItem, QLabel,
+                             QLineEdit, QListView, QLabel,
                              QPushButton, QTextEdit, QDialog, QComboBox, QSplitter,
                              QScrollArea, QFrame)
 from PySide6.QtCore import Qt, QTimer, Signal
 from PySide6.QtGui import QFont, QClipboard, QTextOption
 from database import DatabaseManager
+from search_session import (SearchSession, FUZZY_PREFIX, SEMANTIC_PREFIX, SEMANTIC_BUILDING_HINT,
+                            SEMANTIC_REFRESH_MS, fuzzy_query)
+from search_worker import SearchExecutor
+from prompt_list_model import PromptListModel
 from context_manager import ContextManager
+from context_poller import ContextPoller
+from prompt_templates import TemplateEngine, context_fills
+from theme import apply_theme
+from timing import LatencyRecorder
 
 
 class PromptMasterWindow(QWidget):
@@ -20,9 +31,25 @@ class PromptMasterWindow(QWidget):
     def __init__(self, selected_text: str = None):
         super().__init__()
         self.db = DatabaseManager()
+        self.search_session = SearchSession(self.db)
+        self.search_executor = SearchExecutor(self.search_session.search, self.db, parent=self)
+        self.search_executor.results_ready.connect(self.on_search_results)
         self.context_manager = ContextManager(self.db)
+        self.context_poller = self.create_context_poller()
+        # Modèles compilés des prompts à variables ([PRODUIT], [SUJET]...)
+        self.templates = TemplateEngine(self.db)
+        self.current_context = None  # Contexte de la fenêtre active à l'affichage
+        # Arrêter les threads d'arrière-plan puis fermer les connexions SQLite
+        QApplication.instance().aboutToQuit.connect(self.search_executor.shutdown)
+        if self.context_poller:
+            QApplication.instance().aboutToQuit.connect(self.context_poller.stop)
+        QApplication.instance().aboutToQuit.connect(self.db.close)
         self.current_prompts = []
         self.selected_text = selected_text  # Texte sélectionné au lancement
+        # Dialogue d'édition construit au premier besoin puis réutilisé
+        self.editor_dialog = None
+        self.dialog_latency = LatencyRecorder("Ouverture de l'éditeur")
+        QApplication.instance().aboutToQuit.connect(self.report_dialog_latency)
         self.init_ui()
         
         # Si du texte est sélectionné, ouvrir directement le dialogue d'ajout
@@ -79,24 +106,38 @@ class PromptMasterWindow(QWidget):
         
         container_layout.addLayout(header_layout)
         
-        # Champ de recherche
+        # Champ de recherche, et bascule de la recherche approximative
+        search_layout = QHBoxLayout()
         self.search_input = QLineEdit()
         self.search_input.setObjectName("searchInput")
         self.search_input.setPlaceholderText("🔍 Recherchez vos prompts...")
         self.search_input.textChanged.connect(self.on_search)
         self.search_input.returnPressed.connect(self.on_enter_pressed)
-        container_layout.addWidget(self.search_input)
+        search_layout.addWidget(self.search_input)
+        
+        self.fuzzy_button = QPushButton("≈")
+        self.fuzzy_button.setObjectName("fuzzyButton")
+        self.fuzzy_button.setCheckable(True)
+        self.fuzzy_button.setFocusPolicy(Qt.FocusPolicy.NoFocus)
+        self.fuzzy_button.setToolTip(f"Recherche approximative, tolérante aux fautes de frappe "
+                                     f"(ou commencez la saisie par {FUZZY_PREFIX})")
+        self.fuzzy_button.toggled.connect(lambda checked: self.on_search(self.search_input.text()))
+        search_layout.addWidget(self.fuzzy_button)
+        container_layout.addLayout(search_layout)
         
         # Splitter pour liste et prévisualisation
         splitter = QSplitter(Qt.Orientation.Horizontal)
         splitter.setObjectName("mainSplitter")
         
-        # Liste des résultats
-        self.results_list = QListWidget()
+        # Liste des résultats (modèle virtualisé : seules les lignes visibles sont dessinées)
+        self.prompt_model = PromptListModel(separator=" • ", parent=self)
+        self.results_list = QListView()
         self.results_list.setObjectName("resultsList")
-        self.results_list.itemClicked.connect(self.on_item_clicked)
-        self.results_list.itemDoubleClicked.connect(self.on_item_double_clicked)
-        self.results_list.currentItemChanged.connect(self.on_selection_changed)
+        self.results_list.setUniformItemSizes(True)
+        self.results_list.setModel(self.prompt_model)
+        self.results_list.clicked.connect(self.on_item_clicked)
+        self.results_list.doubleClicked.connect(self.on_item_double_clicked)
+        self.results_list.selectionModel().currentChanged.connect(self.on_selection_changed)
         splitter.addWidget(self.results_list)
         
         # Panneau de prévisualisation
@@ -140,10 +181,11 @@ class PromptMasterWindow(QWidget):
         container_layout.addWidget(splitter)
         
         # Footer avec instructions
-        footer_label = QLabel("↵ Copier | Double-clic pour éditer | ↑↓ Naviguer | Molette Défiler | Échap pour fermer")
-        footer_label.setObjectName("footer")
-        footer_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        container_layout.addWidget(footer_label)
+        self.footer_hint = "↵ Copier | Double-clic pour éditer | ↑↓ Naviguer | Molette Défiler | Échap pour fermer"
+        self.footer = QLabel(self.footer_hint)
+        self.footer.setObjectName("footer")
+        self.footer.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        container_layout.addWidget(self.footer)
         
         main_layout.addWidget(container)
         self.setLayout(main_layout)
@@ -155,126 +197,8 @@ class PromptMasterWindow(QWidget):
         self.update_context_display()
     
     def apply_styles(self):
-        """Applique le thème Dracula à l'interface."""
-        self.setStyleSheet("""
-            QWidget#container {
-                background-color: #282a36;
-                border-radius: 12px;
-                border: 2px solid #44475a;
-            }
-            
-            QLabel#title {
-                color: #f8f8f2;
-                font-size: 22px;
-                font-weight: bold;
-                padding: 5px;
-            }
-            
-            QLabel#contextLabel {
-                color: #8be9fd;
-                font-size: 11px;
-                padding: 5px;
-                background-color: #44475a;
-                border-radius: 4px;
-            }
-            
-            QLineEdit#searchInput {
-                background-color: #44475a;
-                border: 2px solid #6272a4;
-                border-radius: 8px;
-                padding: 12px;
-                font-size: 16px;
-                color: #f8f8f2;
-            }
-            
-            QLineEdit#searchInput:focus {
-                border: 2px solid #bd93f9;
-            }
-            
-            QSplitter#mainSplitter {
-                background-color: transparent;
-            }
-            
-            QListWidget#resultsList {
-                background-color: #1e1f29;
-                border: 1px solid #44475a;
-                border-radius: 8px;
-                padding: 5px;
-                color: #f8f8f2;
-                font-size: 14px;
-            }
-            
-            QListWidget#resultsList::item {
-                padding: 12px;
-                border-radius: 6px;
-                margin: 2px;
-            }
-            
-            QListWidget#resultsList::item:hover {
-                background-color: #44475a;
-            }
-            
-            QListWidget#resultsList::item:selected {
-                background-color: #bd93f9;
-                color: #282a36;
-                font-weight: bold;
-            }
-            
-            QWidget#previewContainer {
-                background-color: #1e1f29;
-                border: 1px solid #44475a;
-                border-radius: 8px;
-            }
-            
-            QLabel#previewTitle {
-                color: #50fa7b;
-                font-size: 16px;
-                font-weight: bold;
-            }
-            
-            QLabel#previewMeta {
-                color: #8be9fd;
-                font-size: 11px;
-            }
-            
-            QFrame#separator {
-                background-color: #44475a;
-            }
-            
-            QTextEdit#previewContent {
-                background-color: #282a36;
-                border: 1px solid #44475a;
-                border-radius: 6px;
-                padding: 10px;
-                color: #f8f8f2;
-                font-size: 13px;
-                line-height: 1.6;
-            }
-            
-            QLabel#footer {
-                color: #6272a4;
-                font-size: 10px;
-                padding: 5px;
-            }
-            
-            QPushButton#addButton {
-                background-color: #50fa7b;
-                color: #282a36;
-                border: none;
-                border-radius: 6px;
-                padding: 8px 16px;
-                font-weight: bold;
-                font-size: 13px;
-            }
-            
-            QPushButton#addButton:hover {
-                background-color: #5fff87;
-            }
-            
-            QPushButton#addButton:pressed {
-                background-color: #3de064;
-            }
-        """)
+        """Applique le thème Dracula à l'application (une seule fois, voir theme.py)."""
+        apply_theme(QApplication.instance(), 'dracula')
     
     def center_on_screen(self):
         """Centre la fenêtre sur l'écran."""
@@ -283,58 +207,99 @@ class PromptMasterWindow(QWidget):
         y = (screen.height() - self.height()) // 3
         self.move(x, y)
     
-    def update_context_display(self):
+    def create_context_poller(self) -> Optional[ContextPoller]:
+        """
+        Démarre le préchargement des recommandations en arrière-plan
+        (seulement si la fenêtre active peut être suivie).
+        """
+        window_context = self.context_manager.window_context
+        if window_context is None:
+            return None
+        
+        poller = ContextPoller(
+            window_context,
+            lambda context: self.context_manager.get_contextual_prompts(limit=50, context=context),
+            # Ne jamais prendre PromptMaster lui-même pour le contexte
+            ignore=lambda hwnd, title: window_context.backend.window_pid(hwnd) == os.getpid()
+        )
+        self.db.add_change_listener(lambda event, prompt_id: poller.mark_dirty())
+        poller.start()
+        return poller
+    
+    def update_context_display(self, context: Optional[dict] = None):
         """Met à jour l'affichage du contexte."""
-        context_summary = self.context_manager.get_context_summary()
+        if context is None:
+            context = self.context_manager.get_active_window_info()
+        self.current_context = context
+        context_summary = self.context_manager.get_context_summary(context)
         self.context_label.setText(context_summary)
     
-    def load_contextual_prompts(self):
+    def load_contextual_prompts(self, context: Optional[dict] = None):
         """Charge les prompts en fonction du contexte."""
-        self.current_prompts = self.context_manager.get_contextual_prompts(limit=50)
+        self.current_prompts = self.context_manager.get_contextual_prompts(limit=50, context=context)
         self.update_results_list()
     
     def load_all_prompts(self):
         """Charge tous les prompts dans la liste."""
-        self.current_prompts = self.db.get_all_prompts()
+        self.current_prompts = self.db.list_prompts()
         self.update_results_list()
     
     def on_search(self, text: str):
-        """Gère la recherche en temps réel."""
-        if text.strip():
-            self.current_prompts = self.db.search_prompts(text)
+        """Gère la recherche en temps réel (exécutée en arrière-plan)."""
+        if text.strip(FUZZY_PREFIX + SEMANTIC_PREFIX + " "):
+            self.search_executor.request(fuzzy_query(text) if self.fuzzy_button.isChecked() else text)
         else:
             # Si recherche vide, afficher les prompts contextuels
+            self.search_executor.cancel()
             self.load_contextual_prompts()
-        
+    
+    def on_search_results(self, query: str, results: list):
+        """Reçoit les résultats de la dernière recherche lancée."""
+        self.current_prompts = results
         self.update_results_list()
+        self.show_search_status(query)
+    
+    def show_search_status(self, query: str):
+        """Signale des résultats partiels et relance la recherche jusqu'à ce qu'ils soient complets."""
+        if self.search_session.is_partial(query):
+            self.footer.setText(SEMANTIC_BUILDING_HINT)
+            QTimer.singleShot(SEMANTIC_REFRESH_MS, lambda: self.refresh_partial_search(query))
+        else:
+            self.footer.setText(self.footer_hint)
+    
+    def refresh_partial_search(self, query: str):
+        """Relance une recherche aux résultats partiels si elle est toujours affichée."""
+        if self.isVisible() and self.search_input.text() == query:
+            self.search_executor.request(query)
+        else:
+            self.footer.setText(self.footer_hint)
     
     def update_results_list(self):
         """Met à jour la liste des résultats affichés."""
-        self.results_list.clear()
-        
-        for prompt in self.current_prompts:
-            prompt_id, title, content, category, tags, usage_count = prompt
-            
-            # Formater l'affichage
-            display_text = f"{title}"
-            if category:
-                display_text += f" • {category}"
-            if usage_count > 0:
-                display_text += f" • ✨ {usage_count}"
-            
-            item = QListWidgetItem(display_text)
-            item.setData(Qt.ItemDataRole.UserRole, prompt_id)
-            self.results_list.addItem(item)
+        self.prompt_model.set_prompts(self.current_prompts)
         
         # Sélectionner le premier élément automatiquement
-        if self.results_list.count() > 0:
-            self.results_list.setCurrentRow(0)
+        if self.prompt_model.rowCount() > 0:
+            first = self.prompt_model.index(0)
+            if self.results_list.currentIndex() == first:
+                # Mise à jour en place : currentChanged n'est pas émis, rafraîchir l'aperçu
+                self.on_selection_changed(first, first)
+            else:
+                self.results_list.setCurrentIndex(first)
+    
+    def move_selection(self, step: int):
+        """Déplace la sélection de step lignes (charge les lots suivants si besoin)."""
+        row = self.results_list.currentIndex().row() + step
+        if row >= 0 and self.prompt_model.ensure_row_loaded(row):
+            self.results_list.setCurrentIndex(self.prompt_model.index(row))
     
     def on_selection_changed(self, current, previous):
         """Gère le changement de sélection dans la liste."""
-        if current:
-            prompt_id = current.data(Qt.ItemDataRole.UserRole)
+        if current.isValid():
+            prompt_id = current.data(PromptListModel.PromptIdRole)
             self.update_preview(prompt_id)
+            # Précharger les voisins : la navigation aux flèches ne touche plus le disque
+            self.db.prefetch_prompts(self.prompt_model.neighbour_ids(current.row()))
     
     def update_preview(self, prompt_id: int):
         """Met à jour la prévisualisation du prompt."""
@@ -354,6 +319,9 @@ class PromptMasterWindow(QWidget):
                 meta_parts.append(f"🏷️ {tags}")
             if usage_count > 0:
                 meta_parts.append(f"✨ Utilisé {usage_count} fois")
+            variables = self.templates.get(prompt_id, content).variables
+            if variables:
+                meta_parts.append(f"🧩 {', '.join(variables)}")
             
             self.preview_meta.setText(" • ".join(meta_parts) if meta_parts else "")
             
@@ -366,27 +334,29 @@ class PromptMasterWindow(QWidget):
     
     def on_enter_pressed(self):
         """Gère l'appui sur Entrée : copie le prompt sélectionné."""
-        current_item = self.results_list.currentItem()
-        if current_item:
-            self.copy_prompt_to_clipboard(current_item)
+        current_index = self.results_list.currentIndex()
+        if current_index.isValid():
+            self.copy_prompt_to_clipboard(current_index)
     
-    def on_item_clicked(self, item):
+    def on_item_clicked(self, index):
         """Gère le clic simple sur un élément."""
         # La prévisualisation se met à jour automatiquement via on_selection_changed
         pass
     
-    def on_item_double_clicked(self, item):
+    def on_item_double_clicked(self, index):
         """Gère le double-clic sur un élément : ouvre l'éditeur."""
-        prompt_id = item.data(Qt.ItemDataRole.UserRole)
+        prompt_id = index.data(PromptListModel.PromptIdRole)
         self.show_edit_dialog(prompt_id)
     
-    def copy_prompt_to_clipboard(self, item):
+    def copy_prompt_to_clipboard(self, index):
         """Copie le contenu d'un prompt dans le presse-papiers."""
-        prompt_id = item.data(Qt.ItemDataRole.UserRole)
+        prompt_id = index.data(PromptListModel.PromptIdRole)
         prompt = self.db.get_prompt_by_id(prompt_id)
         
         if prompt:
-            content = prompt[2]
+            # Remplir les variables déduites du contexte ([APPLICATION], [FENETRE]...)
+            template = self.templates.get(prompt_id, prompt[2])
+            content = template.render(context_fills(template, context=self.current_context))
             clipboard = QApplication.clipboard()
             clipboard.setText(content)
             
@@ -405,25 +375,48 @@ class PromptMasterWindow(QWidget):
         self.search_input.setPlaceholderText(message)
         QTimer.singleShot(2000, lambda: self.search_input.setPlaceholderText(original_placeholder))
     
+    def open_editor(self, prompt_id: int = None, prefill_content: str = None) -> bool:
+        """
+        Ouvre le dialogue d'édition, réutilisé d'une ouverture à l'autre.
+        
+        Args:
+            prompt_id: ID du prompt à éditer (None pour un nouveau prompt)
+            prefill_content: Texte pré-rempli pour un nouveau prompt
+            
+        Returns:
+            True si le dialogue a été validé
+        """
+        started = time.perf_counter()
+        if self.editor_dialog is None:
+            self.editor_dialog = PromptEditorDialog(self, self.db, self.context_manager)
+            self.editor_dialog.latency = self.dialog_latency
+        self.editor_dialog.bind(prompt_id, prefill_content)
+        self.editor_dialog.open_started = started
+        return self.editor_dialog.exec() == QDialog.DialogCode.Accepted
+    
+    def report_dialog_latency(self):
+        """Affiche les temps d'ouverture de l'éditeur mesurés pendant la session."""
+        if len(self.dialog_latency):
+            print(self.dialog_latency.report())
+    
     def show_add_dialog_with_text(self):
         """Affiche le dialogue d'ajout avec le texte sélectionné pré-rempli."""
-        dialog = PromptEditorDialog(self, self.db, self.context_manager, 
-                                    prefill_content=self.selected_text)
-        if dialog.exec() == QDialog.DialogCode.Accepted:
+        if self.open_editor(prefill_content=self.selected_text):
+            self.search_session.invalidate()
             self.load_contextual_prompts()
             self.search_input.clear()
     
     def show_add_dialog(self):
         """Affiche le dialogue pour ajouter un nouveau prompt."""
-        dialog = PromptEditorDialog(self, self.db, self.context_manager)
-        if dialog.exec() == QDialog.DialogCode.Accepted:
+        if self.open_editor():
+            self.search_session.invalidate()
             self.load_contextual_prompts()
             self.search_input.clear()
     
     def show_edit_dialog(self, prompt_id: int):
         """Affiche le dialogue pour éditer un prompt existant."""
-        dialog = PromptEditorDialog(self, self.db, self.context_manager, prompt_id)
-        if dialog.exec() == QDialog.DialogCode.Accepted:
+        if self.open_editor(prompt_id):
+            self.search_session.invalidate()
             self.load_contextual_prompts()
             self.on_search(self.search_input.text())
     
@@ -432,13 +425,9 @@ class PromptMasterWindow(QWidget):
         if event.key() == Qt.Key.Key_Escape:
             self.hide()
         elif event.key() == Qt.Key.Key_Down:
-            current_row = self.results_list.currentRow()
-            if current_row < self.results_list.count() - 1:
-                self.results_list.setCurrentRow(current_row + 1)
+            self.move_selection(1)
         elif event.key() == Qt.Key.Key_Up:
-            current_row = self.results_list.currentRow()
-            if current_row > 0:
-                self.results_list.setCurrentRow(current_row - 1)
+            self.move_selection(-1)
         else:
             super().keyPressEvent(event)
     
@@ -453,33 +442,69 @@ class PromptMasterWindow(QWidget):
     def showEvent(self, event):
         """Appelé quand la fenêtre est affichée."""
         super().showEvent(event)
+        # La base a pu changer pendant que la fenêtre était cachée
+        self.search_session.invalidate()
         self.search_input.setFocus()
-        self.search_input.clear()
-        self.update_context_display()
-        if not self.selected_text:
-            self.load_contextual_prompts()
+        if self.search_input.text():
+            # Sans textChanged : on_search("") rechargerait les recommandations
+            # que le préchargement ci-dessous fournit déjà
+            blocked = self.search_input.blockSignals(True)
+            self.search_input.clear()
+            self.search_input.blockSignals(blocked)
+            self.search_executor.cancel()
+        
+        # Recommandations préparées en arrière-plan si la fenêtre active n'a
+        # pas changé depuis, sinon une seule résolution du contexte
+        prewarmed = None
+        if self.context_poller:
+            self.context_poller.pause()
+            prewarmed = self.context_poller.latest()
+        
+        if prewarmed:
+            context, prompts = prewarmed
+            self.update_context_display(context)
+            if not self.selected_text:
+                self.current_prompts = prompts
+                self.update_results_list()
+        else:
+            self.context_manager.invalidate_context()
+            context = self.context_manager.get_active_window_info()
+            self.update_context_display(context)
+            if not self.selected_text:
+                self.load_contextual_prompts(context)
+    
+    def hideEvent(self, event):
+        """Appelé quand la fenêtre est masquée."""
+        super().hideEvent(event)
+        if self.context_poller:
+            self.context_poller.resume()
 
 
 class PromptEditorDialog(QDialog):
-    """Dialogue pour ajouter ou éditer un prompt."""
+    """
+    Dialogue pour ajouter ou éditer un prompt.
+    
+    Les widgets sont construits une fois ; bind() prépare le dialogue pour
+    un autre prompt, ce qui permet de le réutiliser à chaque ouverture.
+    """
     
     def __init__(self, parent, db: DatabaseManager, context_manager: ContextManager = None,
                  prompt_id: int = None, prefill_content: str = None):
         super().__init__(parent)
         self.db = db
         self.context_manager = context_manager
-        self.prompt_id = prompt_id
-        self.prefill_content = prefill_content
+        self.prompt_id = None
+        self.prefill_content = None
+        self._categories = None  # Liste affichée dans category_input
+        # Mesure du temps d'ouverture (open_started : horodatage perf_counter)
+        self.latency = None
+        self.open_started = None
         self.init_ui()
-        
-        if prompt_id:
-            self.load_prompt()
-        elif prefill_content:
-            self.prefill_from_text()
+        self.bind(prompt_id, prefill_content)
     
     def init_ui(self):
-        """Initialise l'interface du dialogue."""
-        self.setWindowTitle("Nouveau Prompt" if not self.prompt_id else "Éditer le Prompt")
+        """Initialise l'interface du dialogue (styles : voir theme.py)."""
+        self.setObjectName("promptEditor")
         self.setModal(True)
         self.setFixedSize(700, 600)
         
@@ -488,37 +513,22 @@ class PromptEditorDialog(QDialog):
         
         # Titre
         title_label = QLabel("Titre:")
-        title_label.setStyleSheet("color: #f8f8f2; font-weight: bold;")
+        title_label.setObjectName("fieldLabel")
         layout.addWidget(title_label)
         
         self.title_input = QLineEdit()
-        self.title_input.setStyleSheet("""
-            background-color: #44475a;
-            border: 2px solid #6272a4;
-            border-radius: 6px;
-            padding: 8px;
-            color: #f8f8f2;
-            font-size: 14px;
-        """)
         layout.addWidget(self.title_input)
         
         # Catégorie avec suggestion contextuelle
         category_layout = QHBoxLayout()
         category_label = QLabel("Catégorie:")
-        category_label.setStyleSheet("color: #f8f8f2; font-weight: bold;")
+        category_label.setObjectName("fieldLabel")
         category_layout.addWidget(category_label)
         
         # Bouton pour suggestion de catégorie
         if self.context_manager:
             suggest_cat_btn = QPushButton("💡 Suggérer")
-            suggest_cat_btn.setStyleSheet("""
-                background-color: #6272a4;
-                color: white;
-                border: none;
-                border-radius: 4px;
-                padding: 4px 8px;
-                font-size: 11px;
-            """)
+            suggest_cat_btn.setObjectName("suggestButton")
             suggest_cat_btn.clicked.connect(self.suggest_category)
             category_layout.addWidget(suggest_cat_btn)
         
@@ -527,35 +537,18 @@ class PromptEditorDialog(QDialog):
         
         self.category_input = QComboBox()
         self.category_input.setEditable(True)
-        categories = [""] + self.db.get_categories() + ["Développement", "Marketing", "Rédaction", "Business", "Autre"]
-        self.category_input.addItems(list(dict.fromkeys(categories)))  # Supprimer les doublons
-        self.category_input.setStyleSheet("""
-            background-color: #44475a;
-            border: 2px solid #6272a4;
-            border-radius: 6px;
-            padding: 8px;
-            color: #f8f8f2;
-            font-size: 14px;
-        """)
         layout.addWidget(self.category_input)
         
         # Tags avec suggestion
         tags_layout = QHBoxLayout()
         tags_label = QLabel("Tags (séparés par des virgules):")
-        tags_label.setStyleSheet("color: #f8f8f2; font-weight: bold;")
+        tags_label.setObjectName("fieldLabel")
         tags_layout.addWidget(tags_label)
         
         # Bouton pour suggestion de tags
         if self.context_manager:
             suggest_tags_btn = QPushButton("💡 Suggérer")
-            suggest_tags_btn.setStyleSheet("""
-                background-color: #6272a4;
-                color: white;
-                border: none;
-                border-radius: 4px;
-                padding: 4px 8px;
-                font-size: 11px;
-            """)
+            suggest_tags_btn.setObjectName("suggestButton")
             suggest_tags_btn.clicked.connect(self.suggest_tags)
             tags_layout.addWidget(suggest_tags_btn)
         
@@ -564,78 +557,82 @@ class PromptEditorDialog(QDialog):
         
         self.tags_input = QLineEdit()
         self.tags_input.setPlaceholderText("python, api, rest")
-        self.tags_input.setStyleSheet("""
-            background-color: #44475a;
-            border: 2px solid #6272a4;
-            border-radius: 6px;
-            padding: 8px;
-            color: #f8f8f2;
-            font-size: 14px;
-        """)
         layout.addWidget(self.tags_input)
         
         # Contenu
         content_label = QLabel("Contenu du prompt:")
-        content_label.setStyleSheet("color: #f8f8f2; font-weight: bold;")
+        content_label.setObjectName("fieldLabel")
         layout.addWidget(content_label)
         
         self.content_input = QTextEdit()
-        self.content_input.setStyleSheet("""
-            background-color: #44475a;
-            border: 2px solid #6272a4;
-            border-radius: 6px;
-            padding: 8px;
-            color: #f8f8f2;
-            font-size: 14px;
-        """)
         layout.addWidget(self.content_input)
         
         # Boutons
         buttons_layout = QHBoxLayout()
         
-        if self.prompt_id:
-            delete_btn = QPushButton("🗑️ Supprimer")
-            delete_btn.setStyleSheet("""
-                background-color: #ff5555;
-                color: white;
-                border: none;
-                border-radius: 6px;
-                padding: 10px 20px;
-                font-weight: bold;
-            """)
-            delete_btn.clicked.connect(self.delete_prompt)
-            buttons_layout.addWidget(delete_btn)
+        # Visible seulement en édition (voir bind)
+        self.delete_btn = QPushButton("🗑️ Supprimer")
+        self.delete_btn.setObjectName("deleteButton")
+        self.delete_btn.clicked.connect(self.delete_prompt)
+        buttons_layout.addWidget(self.delete_btn)
         
         buttons_layout.addStretch()
         
         cancel_btn = QPushButton("Annuler")
-        cancel_btn.setStyleSheet("""
-            background-color: #6272a4;
-            color: white;
-            border: none;
-            border-radius: 6px;
-            padding: 10px 20px;
-            font-weight: bold;
-        """)
+        cancel_btn.setObjectName("cancelButton")
         cancel_btn.clicked.connect(self.reject)
         buttons_layout.addWidget(cancel_btn)
         
         save_btn = QPushButton("💾 Enregistrer")
-        save_btn.setStyleSheet("""
-            background-color: #50fa7b;
-            color: #282a36;
-            border: none;
-            border-radius: 6px;
-            padding: 10px 20px;
-            font-weight: bold;
-        """)
+        save_btn.setObjectName("saveButton")
         save_btn.clicked.connect(self.save_prompt)
         buttons_layout.addWidget(save_btn)
         
         layout.addLayout(buttons_layout)
         
         self.setLayout(layout)
-        self.setStyleSheet("background-color: #282a36;")
+    
+    def bind(self, prompt_id: int = None, prefill_content: str = None):
+        """
+        Prépare le dialogue pour un prompt, en effaçant la saisie précédente.
+        
+        Args:
+            prompt_id: ID du prompt à éditer (None pour un nouveau prompt)
+            prefill_content: Texte pré-rempli pour un nouveau prompt
+        """
+        self.prompt_id = prompt_id
+        self.prefill_content = prefill_content
+        self.setWindowTitle("Nouveau Prompt" if not prompt_id else "Éditer le Prompt")
+        self.delete_btn.setVisible(bool(prompt_id))
+        
+        self.load_categories()
+        self.title_input.clear()
+        self.category_input.setCurrentText("")
+        self.tags_input.clear()
+        self.content_input.clear()
+        self.title_input.setFocus()
+        
+        if prompt_id:
+            self.load_prompt()
+        elif prefill_content:
+            self.prefill_from_text()
+    
+    def load_categories(self):
+        """Remplit la liste des catégories (existantes puis par défaut), si elle a changé."""
+        categories = [""] + self.db.get_categories() + ["Développement", "Marketing", "Rédaction", "Business", "Autre"]
+        categories = list(dict.fromkeys(categories))  # Supprimer les doublons
+        if categories == self._categories:
+            return
+        self._categories = categories
+        self.category_input.clear()
+        self.category_input.addItems(categories)
+    
+    def showEvent(self, event):
+        """Enregistre le temps d'ouverture à l'affichage du dialogue."""
+        super().showEvent(event)
+        if self.latency is not None and self.open_started is not None:
+            self.latency.record(time.perf_counter() - self.open_started)
+            self.open_started = None
     
     def prefill_from_text(self):
         """Pré-remplit le dialogue avec le texte sélectionné."""
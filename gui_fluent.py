@@ -3,22 +3,30 @@ Interface graphique Fluent Design pour PromptMaster.
 Application moderne avec PySide6-Fluent-Widgets.
 """
 
+import os
 import sys
+from typing import Optional
 from PySide6.QtCore import Qt, QTimer, Signal, QSize
 from PySide6.QtWidgets import QApplication, QWidget, QVBoxLayout, QHBoxLayout
 from PySide6.QtGui import QIcon
 
 from qfluentwidgets import (
     FluentWindow, NavigationItemPosition, FluentIcon,
-    SearchLineEdit, ListWidget, PushButton, TextEdit,
+    SearchLineEdit, ListView, PushButton, TextEdit,
     LineEdit, ComboBox, Dialog, BodyLabel, SubtitleLabel,
     TitleLabel, CaptionLabel, PrimaryPushButton, TransparentPushButton,
     setTheme, Theme, isDarkTheme, setThemeColor, SplitFluentWindow,
-    InfoBar, InfoBarPosition, CardWidget, ScrollArea
+    InfoBar, InfoBarPosition, CardWidget, ScrollArea, ToggleButton
 )
 
 from database import DatabaseManager
+from search_session import (SearchSession, FUZZY_PREFIX, SEMANTIC_PREFIX, SEMANTIC_BUILDING_HINT,
+                            SEMANTIC_REFRESH_MS, fuzzy_query)
+from search_worker import SearchExecutor
+from prompt_list_model import PromptListModel
 from context_manager import ContextManager
+from context_poller import ContextPoller
+from prompt_templates import TemplateEngine, context_fills
 
 
 class PromptMasterWindow(FluentWindow):
@@ -27,9 +35,22 @@ class PromptMasterWindow(FluentWindow):
     def __init__(self, selected_text: str = None):
         super().__init__()
         self.db = DatabaseManager()
+        self.search_session = SearchSession(self.db)
+        self.search_executor = SearchExecutor(self.search_session.search, self.db, parent=self)
+        self.search_executor.results_ready.connect(self.on_search_results)
         self.context_manager = ContextManager(self.db)
+        self.context_poller = self.create_context_poller()
+        # Modèles compilés des prompts à variables ([PRODUIT], [SUJET]...)
+        self.templates = TemplateEngine(self.db)
+        self.current_context = None  # Contexte de la fenêtre active à l'affichage
+        # Arrêter les threads d'arrière-plan puis fermer les connexions SQLite
+        QApplication.instance().aboutToQuit.connect(self.search_executor.shutdown)
+        if self.context_poller:
+            QApplication.instance().aboutToQuit.connect(self.context_poller.stop)
+        QApplication.instance().aboutToQuit.connect(self.db.close)
         self.current_prompts = []
         self.selected_text = selected_text
+        self.editor_dialog = None  # Construit au premier besoin puis réutilisé
         
         self.init_ui()
         self.init_navigation()
@@ -102,7 +123,18 @@ class PromptMasterWindow(FluentWindow):
         self.search_input.textChanged.connect(self.on_search)
         self.search_input.returnPressed.connect(self.on_enter_pressed)
         self.search_input.setFixedHeight(45)
-        layout.addWidget(self.search_input)
+        
+        # Bascule de la recherche approximative (tolérante aux fautes de frappe)
+        self.fuzzy_button = ToggleButton("≈ Approx.")
+        self.fuzzy_button.setFixedHeight(45)
+        self.fuzzy_button.setToolTip(f"Recherche approximative, tolérante aux fautes de frappe "
+                                     f"(ou commencez la saisie par {FUZZY_PREFIX})")
+        self.fuzzy_button.toggled.connect(lambda checked: self.on_search(self.search_input.text()))
+        
+        search_layout = QHBoxLayout()
+        search_layout.addWidget(self.search_input)
+        search_layout.addWidget(self.fuzzy_button)
+        layout.addLayout(search_layout)
         
         # Conteneur pour liste et prévisualisation
         content_layout = QHBoxLayout()
@@ -113,11 +145,15 @@ class PromptMasterWindow(FluentWindow):
         list_layout = QVBoxLayout(list_card)
         list_layout.setContentsMargins(5, 5, 5, 5)
         
-        self.results_list = ListWidget()
+        # Modèle virtualisé : seules les lignes visibles sont dessinées
+        self.prompt_model = PromptListModel(separator="  •  ", parent=self)
+        self.results_list = ListView()
         self.results_list.setAlternatingRowColors(True)
-        self.results_list.itemClicked.connect(self.on_item_clicked)
-        self.results_list.itemDoubleClicked.connect(self.on_item_double_clicked)
-        self.results_list.currentItemChanged.connect(self.on_selection_changed)
+        self.results_list.setUniformItemSizes(True)
+        self.results_list.setModel(self.prompt_model)
+        self.results_list.clicked.connect(self.on_item_clicked)
+        self.results_list.doubleClicked.connect(self.on_item_double_clicked)
+        self.results_list.selectionModel().currentChanged.connect(self.on_selection_changed)
         list_layout.addWidget(self.results_list)
         
         content_layout.addWidget(list_card, 4)
@@ -148,10 +184,11 @@ class PromptMasterWindow(FluentWindow):
         layout.addLayout(content_layout, 1)
         
         # Footer
-        footer = CaptionLabel("↵ Copier | Double-clic Éditer | ↑↓ Naviguer | Échap Fermer")
-        footer.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        footer.setStyleSheet("color: #6272a4;")
-        layout.addWidget(footer)
+        self.footer_hint = "↵ Copier | Double-clic Éditer | ↑↓ Naviguer | Échap Fermer"
+        self.footer = CaptionLabel(self.footer_hint)
+        self.footer.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.footer.setStyleSheet("color: #6272a4;")
+        layout.addWidget(self.footer)
         
         # Ajouter à la fenêtre
         self.addSubInterface(self.search_interface, FluentIcon.SEARCH, "Recherche")
@@ -166,48 +203,92 @@ class PromptMasterWindow(FluentWindow):
         y = (screen.height() - self.height()) // 3
         self.move(x, y)
     
-    def update_context_display(self):
+    def create_context_poller(self) -> Optional[ContextPoller]:
+        """
+        Démarre le préchargement des recommandations en arrière-plan
+        (seulement si la fenêtre active peut être suivie).
+        """
+        window_context = self.context_manager.window_context
+        if window_context is None:
+            return None
+        
+        poller = ContextPoller(
+            window_context,
+            lambda context: self.context_manager.get_contextual_prompts(limit=50, context=context),
+            # Ne jamais prendre PromptMaster lui-même pour le contexte
+            ignore=lambda hwnd, title: window_context.backend.window_pid(hwnd) == os.getpid()
+        )
+        self.db.add_change_listener(lambda event, prompt_id: poller.mark_dirty())
+        poller.start()
+        return poller
+    
+    def update_context_display(self, context: Optional[dict] = None):
         """Met à jour l'affichage du contexte."""
-        context_summary = self.context_manager.get_context_summary()
+        if context is None:
+            context = self.context_manager.get_active_window_info()
+        self.current_context = context
+        context_summary = self.context_manager.get_context_summary(context)
         self.context_label.setText(context_summary)
     
-    def load_contextual_prompts(self):
+    def load_contextual_prompts(self, context: Optional[dict] = None):
         """Charge les prompts en fonction du contexte."""
-        self.current_prompts = self.context_manager.get_contextual_prompts(limit=50)
+        self.current_prompts = self.context_manager.get_contextual_prompts(limit=50, context=context)
         self.update_results_list()
     
     def on_search(self, text: str):
-        """Gère la recherche en temps réel."""
-        if text.strip():
-            self.current_prompts = self.db.search_prompts(text)
+        """Gère la recherche en temps réel (exécutée en arrière-plan)."""
+        if text.strip(FUZZY_PREFIX + SEMANTIC_PREFIX + " "):
+            self.search_executor.request(fuzzy_query(text) if self.fuzzy_button.isChecked() else text)
         else:
+            self.search_executor.cancel()
             self.load_contextual_prompts()
+    
+    def on_search_results(self, query: str, results: list):
+        """Reçoit les résultats de la dernière recherche lancée."""
+        self.current_prompts = results
         self.update_results_list()
+        self.show_search_status(query)
+    
+    def show_search_status(self, query: str):
+        """Signale des résultats partiels et relance la recherche jusqu'à ce qu'ils soient complets."""
+        if self.search_session.is_partial(query):
+            self.footer.setText(SEMANTIC_BUILDING_HINT)
+            QTimer.singleShot(SEMANTIC_REFRESH_MS, lambda: self.refresh_partial_search(query))
+        else:
+            self.footer.setText(self.footer_hint)
+    
+    def refresh_partial_search(self, query: str):
+        """Relance une recherche aux résultats partiels si elle est toujours affichée."""
+        if self.isVisible() and self.search_input.text() == query:
+            self.search_executor.request(query)
+        else:
+            self.footer.setText(self.footer_hint)
     
     def update_results_list(self):
         """Met à jour la liste des résultats."""
-        self.results_list.clear()
-        
-        for prompt in self.current_prompts:
-            prompt_id, title, content, category, tags, usage_count = prompt
-            
-            display_text = f"{title}"
-            if category:
-                display_text += f"  •  {category}"
-            if usage_count > 0:
-                display_text += f"  •  ✨ {usage_count}"
-            
-            item = self.results_list.addItem(display_text)
-            item.setData(Qt.ItemDataRole.UserRole, prompt_id)
-        
-        if self.results_list.count() > 0:
-            self.results_list.setCurrentRow(0)
+        self.prompt_model.set_prompts(self.current_prompts)
+        
+        if self.prompt_model.rowCount() > 0:
+            first = self.prompt_model.index(0)
+            if self.results_list.currentIndex() == first:
+                # Mise à jour en place : currentChanged n'est pas émis, rafraîchir l'aperçu
+                self.on_selection_changed(first, first)
+            else:
+                self.results_list.setCurrentIndex(first)
+    
+    def move_selection(self, step: int):
+        """Déplace la sélection de step lignes (charge les lots suivants si besoin)."""
+        row = self.results_list.currentIndex().row() + step
+        if row >= 0 and self.prompt_model.ensure_row_loaded(row):
+            self.results_list.setCurrentIndex(self.prompt_model.index(row))
     
     def on_selection_changed(self, current, previous):
         """Gère le changement de sélection."""
-        if current:
-            prompt_id = current.data(Qt.ItemDataRole.UserRole)
+        if current.isValid():
+            prompt_id = current.data(PromptListModel.PromptIdRole)
             self.update_preview(prompt_id)
+            # Précharger les voisins : la navigation aux flèches ne touche plus le disque
+            self.db.prefetch_prompts(self.prompt_model.neighbour_ids(current.row()))
     
     def update_preview(self, prompt_id: int):
         """Met à jour la prévisualisation."""
@@ -225,6 +306,9 @@ class PromptMasterWindow(FluentWindow):
                 meta_parts.append(f"🏷️ {tags}")
             if usage_count > 0:
                 meta_parts.append(f"✨ {usage_count} utilisations")
+            variables = self.templates.get(prompt_id, content).variables
+            if variables:
+                meta_parts.append(f"🧩 {', '.join(variables)}")
             
             self.preview_meta.setText("  •  ".join(meta_parts) if meta_parts else "")
             self.preview_content.setPlainText(content)
@@ -235,26 +319,28 @@ class PromptMasterWindow(FluentWindow):
     
     def on_enter_pressed(self):
         """Copie le prompt sélectionné."""
-        current_item = self.results_list.currentItem()
-        if current_item:
-            self.copy_prompt_to_clipboard(current_item)
+        current_index = self.results_list.currentIndex()
+        if current_index.isValid():
+            self.copy_prompt_to_clipboard(current_index)
     
-    def on_item_clicked(self, item):
+    def on_item_clicked(self, index):
         """Gère le clic simple."""
         pass
     
-    def on_item_double_clicked(self, item):
+    def on_item_double_clicked(self, index):
         """Ouvre l'éditeur en double-clic."""
-        prompt_id = item.data(Qt.ItemDataRole.UserRole)
+        prompt_id = index.data(PromptListModel.PromptIdRole)
         self.show_edit_dialog(prompt_id)
     
-    def copy_prompt_to_clipboard(self, item):
+    def copy_prompt_to_clipboard(self, index):
         """Copie le prompt dans le presse-papiers."""
-        prompt_id = item.data(Qt.ItemDataRole.UserRole)
+        prompt_id = index.data(PromptListModel.PromptIdRole)
         prompt = self.db.get_prompt_by_id(prompt_id)
         
         if prompt:
-            content = prompt[2]
+            # Remplir les variables déduites du contexte ([APPLICATION], [FENETRE]...)
+            template = self.templates.get(prompt_id, prompt[2])
+            content = template.render(context_fills(template, context=self.current_context))
             clipboard = QApplication.clipboard()
             clipboard.setText(content)
             
@@ -272,25 +358,40 @@ class PromptMasterWindow(FluentWindow):
             
             QTimer.singleShot(500, self.hide)
     
+    def open_editor(self, prompt_id: int = None, prefill_content: str = None) -> bool:
+        """
+        Ouvre le dialogue d'édition, construit une fois puis réutilisé.
+        
+        Args:
+            prompt_id: ID du prompt à éditer (None pour un nouveau prompt)
+            prefill_content: Texte pré-rempli pour un nouveau prompt
+            
+        Returns:
+            True si le dialogue a été validé
+        """
+        if self.editor_dialog is None:
+            self.editor_dialog = PromptEditorDialog(self, self.db, self.context_manager)
+        self.editor_dialog.bind(prompt_id, prefill_content)
+        return bool(self.editor_dialog.exec())
+    
     def show_add_dialog_with_text(self):
         """Affiche le dialogue d'ajout avec texte pré-rempli."""
-        dialog = PromptEditorDialog(self, self.db, self.context_manager,
-                                    prefill_content=self.selected_text)
-        if dialog.exec():
+        if self.open_editor(prefill_content=self.selected_text):
+            self.search_session.invalidate()
             self.load_contextual_prompts()
             self.search_input.clear()
     
     def show_add_dialog(self):
         """Affiche le dialogue d'ajout."""
-        dialog = PromptEditorDialog(self, self.db, self.context_manager)
-        if dialog.exec():
+        if self.open_editor():
+            self.search_session.invalidate()
             self.load_contextual_prompts()
             self.search_input.clear()
     
     def show_edit_dialog(self, prompt_id: int):
         """Affiche le dialogue d'édition."""
-        dialog = PromptEditorDialog(self, self.db, self.context_manager, prompt_id)
-        if dialog.exec():
+        if self.open_editor(prompt_id):
+            self.search_session.invalidate()
             self.load_contextual_prompts()
             self.on_search(self.search_input.text())
     
@@ -299,47 +400,110 @@ class PromptMasterWindow(FluentWindow):
         if event.key() == Qt.Key.Key_Escape:
             self.hide()
         elif event.key() == Qt.Key.Key_Down:
-            current_row = self.results_list.currentRow()
-            if current_row < self.results_list.count() - 1:
-                self.results_list.setCurrentRow(current_row + 1)
+            self.move_selection(1)
         elif event.key() == Qt.Key.Key_Up:
-            current_row = self.results_list.currentRow()
-            if current_row > 0:
-                self.results_list.setCurrentRow(current_row - 1)
+            self.move_selection(-1)
         else:
             super().keyPressEvent(event)
     
     def showEvent(self, event):
         """Appelé quand la fenêtre s'affiche."""
         super().showEvent(event)
+        # La base a pu changer pendant que la fenêtre était cachée
+        self.search_session.invalidate()
         self.search_input.setFocus()
-        self.search_input.clear()
-        self.update_context_display()
-        if not self.selected_text:
-            self.load_contextual_prompts()
+        if self.search_input.text():
+            # Sans textChanged : on_search("") rechargerait les recommandations
+            # que le préchargement ci-dessous fournit déjà
+            blocked = self.search_input.blockSignals(True)
+            self.search_input.clear()
+            self.search_input.blockSignals(blocked)
+            self.search_executor.cancel()
+        
+        # Recommandations préparées en arrière-plan si la fenêtre active n'a
+        # pas changé depuis, sinon une seule résolution du contexte
+        prewarmed = None
+        if self.context_poller:
+            self.context_poller.pause()
+            prewarmed = self.context_poller.latest()
+        
+        if prewarmed:
+            context, prompts = prewarmed
+            self.update_context_display(context)
+            if not self.selected_text:
+                self.current_prompts = prompts
+                self.update_results_list()
+        else:
+            self.context_manager.invalidate_context()
+            context = self.context_manager.get_active_window_info()
+            self.update_context_display(context)
+            if not self.selected_text:
+                self.load_contextual_prompts(context)
+    
+    def hideEvent(self, event):
+        """Appelé quand la fenêtre est masquée."""
+        super().hideEvent(event)
+        if self.context_poller:
+            self.context_poller.resume()
 
 
 class PromptEditorDialog(Dialog):
-    """Dialogue Fluent pour éditer/créer un prompt."""
+    """
+    Dialogue Fluent pour éditer/créer un prompt.
+    
+    Les widgets sont construits une fois ; bind() prépare le dialogue pour
+    un autre prompt, ce qui permet de le réutiliser à chaque ouverture.
+    """
     
     def __init__(self, parent, db: DatabaseManager, context_manager: ContextManager = None,
                  prompt_id: int = None, prefill_content: str = None):
         super().__init__(parent=parent)
         self.db = db
         self.context_manager = context_manager
-        self.prompt_id = prompt_id
-        self.prefill_content = prefill_content
+        self.prompt_id = None
+        self.prefill_content = None
+        self._categories = None  # Liste affichée dans category_input
         
         self.setTitleBarVisible(True)
-        self.titleBar.titleLabel.setText("Nouveau Prompt" if not prompt_id else "Éditer le Prompt")
         
         self.init_ui()
+        self.bind(prompt_id, prefill_content)
+    
+    def bind(self, prompt_id: int = None, prefill_content: str = None):
+        """
+        Prépare le dialogue pour un prompt, en effaçant la saisie précédente.
+        
+        Args:
+            prompt_id: ID du prompt à éditer (None pour un nouveau prompt)
+            prefill_content: Texte pré-rempli pour un nouveau prompt
+        """
+        self.prompt_id = prompt_id
+        self.prefill_content = prefill_content
+        self.titleBar.titleLabel.setText("Nouveau Prompt" if not prompt_id else "Éditer le Prompt")
+        self.delete_btn.setVisible(bool(prompt_id))
+        
+        self.load_categories()
+        self.title_input.clear()
+        self.category_input.setCurrentIndex(0)
+        self.tags_input.clear()
+        self.content_input.clear()
+        self.title_input.setFocus()
         
         if prompt_id:
             self.load_prompt()
         elif prefill_content:
             self.prefill_from_text()
     
+    def load_categories(self):
+        """Remplit la liste des catégories (existantes puis par défaut), si elle a changé."""
+        categories = [""] + self.db.get_categories() + ["Développement", "Marketing", "Rédaction", "Business", "Design", "Communication"]
+        categories = list(dict.fromkeys(categories))
+        if categories == self._categories:
+            return
+        self._categories = categories
+        self.category_input.clear()
+        self.category_input.addItems(categories)
+    
     def init_ui(self):
         """Initialise l'interface du dialogue."""
         self.widget.setMinimumSize(700, 650)
@@ -376,8 +540,6 @@ class PromptEditorDialog(Dialog):
         
         self.category_input = ComboBox()
         self.category_input.setEditable(True)
-        categories = [""] + self.db.get_categories() + ["Développement", "Marketing", "Rédaction", "Business", "Design", "Communication"]
-        self.category_input.addItems(list(dict.fromkeys(categories)))
         self.category_input.setPlaceholderText("Choisissez ou créez une catégorie")
         cat_layout.addWidget(self.category_input)
         layout.addLayout(cat_layout)
@@ -416,10 +578,10 @@ class PromptEditorDialog(Dialog):
         # Boutons
         buttons_layout = QHBoxLayout()
         
-        if self.prompt_id:
-            delete_btn = PushButton("🗑️ Supprimer")
-            delete_btn.clicked.connect(self.delete_prompt)
-            buttons_layout.addWidget(delete_btn)
+        # Visible seulement en édition (voir bind)
+        self.delete_btn = PushButton("🗑️ Supprimer")
+        self.delete_btn.clicked.connect(self.delete_prompt)
+        buttons_layout.addWidget(self.delete_btn)
         
         buttons_layout.addStretch()
         
@@ -432,9 +594,6 @@ class PromptEditorDialog(Dialog):
         buttons_layout.addWidget(save_btn)
         
         layout.addLayout(buttons_layout)
-        
-        # Focus sur le titre
-        self.title_input.setFocus()
     
     def prefill_from_text(self):
         """Pré-remplit avec le texte sélectionné."""
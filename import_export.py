@@ -0,0 +1,72 @@
+"""
+Import/export en masse des prompts de PromptMaster (JSONL ou CSV).
+Permet de migrer une bibliothèque de prompts d'une machine à l'autre.
+
+Usage :
+    python import_export.py export prompts.jsonl
+    python import_export.py import prompts.csv --db autre.db
+"""
+
+import argparse
+import os
+import sys
+import time
+
+from database import DatabaseManager, EXPORT_FORMATS, IMPORT_CHUNK_SIZE, read_prompt_records
+
+
+def guess_format(path: str) -> str:
+    """Déduit le format de l'extension du fichier (JSONL par défaut)."""
+    extension = os.path.splitext(path)[1].lower().lstrip(".")
+    return "csv" if extension == "csv" else "jsonl"
+
+
+def run_import(db: DatabaseManager, path: str, fmt: str, chunk_size: int) -> int:
+    """Importe un fichier dans la base ; retourne le nombre de prompts ajoutés."""
+    start = time.perf_counter()
+    with open(path, "r", encoding="utf-8", newline="") as stream:
+        imported, skipped = db.import_prompts(read_prompt_records(stream, fmt), chunk_size)
+    elapsed = time.perf_counter() - start
+    print(f"   {imported + skipped} lignes lues en {elapsed:.2f} s "
+          f"({(imported + skipped) / elapsed if elapsed else 0:.0f} lignes/s)")
+    return imported
+
+
+def run_export(db: DatabaseManager, path: str, fmt: str) -> int:
+    """Exporte la base dans un fichier ; retourne le nombre de prompts écrits."""
+    start = time.perf_counter()
+    with open(path, "w", encoding="utf-8", newline="") as stream:
+        count = db.export_prompts(stream, fmt)
+    elapsed = time.perf_counter() - start
+    print(f"✓ {count} prompt(s) exporté(s) vers {path} en {elapsed:.2f} s")
+    return count
+
+
+def main(argv=None) -> int:
+    """Point d'entrée de la ligne de commande."""
+    parser = argparse.ArgumentParser(description="Import/export des prompts PromptMaster")
+    parser.add_argument("action", choices=("import", "export"))
+    parser.add_argument("path", help="Fichier .jsonl ou .csv")
+    parser.add_argument("--db", default="promptmaster.db", help="Base de données SQLite")
+    parser.add_argument("--format", choices=EXPORT_FORMATS,
+                        help="Format du fichier (déduit de l'extension par défaut)")
+    parser.add_argument("--chunk-size", type=int, default=IMPORT_CHUNK_SIZE,
+                        help="Lignes insérées par transaction lors d'un import")
+    args = parser.parse_args(argv)
+
+    fmt = args.format or guess_format(args.path)
+
+    with DatabaseManager(args.db) as db:
+        try:
+            if args.action == "import":
+                run_import(db, args.path, fmt, args.chunk_size)
+            else:
+                run_export(db, args.path, fmt)
+        except (OSError, ValueError) as e:
+            print(f"❌ Erreur : {e}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
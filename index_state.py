@@ -0,0 +1,89 @@
+"""
+État de chargement des index en mémoire tenus à jour par les notifications
+de DatabaseManager (classement contextuel, mots-clés, recherche approximative).
+
+Un index est chargé à partir d'un instantané de la base, puis modifié à
+chaque notification. Une modification faite pendant la lecture de
+l'instantané peut y manquer : ces notifications sont mises de côté et
+rejouées une fois l'instantané installé, au lieu d'être ignorées.
+"""
+
+import threading
+from typing import Callable, List, Optional, Tuple
+
+
+class IndexState:
+    """
+    Chargé / en chargement / à charger, avec les notifications reçues pendant le chargement.
+
+    Les notifications mises de côté sont rejouées par la fonction refresh,
+    qui relit le prompt en base (ou le retire s'il n'existe plus) : rejouer
+    une modification déjà présente dans l'instantané est sans effet.
+    """
+
+    def __init__(self, refresh: Callable[[int], None]):
+        """
+        Initialise l'état (index à charger).
+
+        Args:
+            refresh: Met à jour l'index pour un ID de prompt, d'après la base
+        """
+        self.refresh = refresh
+        self.loaded = False
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()  # Un seul chargement à la fois
+        self._pending: Optional[List[Tuple[str, Optional[int]]]] = None  # Liste pendant un chargement
+
+    def ensure_loaded(self, load: Callable[[], None]):
+        """
+        Charge l'index s'il ne l'est pas, puis rejoue les notifications reçues entre-temps.
+
+        Args:
+            load: Lit l'instantané de la base et le charge dans l'index
+        """
+        if self.loaded:
+            return
+        with self._load_lock:
+            with self._lock:
+                if self.loaded:
+                    return
+                self._pending = []
+            try:
+                load()
+            finally:
+                with self._lock:
+                    pending, self._pending = self._pending, None
+            with self._lock:
+                # Un import en masse pendant le chargement : l'instantané est peut-être incomplet
+                self.loaded = all(event != "imported" for event, _ in pending)
+            if self.loaded:
+                for prompt_id in dict.fromkeys(prompt_id for _, prompt_id in pending):
+                    self.refresh(prompt_id)
+
+    def invalidate(self):
+        """Demande un rechargement complet au prochain ensure_loaded."""
+        with self._lock:
+            self.loaded = False
+            if self._pending is not None:
+                self._pending.append(("imported", None))
+
+    def accept(self, event: str, prompt_id: Optional[int]) -> bool:
+        """
+        Trie une notification de la base.
+
+        Args:
+            event: Événement ("added", "updated", "deleted", "usage", "imported")
+            prompt_id: ID du prompt concerné
+
+        Returns:
+            True si l'index est chargé et que l'appelant doit appliquer la
+            modification ; False si elle est mise de côté (chargement en
+            cours) ou sans objet (index à charger, import en masse)
+        """
+        with self._lock:
+            if self._pending is not None:
+                self._pending.append((event, prompt_id))
+                return False
+            if event == "imported":
+                self.loaded = False
+            return self.loaded
@@ -0,0 +1,138 @@
+"""
+Extraction de mots-clés pour les suggestions de tags de PromptMaster.
+Les mots d'un texte sont classés par TF-IDF : un mot fréquent dans le texte
+mais rare dans la bibliothèque l'emporte sur un mot présent partout.
+
+Les fréquences de documents (nombre de prompts contenant chaque mot) sont
+gardées en mémoire et tenues à jour à chaque ajout, modification ou
+suppression, sans relire la bibliothèque.
+"""
+
+import heapq
+import math
+import re
+import threading
+from collections import Counter
+from typing import Dict, FrozenSet, Iterable, List, Tuple
+
+
+# Mots plus courts ignorés
+MIN_KEYWORD_LENGTH = 4
+
+# Mots d'au moins MIN_KEYWORD_LENGTH lettres ou chiffres (accents conservés)
+WORD_PATTERN = re.compile(rf"[^\W_]{{{MIN_KEYWORD_LENGTH},}}")
+
+# Mots courants ignorés (en minuscules, avec accents)
+STOPWORDS_FR = frozenset("""
+    alors aussi autre autres avant avec avoir bien cela celle celles celui cette ceux chaque
+    comme comment dans depuis donc dont elle elles encore entre être fait faire leur leurs
+    mais même mêmes moins nous notre pour pourquoi quand quel quelle quelles quels
+    sans sera seront sont sous tous tout toute toutes très vers votre vous était étaient
+    avez avons ceci suis peut peuvent doit doivent plus puis selon ainsi après
+""".split())
+
+STOPWORDS_EN = frozenset("""
+    about above after again against also because been before being below between both
+    could does doing down during each from further have having here into itself just more
+    most only other over same should some such than that their theirs them then there
+    these they this those through under until very were what when where which while with
+    would your yours will shall make made using used please want need like
+""".split())
+
+STOPWORDS = STOPWORDS_FR | STOPWORDS_EN
+
+
+def extract_terms(text: str) -> Counter:
+    """
+    Mots significatifs d'un texte, avec leur nombre d'occurrences.
+
+    Les mots sont mis en minuscules ; les mots vides et les nombres sont ignorés.
+    L'ordre du Counter est celui de la première apparition.
+    """
+    return Counter(word for word in WORD_PATTERN.findall(text.casefold())
+                   if word not in STOPWORDS and not word.isdigit())
+
+
+class KeywordExtractor:
+    """
+    Classement TF-IDF des mots d'un texte par rapport à la bibliothèque.
+
+    Chaque prompt indexé est un document (titre, contenu et tags). Sans
+    document indexé, le classement se fait sur la seule fréquence des mots.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._document_frequency: Counter = Counter()  # mot -> nombre de prompts
+        self._documents: Dict[int, FrozenSet[str]] = {}  # id -> mots du prompt
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+    def load(self, documents: Iterable[Tuple[int, str]]):
+        """
+        Reconstruit les fréquences à partir de toute la bibliothèque.
+
+        Args:
+            documents: Couples (id du prompt, texte)
+        """
+        frequency: Counter = Counter()
+        terms_by_id: Dict[int, FrozenSet[str]] = {}
+        for prompt_id, text in documents:
+            terms = frozenset(extract_terms(text))
+            terms_by_id[prompt_id] = terms
+            frequency.update(terms)
+        with self._lock:
+            self._document_frequency = frequency
+            self._documents = terms_by_id
+
+    def upsert(self, prompt_id: int, text: str):
+        """Ajoute ou remplace un document."""
+        terms = frozenset(extract_terms(text))
+        with self._lock:
+            previous = self._documents.get(prompt_id, frozenset())
+            self._document_frequency.subtract(previous - terms)
+            self._document_frequency.update(terms - previous)
+            self._drop_unused(previous - terms)
+            self._documents[prompt_id] = terms
+
+    def remove(self, prompt_id: int):
+        """Retire un document (sans effet s'il est absent)."""
+        with self._lock:
+            previous = self._documents.pop(prompt_id, frozenset())
+            self._document_frequency.subtract(previous)
+            self._drop_unused(previous)
+
+    def document_frequency(self, term: str) -> int:
+        """Nombre de documents qui contiennent un mot."""
+        return self._document_frequency.get(term, 0)
+
+    def idf(self, term: str) -> float:
+        """Fréquence inverse de document, lissée (toujours >= 1)."""
+        return math.log((len(self._documents) + 1) / (self.document_frequency(term) + 1)) + 1
+
+    def keywords(self, text: str, max_keywords: int = 5) -> List[str]:
+        """
+        Mots-clés d'un texte, du plus au moins caractéristique.
+
+        Le poids d'un mot est (1 + log tf) × idf : les répétitions comptent
+        de moins en moins, et les mots rares dans la bibliothèque davantage.
+        À égalité, l'ordre d'apparition dans le texte est conservé.
+
+        Args:
+            text: Texte à analyser
+            max_keywords: Nombre maximum de mots-clés
+
+        Returns:
+            Liste de mots-clés
+        """
+        terms = extract_terms(text)
+        with self._lock:
+            scored = [((1 + math.log(count)) * self.idf(term), term) for term, count in terms.items()]
+        return [term for _, term in heapq.nlargest(max_keywords, scored, key=lambda item: item[0])]
+
+    def _drop_unused(self, terms: Iterable[str]):
+        """Supprime les mots qui ne figurent plus dans aucun document (verrou tenu)."""
+        for term in terms:
+            if self._document_frequency[term] <= 0:
+                del self._document_frequency[term]
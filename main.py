@@ -1,14 +1,43 @@
 """
 Gestionnaire de raccourci clavier global pour PromptMaster.
 Écoute Ctrl+Space pour afficher/masquer l'application avec capture du texte sélectionné.
+
+Le démarrage n'importe que Qt : pynput est chargé dans un thread
+d'arrière-plan, l'interface (qfluentwidgets) et le contexte au moment de
+préparer la fenêtre (voir test_startup.py pour le budget d'import).
 """
 
 import sys
-from pynput import keyboard
-from PySide6.QtWidgets import QApplication
-from PySide6.QtCore import QObject, Signal, QTimer
-from gui import PromptMasterWindow
-from context_manager import ContextManager
+import threading
+import time
+from PySide6.QtWidgets import QApplication, QWidget
+from PySide6.QtCore import QObject, Signal, QTimer, QEvent
+from timing import LatencyRecorder
+
+
+# Délai après le lancement avant de préparer la fenêtre en arrière-plan (ms)
+WARM_START_DELAY_MS = 300
+
+
+class FirstPaintProbe(QObject):
+    """Mesure le temps entre une demande d'affichage et le premier dessin d'une fenêtre."""
+    
+    def __init__(self, recorder: LatencyRecorder, parent: QObject = None):
+        super().__init__(parent)
+        self.recorder = recorder
+        self._started = None
+    
+    def start(self):
+        """Démarre la mesure (juste avant show())."""
+        self._started = time.perf_counter()
+    
+    def eventFilter(self, watched: QObject, event: QEvent) -> bool:
+        if self._started is not None and event.type() == QEvent.Type.Paint:
+            elapsed = time.perf_counter() - self._started
+            self._started = None
+            self.recorder.record(elapsed)
+            print(f"⏱️ Premier affichage en {elapsed * 1e3:.0f} ms")
+        return False
 
 
 class HotkeyListener(QObject):
@@ -17,44 +46,53 @@ class HotkeyListener(QObject):
     # Signal pour communiquer avec le thread Qt
     toggle_signal = Signal()
     
-    def __init__(self, app: QApplication):
+    def __init__(self, app: QApplication, warm_start: bool = True):
+        """
+        Initialise le gestionnaire de raccourci.
+        
+        Args:
+            app: Application Qt
+            warm_start: Préparer la fenêtre en arrière-plan après le lancement
+                (voir prewarm_window) au lieu de la construire au premier appui
+        """
         super().__init__()
         self.app = app
         self.window = None
-        self.context_manager = ContextManager()
+        self.warm_start = warm_start
+        self.show_latency = LatencyRecorder("Raccourci → premier affichage")
+        self.paint_probe = FirstPaintProbe(self.show_latency, self)
+        self._context_manager = None
+        self.listener = None
+        self._listener_thread = None
         self.current_keys = set()
         self.hotkey_triggered = False  # Flag pour éviter les doubles triggers
         
         # Connecter le signal au slot
         self.toggle_signal.connect(self._toggle_window_slot)
-        
-        # Combinaison de touches : Ctrl + Space
-        self.HOTKEYS = {
-            keyboard.Key.ctrl_l,
-            keyboard.Key.space
-        }
-        
-        # Alternative : Ctrl droit
-        self.HOTKEYS_ALT = {
-            keyboard.Key.ctrl_r,
-            keyboard.Key.space
-        }
+    
+    @property
+    def context_manager(self):
+        """Gestionnaire de contexte, créé au premier accès (pynput, pywin32...)."""
+        if self._context_manager is None:
+            from context_manager import ContextManager
+            self._context_manager = ContextManager()
+        return self._context_manager
     
     def on_press(self, key):
         """Appelé quand une touche est pressée."""
         self.current_keys.add(key)
         
         # Déclencher seulement quand Space est pressée ET Ctrl est déjà enfoncé
-        if key == keyboard.Key.space and not self.hotkey_triggered:
-            if (keyboard.Key.ctrl_l in self.current_keys or 
-                keyboard.Key.ctrl_r in self.current_keys):
+        if key == self.Key.space and not self.hotkey_triggered:
+            if (self.Key.ctrl_l in self.current_keys or 
+                self.Key.ctrl_r in self.current_keys):
                 self.hotkey_triggered = True
                 self.toggle_signal.emit()
     
     def on_release(self, key):
         """Appelé quand une touche est relâchée."""
         # Réinitialiser le flag quand Space est relâché
-        if key == keyboard.Key.space:
+        if key == self.Key.space:
             self.hotkey_triggered = False
         
         # Enlever la touche de l'ensemble
@@ -67,10 +105,12 @@ class HotkeyListener(QObject):
             self.window.hide()
             print("🔽 Fenêtre masquée")
         else:
+            self.paint_probe.start()
+            
             # Créer la fenêtre si elle n'existe pas encore
             if not self.window:
                 print("🔼 Fenêtre affichée")
-                self.window = PromptMasterWindow()
+                self.window = self.create_window()
             else:
                 print("🔼 Fenêtre réaffichée")
             
@@ -79,8 +119,62 @@ class HotkeyListener(QObject):
             self.window.activateWindow()
             self.window.raise_()
     
+    def create_window(self):
+        """Construit la fenêtre principale (base, prompts, widgets)."""
+        from gui import PromptMasterWindow  # qfluentwidgets : import coûteux
+        
+        window = PromptMasterWindow()
+        window.installEventFilter(self.paint_probe)
+        return window
+    
+    def prewarm_window(self):
+        """
+        Construit la fenêtre sans l'afficher, pendant que l'application est
+        inactive : au premier Ctrl+Space, il ne reste qu'à l'afficher.
+        """
+        if self.window:
+            return
+        
+        start = time.perf_counter()
+        self.window = self.create_window()
+        
+        # Appliquer les feuilles de style et calculer la mise en page maintenant
+        self.window.ensurePolished()
+        for widget in self.window.findChildren(QWidget):
+            widget.ensurePolished()
+        if self.window.layout():
+            self.window.layout().activate()
+        self.window.winId()  # Créer la fenêtre native
+        
+        print(f"✓ Fenêtre préparée en arrière-plan ({(time.perf_counter() - start) * 1e3:.0f} ms)")
+    
     def start(self):
-        """Démarre l'écoute des événements clavier."""
+        """Démarre l'écoute des événements clavier (pynput chargé en arrière-plan)."""
+        self._listener_thread = threading.Thread(target=self._start_keyboard_listener,
+                                                 name="hotkey-listener-start", daemon=True)
+        self._listener_thread.start()
+        
+        if self.warm_start:
+            QTimer.singleShot(WARM_START_DELAY_MS, self.prewarm_window)
+    
+    def _start_keyboard_listener(self):
+        """Importe pynput et démarre l'écoute (thread d'arrière-plan)."""
+        from pynput import keyboard
+        
+        self.Key = keyboard.Key
+        
+        # Combinaison de touches : Ctrl + Space
+        self.HOTKEYS = {
+            keyboard.Key.ctrl_l,
+            keyboard.Key.space
+        }
+        
+        # Alternative : Ctrl droit
+        self.HOTKEYS_ALT = {
+            keyboard.Key.ctrl_r,
+            keyboard.Key.space
+        }
+        
         self.listener = keyboard.Listener(
             on_press=self.on_press,
             on_release=self.on_release
@@ -90,16 +184,20 @@ class HotkeyListener(QObject):
     
     def stop(self):
         """Arrête l'écoute des événements clavier."""
-        if hasattr(self, 'listener'):
+        if self._listener_thread is not None:
+            self._listener_thread.join()
+        if self.listener is not None:
             self.listener.stop()
+        if len(self.show_latency):
+            print(self.show_latency.report())
 
 
 def main():
     """Point d'entrée de l'application avec raccourci global."""
     app = QApplication(sys.argv)
     
-    # Configurer le raccourci clavier
-    hotkey_listener = HotkeyListener(app)
+    # Configurer le raccourci clavier (--no-warm-start : fenêtre construite au premier appui)
+    hotkey_listener = HotkeyListener(app, warm_start="--no-warm-start" not in sys.argv)
     hotkey_listener.start()
     
     # Message de bienvenue
@@ -110,8 +208,8 @@ def main():
     print("Appuyez sur Échap pour la fermer")
     print("="*50 + "\n")
     
-    # Ne PAS créer la fenêtre au démarrage
-    # L'utilisateur appuiera sur Ctrl+Space pour l'ouvrir
+    # La fenêtre n'est pas affichée au démarrage : elle est préparée en
+    # arrière-plan et l'utilisateur appuiera sur Ctrl+Space pour l'ouvrir
     
     # Lancer l'application
     try:
@@ -0,0 +1,92 @@
+"""
+Cache LRU des prompts complets pour PromptMaster.
+Évite un aller-retour SQLite à chaque changement de sélection ou copie.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+class PromptCache:
+    """Cache LRU borné de tuples (id, title, content, category, tags, usage_count)."""
+
+    def __init__(self, maxsize: int = 256):
+        """
+        Initialise le cache.
+
+        Args:
+            maxsize: Nombre maximal de prompts gardés en mémoire
+        """
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[int, Tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Incrémenté à chaque invalidation : une lecture SQLite commencée avant
+        # ne doit pas remettre en cache une version périmée
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, prompt_id: int) -> Optional[Tuple]:
+        """Retourne le prompt en cache (et le marque comme récent), ou None."""
+        with self._lock:
+            prompt = self._entries.get(prompt_id)
+            if prompt is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(prompt_id)
+            self.hits += 1
+            return prompt
+
+    def put(self, prompt: Tuple, generation: Optional[int] = None):
+        """
+        Ajoute ou remplace un prompt en évinçant les moins récents.
+
+        Args:
+            prompt: Tuple (id, title, content, category, tags, usage_count)
+            generation: Valeur de self.generation lue avant la requête SQLite ;
+                l'ajout est ignoré si une invalidation a eu lieu depuis
+        """
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            self._entries[prompt[0]] = prompt
+            self._entries.move_to_end(prompt[0])
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def missing(self, prompt_ids: Iterable[int]) -> List[int]:
+        """Retourne les IDs absents du cache (sans toucher aux statistiques)."""
+        with self._lock:
+            return [prompt_id for prompt_id in prompt_ids if prompt_id not in self._entries]
+
+    def invalidate(self, prompt_id: int):
+        """Retire un prompt du cache."""
+        with self._lock:
+            self.generation += 1
+            self._entries.pop(prompt_id, None)
+
+    def clear(self):
+        """Vide le cache."""
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Statistiques d'utilisation du cache.
+
+        Returns:
+            Dict avec hits, misses, hit_rate et size
+        """
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0,
+                'size': len(self._entries),
+            }
+
+    def __len__(self) -> int:
+        return len(self._entries)
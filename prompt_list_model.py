@@ -0,0 +1,146 @@
+"""
+Modèle Qt de la liste de résultats de PromptMaster.
+Les prompts restent dans une liste Python ; la vue ne crée des lignes que
+par lots (canFetchMore/fetchMore) et ne dessine que les lignes visibles.
+"""
+
+from typing import List, Optional, Sequence
+
+from PySide6.QtCore import QAbstractListModel, QModelIndex, Qt
+
+from database import PromptSummary
+
+
+class PromptListModel(QAbstractListModel):
+    """Modèle virtualisé de PromptSummary (id, title, category, usage_count, snippet)."""
+
+    # Rôle exposant l'ID du prompt d'une ligne
+    PromptIdRole = Qt.ItemDataRole.UserRole
+
+    def __init__(self, separator: str = " • ", batch_size: int = 200, parent=None):
+        """
+        Initialise le modèle.
+
+        Args:
+            separator: Séparateur entre titre, catégorie et compteur d'usage
+            batch_size: Nombre de lignes exposées à la vue à chaque fetchMore
+            parent: QObject parent
+        """
+        super().__init__(parent)
+        self.separator = separator
+        self.batch_size = batch_size
+        self._prompts: List[PromptSummary] = []
+        self._loaded = 0  # Nombre de lignes déjà exposées à la vue
+
+    # --- API QAbstractListModel ---
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else self._loaded
+
+    def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or index.row() >= self._loaded:
+            return None
+
+        prompt = self._prompts[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return self.format_prompt(prompt)
+        if role == Qt.ItemDataRole.ToolTipRole:
+            return prompt.snippet
+        if role == self.PromptIdRole:
+            return prompt.id
+        return None
+
+    def canFetchMore(self, parent: QModelIndex = QModelIndex()) -> bool:
+        return not parent.isValid() and self._loaded < len(self._prompts)
+
+    def fetchMore(self, parent: QModelIndex = QModelIndex()):
+        if parent.isValid():
+            return
+        count = min(self.batch_size, len(self._prompts) - self._loaded)
+        if count <= 0:
+            return
+        self.beginInsertRows(QModelIndex(), self._loaded, self._loaded + count - 1)
+        self._loaded += count
+        self.endInsertRows()
+
+    # --- API PromptMaster ---
+
+    def format_prompt(self, prompt: PromptSummary) -> str:
+        """Texte affiché pour un prompt : titre • catégorie • ✨ usage."""
+        _, title, category, usage_count, _ = prompt
+        display_text = f"{title}"
+        if category:
+            display_text += f"{self.separator}{category}"
+        if usage_count > 0:
+            display_text += f"{self.separator}✨ {usage_count}"
+        return display_text
+
+    def set_prompts(self, prompts: Sequence[PromptSummary]):
+        """
+        Remplace le contenu du modèle.
+
+        Si les mêmes prompts sont affichés dans le même ordre, seules les lignes
+        modifiées sont signalées (dataChanged) ; sinon le modèle est réinitialisé.
+        """
+        prompts = list(prompts)
+        if len(prompts) == len(self._prompts) and all(
+                new.id == old.id for new, old in zip(prompts, self._prompts)):
+            changed = [row for row, (new, old) in enumerate(zip(prompts, self._prompts)) if new != old]
+            self._prompts = prompts
+            for row in changed:
+                if row < self._loaded:
+                    index = self.index(row)
+                    self.dataChanged.emit(index, index)
+            return
+
+        self.beginResetModel()
+        self._prompts = prompts
+        self._loaded = min(self.batch_size, len(prompts))
+        self.endResetModel()
+
+    def replace_prompt(self, prompt: PromptSummary) -> bool:
+        """
+        Remplace la ligne d'un prompt (même ID) et ne signale qu'elle à la vue.
+
+        Returns:
+            True si le prompt est dans le modèle
+        """
+        row = next((row for row, current in enumerate(self._prompts) if current.id == prompt.id), None)
+        if row is None:
+            return False
+        if self._prompts[row] != prompt:
+            self._prompts[row] = prompt
+            if row < self._loaded:
+                index = self.index(row)
+                self.dataChanged.emit(index, index)
+        return True
+
+    def prompt_at(self, row: int) -> Optional[PromptSummary]:
+        """Retourne le prompt d'une ligne, ou None."""
+        if 0 <= row < len(self._prompts):
+            return self._prompts[row]
+        return None
+
+    def prompt_id(self, row: int) -> Optional[int]:
+        """Retourne l'ID du prompt d'une ligne, ou None."""
+        prompt = self.prompt_at(row)
+        return prompt.id if prompt else None
+
+    def neighbour_ids(self, row: int, radius: int = 2) -> List[int]:
+        """IDs des prompts autour d'une ligne (hors ligne elle-même), pour le préchargement."""
+        first = max(row - radius, 0)
+        last = min(row + radius, len(self._prompts) - 1)
+        return [self._prompts[r].id for r in range(first, last + 1) if r != row]
+
+    def ensure_row_loaded(self, row: int) -> bool:
+        """
+        Expose à la vue les lots nécessaires pour atteindre une ligne.
+
+        Returns:
+            True si la ligne existe
+        """
+        if not 0 <= row < len(self._prompts):
+            return False
+        while row >= self._loaded:
+            self.fetchMore()
+        return True
@@ -0,0 +1,203 @@
+"""
+Modèles de prompts à variables pour PromptMaster.
+Un prompt peut contenir des variables entre crochets, en majuscules :
+"Rédigez un email pour promouvoir [PRODUIT]". Chaque prompt est analysé une
+seule fois en une chaîne de format Python ; le remplissage est ensuite un
+simple str.format, assez rapide pour générer des centaines de variantes.
+"""
+
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+# Variable : [NOM], en majuscules (chiffres, espaces, tirets et _ permis après la 1re lettre)
+PLACEHOLDER_PATTERN = re.compile(r"\[([A-ZÀ-ÖØ-Þ][A-ZÀ-ÖØ-Þ0-9_ -]*)\]")
+
+# Variables remplies avec le texte sélectionné / le contexte de la fenêtre active
+SELECTION_VARIABLES = frozenset({"TEXTE", "SELECTION", "SÉLECTION", "DESCRIPTION", "CODE", "SUJET"})
+WINDOW_TITLE_VARIABLES = frozenset({"FENETRE", "FENÊTRE", "TITRE FENETRE", "TITRE FENÊTRE"})
+APPLICATION_VARIABLES = frozenset({"APPLICATION", "APP", "LOGICIEL"})
+
+
+class CompiledTemplate:
+    """
+    Prompt analysé : chaîne de format et liste de ses variables.
+
+    Les accolades du texte sont échappées et chaque variable devient un
+    champ positionnel ({0}, {1}...) ; une variable répétée réutilise le
+    même champ.
+    """
+
+    __slots__ = ("variables", "_format")
+
+    def __init__(self, text: str):
+        """
+        Analyse un texte.
+
+        Args:
+            text: Contenu du prompt
+        """
+        positions: Dict[str, int] = {}
+        parts = []
+        last = 0
+        for match in PLACEHOLDER_PATTERN.finditer(text):
+            name = match.group(1)
+            position = positions.setdefault(name, len(positions))
+            parts.append(text[last:match.start()].replace("{", "{{").replace("}", "}}"))
+            parts.append(f"{{{position}}}")
+            last = match.end()
+        parts.append(text[last:].replace("{", "{{").replace("}", "}}"))
+
+        self.variables: Tuple[str, ...] = tuple(positions)
+        self._format = "".join(parts)
+
+    def render(self, values: Dict[str, str]) -> str:
+        """
+        Remplit les variables.
+
+        Args:
+            values: Dict nom de variable -> valeur ; une variable absente
+                reste telle quelle ([NOM]) dans le résultat
+
+        Returns:
+            Le texte rempli
+        """
+        return self._format.format(*[values.get(name, f"[{name}]") for name in self.variables])
+
+    def render_many(self, fills: Iterable[Dict[str, str]]) -> List[str]:
+        """Remplit le modèle une fois par dict de valeurs (voir render)."""
+        fmt = self._format.format
+        variables = self.variables
+        return [fmt(*[values.get(name, f"[{name}]") for name in variables]) for values in fills]
+
+
+def context_fills(template: CompiledTemplate, selected_text: Optional[str] = None,
+                  context: Optional[Dict] = None) -> Dict[str, str]:
+    """
+    Valeurs des variables qui peuvent être déduites de la situation.
+
+    - [TEXTE], [SELECTION], [DESCRIPTION], [CODE], [SUJET] : texte sélectionné
+      (et toute variable unique d'un modèle, à défaut) ;
+    - [FENETRE] : titre de la fenêtre active ; [APPLICATION] : son application.
+
+    Args:
+        template: Modèle à remplir
+        selected_text: Texte sélectionné capturé (optionnel)
+        context: Contexte de la fenêtre active (get_active_window_info)
+
+    Returns:
+        Dict nom de variable -> valeur (seulement les variables déduites)
+    """
+    values = {}
+    for name in template.variables:
+        if selected_text and name in SELECTION_VARIABLES:
+            values[name] = selected_text
+        elif context and name in WINDOW_TITLE_VARIABLES and context.get('window_title'):
+            values[name] = context['window_title']
+        elif context and name in APPLICATION_VARIABLES and context.get('app_name', 'Unknown') != 'Unknown':
+            values[name] = context['app_name']
+    if selected_text and not values and len(template.variables) == 1:
+        values[template.variables[0]] = selected_text
+    return values
+
+
+class TemplateEngine:
+    """
+    Modèles compilés des prompts, en cache LRU par ID.
+
+    Le cache est tenu à jour par les notifications de DatabaseManager : un
+    prompt modifié ou supprimé est recompilé à sa prochaine utilisation.
+    """
+
+    def __init__(self, db, maxsize: int = 256):
+        """
+        Initialise le moteur.
+
+        Args:
+            db: Instance de DatabaseManager
+            maxsize: Nombre maximal de modèles compilés gardés en mémoire
+        """
+        self.db = db
+        self.maxsize = maxsize
+        self._templates: "OrderedDict[int, CompiledTemplate]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = 0  # Incrémenté à chaque invalidation (voir get)
+        self.compilations = 0
+        db.add_change_listener(self._on_prompt_changed)
+
+    def close(self):
+        """Se désabonne des modifications de la base."""
+        self.db.remove_change_listener(self._on_prompt_changed)
+
+    def get(self, prompt_id: int, content: Optional[str] = None) -> Optional[CompiledTemplate]:
+        """
+        Retourne le modèle compilé d'un prompt.
+
+        Args:
+            prompt_id: ID du prompt
+            content: Contenu du prompt s'il vient d'être lu (évite une lecture)
+
+        Returns:
+            Le modèle, ou None si le prompt n'existe pas
+        """
+        with self._lock:
+            template = self._templates.get(prompt_id)
+            if template is not None:
+                self._templates.move_to_end(prompt_id)
+                return template
+            generation = self._generation
+
+        if content is None:
+            prompt = self.db.get_prompt_by_id(prompt_id)
+            if prompt is None:
+                return None
+            content = prompt[2]
+        template = CompiledTemplate(content)
+
+        with self._lock:
+            self.compilations += 1
+            # Ne pas garder un modèle compilé avant une modification concurrente
+            if generation == self._generation:
+                self._templates[prompt_id] = template
+                while len(self._templates) > self.maxsize:
+                    self._templates.popitem(last=False)
+        return template
+
+    def variables(self, prompt_id: int) -> Tuple[str, ...]:
+        """Variables d'un prompt, dans l'ordre de première apparition."""
+        template = self.get(prompt_id)
+        return template.variables if template else ()
+
+    def render(self, prompt_id: int, values: Dict[str, str]) -> Optional[str]:
+        """
+        Remplit les variables d'un prompt (voir CompiledTemplate.render).
+
+        Returns:
+            Le texte rempli, ou None si le prompt n'existe pas
+        """
+        template = self.get(prompt_id)
+        return template.render(values) if template else None
+
+    def render_batch(self, prompt_id: int, fills: Iterable[Dict[str, str]]) -> List[str]:
+        """
+        Génère une variante d'un prompt par dict de valeurs.
+
+        Args:
+            prompt_id: ID du prompt
+            fills: Dicts nom de variable -> valeur
+
+        Returns:
+            Les textes remplis (liste vide si le prompt n'existe pas)
+        """
+        template = self.get(prompt_id)
+        return template.render_many(fills) if template else []
+
+    def _on_prompt_changed(self, event: str, prompt_id: Optional[int]):
+        """Invalide les modèles des prompts modifiés ou supprimés."""
+        if event not in ("updated", "deleted"):
+            return  # Un ajout ou un import ne modifie pas les prompts existants
+        with self._lock:
+            self._generation += 1
+            self._templates.pop(prompt_id, None)
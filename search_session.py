@@ -0,0 +1,289 @@
+"""
+Session de recherche incrémentale pour PromptMaster.
+Quand la saisie s'allonge ("pyth" → "pytho" → "python"), les résultats ne
+peuvent que se restreindre : ils sont filtrés en mémoire au lieu de relancer
+une requête SQLite à chaque frappe.
+
+Les résultats sont des PromptSummary (sans contenu) ; les mots du contenu ne
+sont lus qu'une fois par prompt, au premier filtrage qui en a besoin.
+
+Une saisie qui commence par FUZZY_PREFIX ("~pyhton") lance une recherche
+approximative, tolérante aux fautes de frappe (voir fuzzy_search) ; une
+saisie qui commence par SEMANTIC_PREFIX ("?traduire en anglais") ajoute aux
+résultats les prompts de sens proche (voir semantic_search).
+"""
+
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+from database import DatabaseManager, PromptSummary, FTS_TOKEN_PATTERN
+from index_state import IndexState
+
+
+# Préfixe de saisie de la recherche approximative
+FUZZY_PREFIX = "~"
+
+# Nombre maximum de résultats d'une recherche approximative
+FUZZY_LIMIT = 50
+
+# Préfixe de saisie de la recherche sémantique
+SEMANTIC_PREFIX = "?"
+
+# Pendant la vectorisation d'arrière-plan, les interfaces signalent des
+# résultats sémantiques partiels et relancent la recherche à cet intervalle
+SEMANTIC_REFRESH_MS = 500
+SEMANTIC_BUILDING_HINT = "⏳ Index sémantique en construction : résultats partiels"
+
+
+def fold_text(text: str) -> str:
+    """
+    Normalise un texte comme le tokenizer FTS5 (unicode61 remove_diacritics 2) :
+    sans accents et insensible à la casse.
+    """
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(c for c in decomposed if not unicodedata.combining(c)).casefold()
+
+
+def tokenize(text: str) -> List[str]:
+    """Découpe un texte normalisé en mots (mêmes règles que l'index FTS5)."""
+    return FTS_TOKEN_PATTERN.findall(fold_text(text))
+
+
+def fuzzy_query(text: str) -> str:
+    """Saisie à passer à SearchSession.search pour une recherche approximative."""
+    return text if text.startswith(FUZZY_PREFIX) else FUZZY_PREFIX + text
+
+
+def semantic_query(text: str) -> str:
+    """Saisie à passer à SearchSession.search pour une recherche sémantique."""
+    return text if text.startswith(SEMANTIC_PREFIX) else SEMANTIC_PREFIX + text
+
+
+class SearchSession:
+    """
+    Cache de résultats par préfixe de saisie.
+
+    - Requête déjà vue : résultats renvoyés depuis le cache.
+    - Requête qui prolonge une requête en cache : filtrage en mémoire de
+      l'ensemble précédent (l'ordre de classement précédent est conservé).
+    - Sinon (saisie raccourcie vers un préfixe inconnu, nouvelle recherche) :
+      requête à la base.
+
+    Utilisable depuis un thread de recherche en arrière-plan : invalidate()
+    peut être appelée depuis le thread GUI sans attendre la requête en cours.
+    """
+
+    def __init__(self, db: DatabaseManager, max_filter_rows: int = 5000,
+                 max_cached_queries: int = 64):
+        """
+        Initialise la session de recherche.
+
+        Args:
+            db: Instance de DatabaseManager
+            max_filter_rows: Au-delà de ce nombre de résultats, le filtrage en
+                mémoire coûte plus cher qu'une requête FTS5 : on interroge la base
+            max_cached_queries: Nombre de requêtes gardées en cache
+        """
+        self.db = db
+        self.max_filter_rows = max_filter_rows
+        self.max_cached_queries = max_cached_queries
+
+        # requête normalisée -> (mots de la requête, résultats)
+        self._results: "OrderedDict[str, Tuple[List[str], List[PromptSummary]]]" = OrderedDict()
+        # id du prompt -> mots indexables (titre, contenu, tags, catégorie)
+        self._row_tokens: Dict[int, FrozenSet[str]] = {}
+        self._lock = threading.Lock()
+        # Incrémenté à chaque invalidation : un résultat obtenu avant n'est pas mis en cache
+        self._epoch = 0
+
+        # Index de la recherche approximative, construit à la première
+        # recherche approximative puis tenu à jour
+        self.fuzzy_index = None
+        self._fuzzy_state = IndexState(self._refresh_fuzzy)
+        self._fuzzy_lock = threading.Lock()
+
+        # Statistiques
+        self.db_queries = 0
+        self.narrowed_queries = 0
+        self.cache_hits = 0
+        self.fuzzy_queries = 0
+        self.semantic_queries = 0
+
+    def search(self, query: str) -> List[PromptSummary]:
+        """
+        Recherche des prompts en réutilisant les résultats des préfixes précédents.
+
+        Args:
+            query: Terme de recherche
+
+        Returns:
+            Liste de PromptSummary (id, title, category, usage_count, snippet)
+        """
+        if query.startswith(FUZZY_PREFIX):
+            query = query[len(FUZZY_PREFIX):]
+            # Sans mot assez long pour être approché, recherche exacte
+            if self._has_fuzzy_terms(query):
+                return self.fuzzy_search(query)
+        elif query.startswith(SEMANTIC_PREFIX):
+            query = query[len(SEMANTIC_PREFIX):]
+            # Sans texte, recherche vide comme sans préfixe (pas de LIKE '%%' classé au hasard)
+            if query.strip():
+                # Les voisins sémantiques ne contiennent pas forcément les mots
+                # saisis : pas de filtrage en mémoire ni de cache par préfixe
+                with self._lock:
+                    self.semantic_queries += 1
+                return self.db.search_prompt_summaries(query, semantic=True)
+
+        key = fold_text(query).strip()
+        tokens = tokenize(key)
+
+        with self._lock:
+            epoch = self._epoch
+            cached = self._results.get(key)
+            if cached is not None:
+                self._results.move_to_end(key)
+                self.cache_hits += 1
+                return cached[1]
+
+            base = self._find_narrowable(key, tokens)
+            if base is not None:
+                missing = [row.id for row in base if row.id not in self._row_tokens]
+
+        # Les accès SQLite s'exécutent hors du verrou
+        if base is not None:
+            fetched = self._load_tokens(missing)
+            with self._lock:
+                if epoch == self._epoch:
+                    self._row_tokens.update(fetched)
+                row_tokens = self._row_tokens
+                results = [row for row in base
+                           if self._row_matches(row_tokens.get(row.id) or fetched.get(row.id), tokens)]
+                self.narrowed_queries += 1
+                if epoch == self._epoch:
+                    self._remember(key, tokens, results)
+            return results
+
+        results = self.db.search_prompt_summaries(query)
+
+        with self._lock:
+            self.db_queries += 1
+            if epoch == self._epoch:
+                self._remember(key, tokens, results)
+        return results
+
+    def is_partial(self, query: str) -> bool:
+        """
+        Indique si les résultats d'une saisie sont incomplets : recherche
+        sémantique pendant la vectorisation d'arrière-plan (à relancer).
+
+        Args:
+            query: Saisie passée à search
+        """
+        return bool(query.startswith(SEMANTIC_PREFIX) and query[len(SEMANTIC_PREFIX):].strip()
+                    and self.db.semantic_index_building())
+
+    def fuzzy_search(self, query: str, limit: int = FUZZY_LIMIT) -> List[PromptSummary]:
+        """
+        Recherche approximative dans les titres, tags et catégories.
+
+        Args:
+            query: Mots recherchés (fautes de frappe tolérées)
+            limit: Nombre maximum de résultats
+
+        Returns:
+            Liste de PromptSummary (snippet à None), du meilleur au moins bon
+        """
+        with self._fuzzy_lock:
+            if self.fuzzy_index is None:
+                from fuzzy_search import FuzzyIndex
+                self.fuzzy_index = FuzzyIndex()
+                self.db.add_change_listener(self._on_prompt_changed)
+            self.fuzzy_queries += 1
+        # Le contenu n'est pas indexé : ne pas le charger
+        self._fuzzy_state.ensure_loaded(lambda: self.fuzzy_index.load(self.db.get_prompt_metadata()))
+        return self.fuzzy_index.search(query, limit)
+
+    def invalidate(self):
+        """Vide les caches (à appeler après toute modification des prompts)."""
+        with self._lock:
+            self._epoch += 1
+            self._results.clear()
+            self._row_tokens.clear()
+
+    def _find_narrowable(self, key: str, tokens: List[str]) -> Optional[List[PromptSummary]]:
+        """
+        Retourne les résultats du plus long préfixe en cache dont la requête
+        courante est un prolongement, ou None s'il faut interroger la base.
+        """
+        # Le filtrage par mots n'est équivalent qu'à la recherche FTS5 ;
+        # la recherche LIKE de repli (saisie sans mot) passe toujours par la base
+        if not tokens or not self.db.fts_enabled:
+            return None
+
+        best_key = None
+        for cached_key, (cached_tokens, results) in self._results.items():
+            if (cached_tokens and key.startswith(cached_key)
+                    and (best_key is None or len(cached_key) > len(best_key))):
+                best_key = cached_key
+
+        if best_key is None:
+            return None
+
+        results = self._results[best_key][1]
+        if len(results) > self.max_filter_rows:
+            return None
+        return results
+
+    @staticmethod
+    def _row_matches(row_tokens: Optional[FrozenSet[str]], tokens: List[str]) -> bool:
+        """Vrai si chaque mot de la requête est le préfixe d'un mot du prompt."""
+        if row_tokens is None:  # Prompt supprimé entre-temps
+            return False
+        return all(any(word.startswith(token) for word in row_tokens) for token in tokens)
+
+    def _load_tokens(self, prompt_ids: List[int]) -> Dict[int, FrozenSet[str]]:
+        """Lit et découpe en mots les colonnes indexées des prompts demandés."""
+        if not prompt_ids:
+            return {}
+        fetched = {}
+        for prompt_id, title, content, tags, category in self.db.get_search_texts(prompt_ids):
+            text = " ".join(part for part in (title, content, tags, category) if part)
+            fetched[prompt_id] = frozenset(tokenize(text))
+        return fetched
+
+    def _remember(self, key: str, tokens: List[str], results: List[PromptSummary]):
+        """Ajoute un résultat au cache en évinçant les requêtes les plus anciennes."""
+        self._results[key] = (tokens, results)
+        self._results.move_to_end(key)
+        while len(self._results) > self.max_cached_queries:
+            self._results.popitem(last=False)
+
+    def _on_prompt_changed(self, event: str, prompt_id: Optional[int]):
+        """Répercute une modification de la base sur l'index approximatif."""
+        # Index en chargement : rejoué ensuite ; import en masse : reconstruction à la prochaine recherche
+        if not self._fuzzy_state.accept(event, prompt_id):
+            return
+
+        if event == "usage":
+            self.fuzzy_index.add_usage(prompt_id)
+        elif event == "deleted":
+            self.fuzzy_index.remove(prompt_id)
+        elif event in ("added", "updated"):
+            self._refresh_fuzzy(prompt_id)
+
+    def _refresh_fuzzy(self, prompt_id: int):
+        """Remet un prompt de l'index approximatif en accord avec la base (voir IndexState)."""
+        prompt = self.db.get_prompt_by_id(prompt_id)
+        if prompt is None:
+            self.fuzzy_index.remove(prompt_id)
+        else:
+            _, title, _, category, tags, usage_count = prompt
+            self.fuzzy_index.upsert(prompt_id, title, category, tags, usage_count)
+
+    @staticmethod
+    def _has_fuzzy_terms(query: str) -> bool:
+        """Vrai si la requête contient un mot que la recherche approximative prend en compte."""
+        from fuzzy_search import fuzzy_terms
+        return bool(fuzzy_terms(query))
@@ -0,0 +1,135 @@
+"""
+Exécution de la recherche en arrière-plan pour les fenêtres PromptMaster.
+Les frappes sont regroupées (debounce), les requêtes dépassées sont
+interrompues et seul le résultat de la dernière saisie est livré.
+"""
+
+import sqlite3
+import threading
+from typing import Callable, List, Optional, Tuple
+
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, QTimer, Signal
+
+from database import DatabaseManager
+
+
+class _SearchTask(QRunnable):
+    """Tâche de recherche exécutée dans le pool de threads de l'exécuteur."""
+
+    def __init__(self, executor: "SearchExecutor", generation: int, query: str):
+        super().__init__()
+        self.executor = executor
+        self.generation = generation
+        self.query = query
+
+    def run(self):
+        """Exécute la recherche sauf si une saisie plus récente l'a rendue inutile."""
+        if not self.executor._begin(self.generation):
+            return
+
+        try:
+            results = self.executor.search_fn(self.query)
+        except sqlite3.OperationalError as e:
+            # Requête interrompue par une saisie plus récente
+            if "interrupt" not in str(e):
+                print(f"Erreur lors de la recherche : {e}")
+            return
+        finally:
+            self.executor._end()
+
+        self.executor._task_finished.emit(self.generation, self.query, results)
+
+
+class SearchExecutor(QObject):
+    """
+    Lance les recherches hors du thread GUI.
+
+    Chaque appel à request() redémarre le délai de debounce ; quand il expire,
+    la recherche part dans un thread dédié. Une nouvelle saisie interrompt la
+    requête SQLite en cours (sqlite3.Connection.interrupt) et seul le résultat
+    le plus récent est émis via results_ready.
+    """
+
+    # (requête, résultats) pour la dernière saisie uniquement
+    results_ready = Signal(str, object)
+
+    # Signal interne émis depuis le thread de recherche
+    _task_finished = Signal(int, str, object)
+
+    def __init__(self, search_fn: Callable[[str], List[Tuple]],
+                 db: Optional[DatabaseManager] = None, delay_ms: int = 120,
+                 parent: Optional[QObject] = None):
+        """
+        Initialise l'exécuteur de recherche.
+
+        Args:
+            search_fn: Fonction de recherche (appelée dans le thread de recherche)
+            db: DatabaseManager utilisé par search_fn, pour interrompre les requêtes dépassées
+            delay_ms: Délai de debounce entre la dernière frappe et la recherche
+            parent: QObject parent
+        """
+        super().__init__(parent)
+        self.search_fn = search_fn
+        self.db = db
+
+        # Un seul thread : les recherches ne se concurrencent pas entre elles
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(1)
+
+        self.debounce_timer = QTimer(self)
+        self.debounce_timer.setSingleShot(True)
+        self.debounce_timer.setInterval(delay_ms)
+        self.debounce_timer.timeout.connect(self._submit)
+
+        self._task_finished.connect(self._on_task_finished)
+
+        self._pending_query = ""
+        self._generation = 0
+        # (génération, thread) de la recherche en cours d'exécution
+        self._running: Optional[Tuple[int, int]] = None
+        self._running_lock = threading.Lock()
+
+    def request(self, query: str):
+        """Demande une recherche ; les demandes rapprochées sont regroupées."""
+        self._pending_query = query
+        self._supersede()
+        self.debounce_timer.start()
+
+    def cancel(self):
+        """Annule la recherche en attente et ignore celle en cours."""
+        self.debounce_timer.stop()
+        self._supersede()
+
+    def shutdown(self):
+        """Annule tout et attend la fin du thread de recherche."""
+        self.cancel()
+        self.pool.waitForDone()
+
+    def _supersede(self):
+        """Rend obsolètes les recherches lancées jusqu'ici et interrompt celle en cours."""
+        with self._running_lock:
+            self._generation += 1
+            if self._running is not None and self.db is not None:
+                self.db.interrupt(self._running[1])
+
+    def _submit(self):
+        """Lance la recherche correspondant à la dernière saisie."""
+        self.pool.start(_SearchTask(self, self._generation, self._pending_query))
+
+    def _begin(self, generation: int) -> bool:
+        """Marque une tâche comme en cours ; False si elle est déjà dépassée."""
+        with self._running_lock:
+            if generation != self._generation:
+                return False
+            self._running = (generation, threading.get_ident())
+            return True
+
+    def _end(self):
+        """Marque la fin de la tâche en cours (plus rien à interrompre)."""
+        with self._running_lock:
+            self._running = None
+
+    def _on_task_finished(self, generation: int, query: str, results: object):
+        """Livre le résultat dans le thread GUI s'il correspond à la dernière saisie."""
+        if generation == self._generation:
+            self.results_ready.emit(query, results)
@@ -0,0 +1,692 @@
+"""
+Recherche sémantique hors ligne pour PromptMaster.
+On se souvient souvent de ce que fait un prompt plutôt que de ses mots :
+"traduire en anglais" doit retrouver "Traduction anglaise". Chaque prompt est
+représenté par un vecteur calculé localement, sans modèle ni réseau :
+
+- plongement par hachage des n-grammes de caractères (3 à 5 lettres) du
+  texte normalisé, chaque n-gramme ajoutant ±1 à une des EMBEDDING_DIM
+  coordonnées (projection aléatoire signée), le tout en NumPy ;
+- vecteurs stockés en float16 dans un fichier projeté en mémoire
+  (<base>.vectors), avec l'ID et l'empreinte du texte de chaque ligne
+  (<base>.vectors.ids) : au redémarrage, seuls les prompts modifiés
+  entre-temps sont recalculés ;
+- index approximatif des plus proches voisins par listes inversées (IVF) :
+  les vecteurs sont répartis entre ~√n centres (k-moyennes sphériques) et
+  une recherche ne compare la requête qu'aux listes des centres les plus
+  proches. Les ajouts et modifications sont rangés dans la liste de leur
+  centre le plus proche ; les centres sont recalculés quand la bibliothèque
+  a doublé.
+
+Ce module importe NumPy : il n'est chargé qu'à la première recherche
+sémantique (voir DatabaseManager.enable_semantic_search).
+"""
+
+import math
+import os
+import re
+import threading
+import unicodedata
+from itertools import chain
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+from database import FTS_TOKEN_PATTERN, content_digest, try_lock_file, unlock_file
+
+
+# Dimension des vecteurs (float16 : 512 octets par prompt)
+EMBEDDING_DIM = 256
+
+# Tailles des n-grammes de caractères hachés
+NGRAM_SIZES = (3, 4, 5)
+
+# Poids du titre, des tags et de la catégorie face au contenu
+HEADING_WEIGHT = 2.0
+
+# Caractères du contenu pris en compte (le début d'un prompt dit ce qu'il fait)
+CONTENT_MAX_CHARS = 2000
+
+# À incrémenter si le calcul des vecteurs change : tout est alors recalculé
+EMBEDDING_VERSION = 1
+
+# Diacritiques retirés après décomposition NFKD (é -> e)
+COMBINING_MARKS = re.compile("[\u0300-\u036f\u1ab0-\u1aff\u1dc0-\u1dff\u20d0-\u20ff\ufe20-\ufe2f]+")
+
+# Constantes du hachage des n-grammes (multiplicatif puis mélange splitmix64)
+HASH_MULTIPLIER = np.uint64(0x100000001B3)
+MIX_MULTIPLIERS = (np.uint64(0xBF58476D1CE4E5B9), np.uint64(0x94D049BB133111EB))
+
+# Lignes du fichier de vecteurs réservées à la création (doublées ensuite)
+INITIAL_CAPACITY = 1024
+
+# En dessous, la recherche exacte (toutes les lignes) est assez rapide
+IVF_MIN_VECTORS = 4096
+
+# Vecteurs échantillonnés et itérations pour calculer les centres
+IVF_TRAIN_SAMPLE = 16384
+KMEANS_ITERATIONS = 10
+
+# Lignes comparées par recherche : les listes des centres les plus proches
+# sont parcourues jusqu'à 1/IVF_SCAN_DIVISOR des vecteurs (au moins IVF_MIN_PROBES listes)
+IVF_SCAN_DIVISOR = 12
+IVF_MIN_PROBES = 4
+
+# Les centres sont recalculés quand le nombre de vecteurs a été multiplié par ce facteur
+IVF_RETRAIN_GROWTH = 2
+
+# Lignes comparées par produit matriciel lors de l'affectation aux centres
+ASSIGN_CHUNK = 8192
+
+# Prompts vectorisés par lot lors de la synchronisation avec la base
+SYNC_BATCH = 1000
+
+# Similarité cosinus minimale d'un résultat sémantique
+MIN_SIMILARITY = 0.25
+
+# Constante de la fusion par rangs réciproques (RRF)
+RRF_K = 60
+
+# Ligne du fichier d'IDs : ID du prompt (0 = ligne libre) et empreinte du texte vectorisé
+KEY_DTYPE = np.dtype([("id", "<i8"), ("digest", "V16")])
+
+
+def embed_texts(texts: List[str]) -> np.ndarray:
+    """
+    Vecteurs de plusieurs textes, calculés en un seul passage vectorisé.
+
+    Les textes sont normalisés (sans accents ni casse, mots séparés par une
+    espace, voir normalize_text) puis chaque n-gramme de caractères
+    est haché vers une coordonnée et un signe. Les comptes sont amortis
+    (signe × log(1 + |compte|)) avant normalisation.
+
+    Args:
+        texts: Textes à vectoriser
+
+    Returns:
+        Matrice float32 (len(texts), EMBEDDING_DIM) de vecteurs unitaires
+        (nuls pour un texte sans n-gramme)
+    """
+    count = len(texts)
+    if not count:
+        return np.zeros((0, EMBEDDING_DIM), dtype=np.float32)
+    documents = [f" {normalize_text(text)} " for text in texts]
+    # Documents séparés par \0 : un n-gramme qui le contient est ignoré
+    codes = np.frombuffer("\0".join(documents).encode("utf-32-le"), dtype=np.uint32).astype(np.uint64)
+    lengths = np.fromiter(map(len, documents), dtype=np.int64, count=count)
+    document_of = np.repeat(np.arange(count, dtype=np.int64), lengths + 1)[:len(codes)]
+    separators = np.concatenate(([0], np.cumsum(codes == 0)))
+
+    sums = np.zeros(count * EMBEDDING_DIM)
+    for size in NGRAM_SIZES:
+        windows = len(codes) - size + 1
+        if windows <= 0:
+            continue
+        hashes = np.full(windows, size, dtype=np.uint64)
+        for offset in range(size):
+            hashes = hashes * HASH_MULTIPLIER + codes[offset:offset + windows]
+        starts = np.flatnonzero(separators[size:size + windows] == separators[:windows])
+        hashes = _mix(hashes[starts])
+        buckets = (hashes >> np.uint64(32)) % np.uint64(EMBEDDING_DIM)
+        signs = np.where(hashes & np.uint64(1), 1.0, -1.0)
+        sums += np.bincount(document_of[starts] * EMBEDDING_DIM + buckets.astype(np.int64),
+                            weights=signs, minlength=count * EMBEDDING_DIM)
+
+    vectors = sums.reshape(count, EMBEDDING_DIM)
+    vectors = np.sign(vectors) * np.log1p(np.abs(vectors))
+    return _normalize(vectors).astype(np.float32)
+
+
+def normalize_text(text: str) -> str:
+    """
+    Mots d'un texte sans accents ni casse, séparés par une espace.
+
+    Mêmes mots que search_session.tokenize, mais les accents sont retirés par
+    expression régulière plutôt que caractère par caractère (vectorisation en masse).
+    """
+    folded = COMBINING_MARKS.sub("", unicodedata.normalize("NFKD", text)).casefold()
+    return " ".join(FTS_TOKEN_PATTERN.findall(folded))
+
+
+def embed_prompts(prompts: List[Tuple[str, str, str, str]]) -> np.ndarray:
+    """
+    Vecteurs de prompts : titre, tags et catégorie (poids HEADING_WEIGHT) + contenu.
+
+    Args:
+        prompts: Tuples (title, content, category, tags)
+
+    Returns:
+        Matrice float32 (len(prompts), EMBEDDING_DIM) de vecteurs unitaires
+    """
+    headings = embed_texts([f"{title} {tags or ''} {category or ''}"
+                            for title, _, category, tags in prompts])
+    contents = embed_texts([(content or "")[:CONTENT_MAX_CHARS] for _, content, _, _ in prompts])
+    return _normalize(HEADING_WEIGHT * headings + contents).astype(np.float32)
+
+
+def prompt_digest(title: str, content: str, category: Optional[str], tags: Optional[str]) -> bytes:
+    """Empreinte du texte vectorisé d'un prompt (et de la version du calcul)."""
+    return content_digest(f"{EMBEDDING_VERSION}\0{title}\0{content}\0{category or ''}\0{tags or ''}")
+
+
+def reciprocal_rank_fusion(rankings: Iterable[Iterable[int]], k: int = RRF_K) -> List[int]:
+    """
+    Fusionne plusieurs classements d'IDs par rangs réciproques.
+
+    Chaque ID reçoit la somme des 1 / (k + rang) de ses classements ; à
+    égalité, l'ordre de première apparition (classement cité en premier) l'emporte.
+
+    Args:
+        rankings: Classements, du meilleur au moins bon
+        k: Constante d'amortissement des rangs
+
+    Returns:
+        IDs fusionnés, du meilleur au moins bon
+    """
+    scores: Dict[int, float] = {}
+    for ranking in rankings:
+        for rank, prompt_id in enumerate(ranking, start=1):
+            scores[prompt_id] = scores.get(prompt_id, 0.0) + 1.0 / (k + rank)
+    return sorted(scores, key=lambda prompt_id: -scores[prompt_id])
+
+
+def _mix(hashes: np.ndarray) -> np.ndarray:
+    """Mélange final splitmix64 : chaque bit du résultat dépend de tous les bits."""
+    hashes = hashes ^ (hashes >> np.uint64(30))
+    hashes = hashes * MIX_MULTIPLIERS[0]
+    hashes = hashes ^ (hashes >> np.uint64(27))
+    hashes = hashes * MIX_MULTIPLIERS[1]
+    return hashes ^ (hashes >> np.uint64(31))
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    """Divise chaque ligne par sa norme (les lignes nulles restent nulles)."""
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms > 0, norms, 1.0)
+
+
+class VectorStore:
+    """
+    Vecteurs float16 des prompts, une ligne par prompt.
+
+    Avec un chemin, la matrice et les clés (ID, empreinte) sont des fichiers
+    projetés en mémoire (np.memmap), agrandis par doublement ; sans chemin
+    (base ":memory:"), de simples tableaux en mémoire.
+
+    Un seul processus à la fois écrit dans ces fichiers (verrou sur
+    path + ".lock", comme le journal des utilisations de DatabaseManager) :
+    une autre instance de l'application garde ses vecteurs en mémoire.
+    """
+
+    def __init__(self, path: Optional[str], dim: int = EMBEDDING_DIM):
+        """
+        Ouvre ou crée le stockage.
+
+        Args:
+            path: Fichier des vecteurs (les clés sont dans path + ".ids"), ou None
+            dim: Dimension des vecteurs
+        """
+        self._lock_file = None
+        if path is not None:
+            lock_file = open(path + ".lock", "a+b")
+            if try_lock_file(lock_file):
+                self._lock_file = lock_file
+            else:
+                lock_file.close()
+                print("⚠️ Fichier de vecteurs utilisé par une autre instance : vecteurs gardés en mémoire")
+                path = None
+        self.path = path
+        self.keys_path = None if path is None else path + ".ids"
+        self.dim = dim
+        self.vectors: np.ndarray = None
+        self.keys: np.ndarray = None
+        self._open()
+        ids = self.keys["id"]
+        rows = np.flatnonzero(ids > 0)
+        self.row_of: Dict[int, int] = dict(zip(ids[rows].tolist(), rows.tolist()))
+        self._free = np.flatnonzero(ids <= 0)[::-1].tolist()  # Lignes libres, la plus basse en dernier
+
+    def __len__(self) -> int:
+        return len(self.row_of)
+
+    @property
+    def capacity(self) -> int:
+        return len(self.keys)
+
+    def digest(self, prompt_id: int) -> Optional[bytes]:
+        """Empreinte du texte vectorisé d'un prompt, ou None s'il n'a pas de ligne."""
+        row = self.row_of.get(prompt_id)
+        return None if row is None else bytes(self.keys["digest"][row])
+
+    def put(self, prompt_id: int, digest: bytes, vector: np.ndarray) -> int:
+        """
+        Écrit le vecteur d'un prompt (à sa ligne actuelle, ou à une ligne libre).
+
+        Returns:
+            La ligne du prompt
+        """
+        row = self.row_of.get(prompt_id)
+        if row is None:
+            if not self._free:
+                self._grow(self.capacity * 2)
+            row = self._free.pop()
+            self.row_of[prompt_id] = row
+        self.vectors[row] = vector
+        self.keys[row] = (prompt_id, digest)
+        return row
+
+    def delete(self, prompt_id: int) -> Optional[int]:
+        """
+        Libère la ligne d'un prompt.
+
+        Returns:
+            La ligne libérée, ou None si le prompt n'en avait pas
+        """
+        row = self.row_of.pop(prompt_id, None)
+        if row is not None:
+            self.keys[row] = (0, bytes(16))
+            self._free.append(row)
+        return row
+
+    def rows(self) -> np.ndarray:
+        """Lignes occupées, dans l'ordre du fichier."""
+        return np.flatnonzero(self.keys["id"] > 0)
+
+    def flush(self):
+        """Écrit sur disque les pages modifiées."""
+        if self.path is not None:
+            self.vectors.flush()
+            self.keys.flush()
+
+    def close(self):
+        """Écrit les modifications, libère la projection en mémoire et le verrou des fichiers."""
+        self._unmap()
+        if self._lock_file is not None:
+            unlock_file(self._lock_file)
+            self._lock_file.close()
+            self._lock_file = None
+
+    def _unmap(self):
+        """Écrit les modifications et libère la projection en mémoire."""
+        self.flush()
+        self.vectors = self.keys = None
+
+    def _open(self):
+        """Projette les fichiers existants, ou les (re)crée s'ils manquent ou sont incohérents."""
+        capacity = INITIAL_CAPACITY
+        if self.path is None:
+            self.vectors = np.zeros((capacity, self.dim), dtype=np.float16)
+            self.keys = np.zeros(capacity, dtype=KEY_DTYPE)
+            return
+
+        row_size = self.dim * np.dtype(np.float16).itemsize
+        if os.path.exists(self.path) and os.path.exists(self.keys_path):
+            existing = os.path.getsize(self.keys_path) // KEY_DTYPE.itemsize
+            if (existing and os.path.getsize(self.keys_path) == existing * KEY_DTYPE.itemsize
+                    and os.path.getsize(self.path) == existing * row_size):
+                self.vectors = np.memmap(self.path, dtype=np.float16, mode="r+",
+                                         shape=(existing, self.dim))
+                self.keys = np.memmap(self.keys_path, dtype=KEY_DTYPE, mode="r+", shape=(existing,))
+                return
+            print("⚠️ Fichier de vecteurs incohérent : les vecteurs seront recalculés")
+
+        self.vectors = np.memmap(self.path, dtype=np.float16, mode="w+", shape=(capacity, self.dim))
+        self.keys = np.memmap(self.keys_path, dtype=KEY_DTYPE, mode="w+", shape=(capacity,))
+
+    def _grow(self, capacity: int):
+        """Agrandit le stockage (les nouvelles lignes sont libres)."""
+        previous = self.capacity
+        if self.path is None:
+            vectors = np.zeros((capacity, self.dim), dtype=np.float16)
+            keys = np.zeros(capacity, dtype=KEY_DTYPE)
+            vectors[:previous] = self.vectors
+            keys[:previous] = self.keys
+            self.vectors, self.keys = vectors, keys
+        else:
+            # La projection doit être libérée avant d'agrandir le fichier (Windows)
+            self._unmap()
+            for path, size in ((self.path, capacity * self.dim * np.dtype(np.float16).itemsize),
+                               (self.keys_path, capacity * KEY_DTYPE.itemsize)):
+                with open(path, "r+b") as f:
+                    f.truncate(size)
+            self._open()
+        self._free = list(range(capacity - 1, previous - 1, -1)) + self._free
+
+
+class VectorIndex:
+    """
+    Recherche des plus proches voisins (similarité cosinus) dans un VectorStore.
+
+    Tant que la bibliothèque compte moins de IVF_MIN_VECTORS vecteurs, toutes
+    les lignes sont comparées ; au-delà, seules celles des listes inversées
+    dont le centre est proche de la requête.
+    """
+
+    def __init__(self, path: Optional[str] = None, dim: int = EMBEDDING_DIM):
+        """
+        Initialise l'index.
+
+        Args:
+            path: Fichier des vecteurs (voir VectorStore), ou None pour rester en mémoire
+            dim: Dimension des vecteurs
+        """
+        self.store = VectorStore(path, dim)
+        self._lock = threading.Lock()
+        self.centroids: Optional[np.ndarray] = None  # (listes, dim) float32, None : recherche exacte
+        self._lists: List[Set[int]] = []              # Lignes de chaque liste
+        self._list_of: Dict[int, int] = {}            # ligne -> liste
+        self._trained_size = 0
+        self.train()
+
+    def __len__(self) -> int:
+        return len(self.store)
+
+    def digest(self, prompt_id: int) -> Optional[bytes]:
+        """Empreinte du texte vectorisé d'un prompt (voir VectorStore.digest)."""
+        with self._lock:
+            return self.store.digest(prompt_id)
+
+    def ids(self) -> List[int]:
+        """IDs des prompts indexés."""
+        with self._lock:
+            return list(self.store.row_of)
+
+    def upsert(self, prompt_id: int, digest: bytes, vector: np.ndarray):
+        """Ajoute ou remplace le vecteur (unitaire) d'un prompt."""
+        self.upsert_many([prompt_id], [digest], vector[np.newaxis])
+
+    def upsert_many(self, prompt_ids: List[int], digests: List[bytes], vectors: np.ndarray):
+        """
+        Ajoute ou remplace les vecteurs de plusieurs prompts.
+
+        Args:
+            prompt_ids: IDs des prompts
+            digests: Empreintes des textes vectorisés
+            vectors: Matrice (len(prompt_ids), dim) de vecteurs unitaires
+        """
+        if not prompt_ids:
+            return
+        with self._lock:
+            rows = [self.store.put(prompt_id, digest, vector)
+                    for prompt_id, digest, vector in zip(prompt_ids, digests, vectors)]
+            if self.centroids is not None:
+                nearest = np.argmax(vectors.astype(np.float32) @ self.centroids.T, axis=1)
+                for row, list_index in zip(rows, nearest.tolist()):
+                    self._unlist(row)
+                    self._lists[list_index].add(row)
+                    self._list_of[row] = list_index
+            retrain = self._needs_training()
+        if retrain:
+            self.train()
+
+    def remove(self, prompt_id: int):
+        """Retire le vecteur d'un prompt (sans effet s'il est absent)."""
+        with self._lock:
+            row = self.store.delete(prompt_id)
+            if row is not None:
+                self._unlist(row)
+
+    def search(self, vector: np.ndarray, k: int) -> List[Tuple[int, float]]:
+        """
+        Prompts les plus proches d'un vecteur unitaire.
+
+        Args:
+            vector: Vecteur de la requête
+            k: Nombre maximum de résultats
+
+        Returns:
+            Couples (id du prompt, similarité cosinus), du plus au moins proche
+        """
+        vector = vector.astype(np.float32)
+        with self._lock:
+            if self.centroids is None:
+                rows = self.store.rows()
+            else:
+                closest = np.argsort(-(self.centroids @ vector)).tolist()
+                sizes = np.cumsum([len(self._lists[i]) for i in closest])
+                probes = max(IVF_MIN_PROBES, int(np.searchsorted(sizes, len(self.store) // IVF_SCAN_DIVISOR)) + 1)
+                rows = np.fromiter(chain.from_iterable(self._lists[i] for i in closest[:probes]),
+                                   dtype=np.int64)
+                rows.sort()  # Lecture du fichier dans l'ordre
+            if not len(rows) or k <= 0:
+                return []
+            scores = self.store.vectors[rows].astype(np.float32) @ vector
+            ids = self.store.keys["id"][rows]
+
+        if len(rows) > k:
+            best = np.argpartition(-scores, k - 1)[:k]
+        else:
+            best = np.arange(len(rows))
+        best = best[np.lexsort((ids[best], -scores[best]))]
+        return [(int(ids[i]), float(scores[i])) for i in best]
+
+    def train(self):
+        """
+        Recalcule les centres (k-moyennes sphériques sur un échantillon) et
+        range chaque vecteur dans la liste de son centre le plus proche.
+        """
+        with self._lock:
+            rows = self.store.rows()
+            self._trained_size = len(rows)
+            if len(rows) < IVF_MIN_VECTORS:
+                self.centroids, self._lists, self._list_of = None, [], {}
+                return
+
+            rng = np.random.default_rng(0)
+            list_count = int(math.sqrt(len(rows)))
+            sample = rows if len(rows) <= IVF_TRAIN_SAMPLE else np.sort(
+                rng.choice(rows, IVF_TRAIN_SAMPLE, replace=False))
+            data = self.store.vectors[sample].astype(np.float32)
+            centroids = data[rng.choice(len(data), list_count, replace=False)]
+            for _ in range(KMEANS_ITERATIONS):
+                assignment = np.argmax(data @ centroids.T, axis=1)
+                order = np.argsort(assignment, kind="stable")
+                sizes = np.bincount(assignment, minlength=list_count)
+                starts = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+                filled = sizes > 0  # Un centre sans vecteur garde sa position
+                centroids[filled] = _normalize(np.add.reduceat(data[order], starts[filled], axis=0))
+
+            lists: List[Set[int]] = [set() for _ in range(list_count)]
+            list_of: Dict[int, int] = {}
+            for start in range(0, len(rows), ASSIGN_CHUNK):
+                chunk = rows[start:start + ASSIGN_CHUNK]
+                nearest = np.argmax(self.store.vectors[chunk].astype(np.float32) @ centroids.T, axis=1)
+                for row, list_index in zip(chunk.tolist(), nearest.tolist()):
+                    lists[list_index].add(row)
+                    list_of[row] = list_index
+            self.centroids, self._lists, self._list_of = centroids, lists, list_of
+
+    def flush(self):
+        """Écrit les vecteurs modifiés sur disque."""
+        with self._lock:
+            self.store.flush()
+
+    def close(self):
+        """Écrit les vecteurs et ferme le stockage."""
+        with self._lock:
+            self.store.close()
+
+    def _needs_training(self) -> bool:
+        """Vrai si la bibliothèque a assez grandi depuis le calcul des centres (verrou tenu)."""
+        size = len(self.store)
+        if self.centroids is None:
+            return size >= IVF_MIN_VECTORS
+        return size >= IVF_RETRAIN_GROWTH * self._trained_size
+
+    def _unlist(self, row: int):
+        """Retire une ligne de sa liste inversée (verrou tenu)."""
+        list_index = self._list_of.pop(row, None)
+        if list_index is not None:
+            self._lists[list_index].discard(row)
+
+
+class SemanticIndex:
+    """
+    Vecteurs des prompts d'une base, tenus à jour par ses notifications.
+
+    Les vecteurs enregistrés sont comparés à la base (empreintes) : seuls
+    les prompts ajoutés ou modifiés depuis sont vectorisés, dans un thread
+    d'arrière-plan (sync_in_background). Ensuite, chaque add_prompt /
+    update_prompt / delete_prompt met à jour l'index aussitôt ; un import en
+    masse déclenche une nouvelle synchronisation à la recherche suivante.
+    Pendant une synchronisation, search() répond sans attendre avec les
+    vecteurs déjà présents (voir building).
+    """
+
+    def __init__(self, db, path: Optional[str] = None):
+        """
+        Initialise l'index.
+
+        Args:
+            db: Instance de DatabaseManager
+            path: Fichier des vecteurs, ou None pour les garder en mémoire
+        """
+        self.db = db
+        self.index = VectorIndex(path)
+        self._sync_lock = threading.Lock()
+        self._synced = False  # Un parcours complet de la base a abouti depuis le dernier import
+        self._tracking = False  # L'abonné applique les modifications (dès le début du premier parcours)
+        self._imported = False  # Import en masse pendant le parcours en cours
+        self._changed: Optional[Set[int]] = None  # Prompts modifiés pendant le parcours en cours
+        self._sync_thread: Optional[threading.Thread] = None
+        self._thread_lock = threading.Lock()  # Un seul thread de synchronisation à la fois
+        self._stop = threading.Event()
+        self.embedded = 0  # Prompts vectorisés (statistique)
+        db.add_change_listener(self._on_prompt_changed)
+
+    def close(self):
+        """
+        Se désabonne des modifications de la base, arrête la synchronisation
+        d'arrière-plan et ferme le fichier de vecteurs.
+        """
+        self.db.remove_change_listener(self._on_prompt_changed)
+        with self._thread_lock:
+            self._stop.set()
+            thread = self._sync_thread
+        if thread is not None:
+            thread.join()
+        self.index.close()
+
+    def sync(self):
+        """Met l'index en accord avec la base (prompts ajoutés, modifiés, supprimés)."""
+        with self._sync_lock:
+            self._sync()
+
+    def ensure_synced(self):
+        """Synchronise l'index s'il ne l'est pas, ou attend la synchronisation en cours."""
+        if self._synced:
+            return
+        with self._sync_lock:
+            if not self._synced:
+                self._sync()
+
+    @property
+    def building(self) -> bool:
+        """True tant que l'index n'est pas synchronisé : search() ne voit qu'une partie des prompts."""
+        return not self._synced
+
+    def sync_in_background(self):
+        """
+        Lance ensure_synced() dans un thread, avec sa propre connexion (sauf
+        si un tel thread tourne déjà) : la vectorisation ne bloque pas le
+        thread des recherches et n'est pas annulée quand une recherche y est
+        interrompue.
+        """
+        with self._thread_lock:
+            if self._stop.is_set() or (self._sync_thread is not None and self._sync_thread.is_alive()):
+                return
+            self._sync_thread = threading.Thread(target=self._background_sync, name="semantic-sync", daemon=True)
+            self._sync_thread.start()
+
+    def _background_sync(self):
+        """Corps du thread de sync_in_background."""
+        try:
+            self.ensure_synced()
+        except Exception as e:
+            # Le parcours sera refait à la prochaine recherche
+            print(f"⚠️ Synchronisation des vecteurs interrompue : {e}")
+
+    def _sync(self):
+        """Parcourt la base et met l'index à jour (appelant : _sync_lock acquis)."""
+        self._tracking = True  # Les modifications pendant le parcours sont appliquées par l'abonné
+        self._imported = False
+        self._changed = set()
+        try:
+            known = set(self.index.ids())
+            batch = []
+            for prompt in self.db.iter_prompts(fields=("id", "title", "content", "category", "tags")):
+                known.discard(prompt["id"])
+                digest = prompt_digest(prompt["title"], prompt["content"], prompt["category"], prompt["tags"])
+                if self.index.digest(prompt["id"]) != digest:
+                    batch.append((prompt["id"], digest, prompt))
+                    if len(batch) >= SYNC_BATCH:
+                        if self._stop.is_set():
+                            return
+                        self._embed(batch)
+                        batch = []
+            self._embed(batch)
+            for prompt_id in known:
+                self.index.remove(prompt_id)
+        finally:
+            changed, self._changed = self._changed, None
+        # Un prompt modifié pendant le parcours a pu être vectorisé d'après une version plus ancienne
+        for prompt_id in changed:
+            self._refresh(prompt_id)
+        self.index.flush()
+        # Parcours interrompu (exception, arrêt) ou import entre-temps : à refaire
+        self._synced = not self._imported
+
+    def search(self, query: str, k: int = 50) -> List[Tuple[int, float]]:
+        """
+        Prompts dont le sens est proche d'une requête.
+
+        Args:
+            query: Texte de la requête
+            k: Nombre maximum de résultats
+
+        Returns:
+            Couples (id du prompt, similarité cosinus >= MIN_SIMILARITY),
+            du plus au moins proche ; partiels pendant une synchronisation
+        """
+        if not self._synced:
+            self.sync_in_background()
+        vector = embed_texts([query])[0]
+        if not vector.any():
+            return []
+        return [(prompt_id, score) for prompt_id, score in self.index.search(vector, k)
+                if score >= MIN_SIMILARITY]
+
+    def _embed(self, batch: List[Tuple[int, bytes, Dict]]):
+        """Vectorise et enregistre un lot de (id, empreinte, prompt)."""
+        if not batch:
+            return
+        vectors = embed_prompts([(prompt["title"], prompt["content"], prompt["category"], prompt["tags"])
+                                 for _, _, prompt in batch])
+        self.index.upsert_many([prompt_id for prompt_id, _, _ in batch],
+                               [digest for _, digest, _ in batch], vectors)
+        self.embedded += len(batch)
+
+    def _on_prompt_changed(self, event: str, prompt_id: Optional[int]):
+        """Met à jour les vecteurs après une modification de la base."""
+        if not self._tracking or event == "usage":
+            return
+        if event == "imported":
+            self._imported = True
+            self._synced = False
+            return
+        changed = self._changed
+        if changed is not None:
+            changed.add(prompt_id)
+        self._refresh(prompt_id)
+
+    def _refresh(self, prompt_id: int):
+        """Relit un prompt en base et met son vecteur à jour (ou le retire s'il n'existe plus)."""
+        prompt = self.db.get_prompt_by_id(prompt_id)
+        if prompt is None:
+            self.index.remove(prompt_id)
+            return
+        _, title, content, category, tags, _ = prompt
+        digest = prompt_digest(title, content, category, tags)
+        if self.index.digest(prompt_id) != digest:
+            self._embed([(prompt_id, digest, {"title": title, "content": content,
+                                              "category": category, "tags": tags})])
@@ -61,6 +61,7 @@ def test_imports():
     modules = [
         ("PySide6.QtWidgets", "PySide6"),
         ("pynput.keyboard", "pynput"),
+        ("numpy", "numpy (recherche sémantique)"),
         ("sqlite3", "sqlite3 (intégré)")
     ]
     
@@ -0,0 +1,94 @@
+"""
+Tests unitaires pour la capture adaptative du texte sélectionné.
+"""
+
+import threading
+import time
+import unittest
+from clipboard_capture import CAPTURE_TIMEOUT, SelectionCapture, wait_for
+
+
+class FakeClipboard:
+    """Presse-papiers en mémoire, avec ou sans numéro de séquence."""
+
+    def __init__(self, text="", with_sequence=True):
+        self.text = text
+        self.sequence = 0 if with_sequence else None
+        self.lock = threading.Lock()
+
+    def paste(self):
+        with self.lock:
+            return self.text
+
+    def copy(self, text):
+        with self.lock:
+            self.text = text
+            if self.sequence is not None:
+                self.sequence += 1
+
+    def sequence_number(self):
+        return self.sequence
+
+
+class TestSelectionCapture(unittest.TestCase):
+    """Tests pour la classe SelectionCapture."""
+
+    def make_capture(self, clipboard, selection, delay=0.01, timeout=0.5):
+        """Capture dont le Ctrl+C simulé copie la sélection après un délai."""
+        def send_copy():
+            if selection is not None:
+                threading.Timer(delay, clipboard.copy, (selection,)).start()
+        return SelectionCapture(send_copy, clipboard, timeout=timeout)
+
+    def test_returns_as_soon_as_copied(self):
+        """Test que la capture se termine dès l'arrivée de la copie."""
+        for with_sequence in (True, False):
+            clipboard = FakeClipboard("ancien contenu", with_sequence)
+            capture = self.make_capture(clipboard, "  texte sélectionné ")
+
+            start = time.perf_counter()
+            self.assertEqual(capture.capture(), "texte sélectionné")
+            self.assertLess(time.perf_counter() - start, 0.2)
+
+            # Le presse-papiers d'origine est restauré en arrière-plan
+            capture.wait_restored(1)
+            self.assertEqual(clipboard.paste(), "ancien contenu")
+            self.assertEqual(capture.latency.summary()['count'], 1)
+
+    def test_timeout_without_selection(self):
+        """Test qu'aucune sélection donne None après le délai maximal."""
+        clipboard = FakeClipboard("ancien contenu", with_sequence=False)
+        capture = self.make_capture(clipboard, None, timeout=0.05)
+
+        self.assertIsNone(capture.capture())
+        capture.wait_restored(1)
+        self.assertEqual(clipboard.paste(), "ancien contenu")
+        self.assertGreaterEqual(capture.latency.percentile(50), 0.05)
+
+    def test_no_selection_is_not_slower_than_fixed_delays(self):
+        """Test que, sans sélection, le délai par défaut reste sous les 0,35 s de l'ancienne capture."""
+        clipboard = FakeClipboard("ancien contenu")
+        capture = SelectionCapture(lambda: None, clipboard)
+
+        start = time.perf_counter()
+        self.assertIsNone(capture.capture())
+        self.assertGreaterEqual(time.perf_counter() - start, CAPTURE_TIMEOUT)
+        self.assertLess(time.perf_counter() - start, 0.35)
+
+    def test_same_content_is_ignored(self):
+        """Test qu'une copie identique à l'ancien contenu est ignorée."""
+        clipboard = FakeClipboard("déjà copié")
+        capture = self.make_capture(clipboard, "déjà copié")
+        self.assertIsNone(capture.capture())
+
+    def test_wait_for_backoff(self):
+        """Test du recul exponentiel : peu d'essais pendant l'attente."""
+        calls = []
+        self.assertFalse(wait_for(lambda: calls.append(1), timeout=0.1,
+                                  initial_delay=0.001, max_delay=0.02))
+        self.assertLess(len(calls), 15)
+        self.assertTrue(wait_for(lambda: True, timeout=0))
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
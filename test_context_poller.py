@@ -0,0 +1,91 @@
+"""
+Tests unitaires pour le préchargement des recommandations contextuelles.
+"""
+
+import time
+import unittest
+from context_poller import ContextPoller
+from database import PromptSummary
+from window_context import ActiveWindowContext, StubWindowBackend
+
+
+class TestContextPoller(unittest.TestCase):
+    """Tests pour la classe ContextPoller."""
+
+    def setUp(self):
+        """Prépare un suivi sur une fenêtre simulée."""
+        self.backend = StubWindowBackend()
+        self.backend.set_foreground(1, "main.py - Visual Studio Code", "Code.exe")
+        self.window_context = ActiveWindowContext(
+            self.backend, lambda process, title: "Développement" if process == "Code.exe" else None
+        )
+        self.recommended = []
+
+        def recommend(context):
+            self.recommended.append(context['window_title'])
+            return [PromptSummary(len(self.recommended), context['window_title'], context['category'], 0, None)]
+
+        self.poller = ContextPoller(self.window_context, recommend, interval=0.01,
+                                    ignore=lambda hwnd, title: title == "PromptMaster")
+
+    def tearDown(self):
+        self.poller.stop()
+
+    def test_recomputes_only_on_window_change(self):
+        """Test que les recommandations ne sont recalculées qu'au changement de fenêtre."""
+        self.assertTrue(self.poller.poll_once())
+        self.assertFalse(self.poller.poll_once())
+
+        context, prompts = self.poller.latest()
+        self.assertEqual(context['category'], "Développement")
+        self.assertEqual(prompts[0].title, "main.py - Visual Studio Code")
+
+        self.backend.set_foreground(2, "Gmail - Chrome", "chrome.exe")
+        self.assertIsNone(self.poller.latest())
+        self.assertTrue(self.poller.poll_once())
+        self.assertEqual(self.poller.latest()[0]['process_name'], "chrome.exe")
+        self.assertEqual(self.recommended, ["main.py - Visual Studio Code", "Gmail - Chrome"])
+
+    def test_mark_dirty_and_ignore(self):
+        """Test du recalcul après modification et des fenêtres ignorées."""
+        self.poller.poll_once()
+        self.poller.mark_dirty()
+        self.assertIsNone(self.poller.latest())
+        self.assertTrue(self.poller.poll_once())
+        self.assertIsNotNone(self.poller.latest())
+
+        # La fenêtre PromptMaster ne remplace pas le contexte précédent
+        self.backend.set_foreground(3, "PromptMaster", "python.exe")
+        self.assertFalse(self.poller.poll_once())
+        self.backend.set_foreground(1, "main.py - Visual Studio Code", "Code.exe")
+        self.assertIsNotNone(self.poller.latest())
+
+    def test_cpu_budget(self):
+        """Test que l'attente s'allonge quand un calcul coûte cher."""
+        poller = ContextPoller(self.window_context, list, interval=0.25, cpu_budget=0.02)
+        self.assertEqual(poller.next_delay(0.001), 0.25)
+        self.assertAlmostEqual(poller.next_delay(0.01), 0.49)
+
+    def test_background_thread(self):
+        """Test du thread : suivi des changements, pause et arrêt."""
+        self.poller.start()
+        deadline = time.monotonic() + 2
+        while self.poller.latest() is None and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertIsNotNone(self.poller.latest())
+
+        self.poller.pause()
+        time.sleep(0.05)  # Laisser finir une éventuelle lecture en cours
+        self.backend.set_foreground(2, "Gmail - Chrome", "chrome.exe")
+        time.sleep(0.05)
+        self.assertIsNone(self.poller.latest())
+
+        self.poller.resume()
+        deadline = time.monotonic() + 2
+        while self.poller.latest() is None and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(self.poller.latest()[0]['window_title'], "Gmail - Chrome")
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,172 @@
+"""
+Tests unitaires pour le moteur de classement contextuel.
+"""
+
+import os
+import random
+import tempfile
+import unittest
+from unittest import mock
+
+from context_manager import ContextManager
+from database import DatabaseManager
+from context_ranking import ContextRanker, CATEGORY_BONUS, KEYWORD_BONUS, NUMPY_AVAILABLE
+
+WORDS = ["python", "pytest", "email", "design", "marketing", "docker", "notion", "réunion"]
+CATEGORIES = ["Développement", "Marketing", "Design", None]
+CONTEXTS = [("Développement", "Python docs"), ("Design", ""),
+            (None, "Email marketing – Gmail"), ("Marketing", "pyt docker")]
+
+
+def make_rows(count, seed=42):
+    """Prompts synthétiques (id, title, category, tags, usage_count)."""
+    rng = random.Random(seed)
+    return [(i, " ".join(rng.sample(WORDS, 2)), rng.choice(CATEGORIES),
+             ",".join(rng.sample(WORDS, 2)), rng.randrange(12))
+            for i in range(1, count + 1)]
+
+
+class TestContextRanker(unittest.TestCase):
+    """Tests pour la classe ContextRanker."""
+
+    def setUp(self):
+        """Prépare un moteur avec quelques prompts."""
+        self.ranker = ContextRanker()
+        self.ranker.load([
+            (1, "API REST Python", "Développement", "python,api", 0),
+            (2, "Email Marketing", "Marketing", "email,copywriting", 3),
+            (3, "Debug Python", "Développement", "debug", 1),
+            (4, "Résumé de réunion", "Productivité", None, 8),
+        ])
+
+    def _ids(self, *args):
+        return [prompt.id for prompt in self.ranker.top_k(*args)]
+
+    def test_usage_only(self):
+        """Test que sans contexte, les plus utilisés passent en tête."""
+        self.assertEqual(self._ids(None, "", 10), [4, 2, 3, 1])
+        self.assertEqual(self._ids(None, "", 2), [4, 2])
+
+    def test_category_and_keywords(self):
+        """Test des bonus de catégorie et de mots du titre de fenêtre."""
+        self.assertEqual(self._ids("Développement", "", 2), [3, 1])
+        # "python" préfixe des mots des prompts 1 et 3, "api" est trop court
+        self.assertEqual(self._ids(None, "Python API docs", 3), [4, 3, 1])
+        self.assertEqual(self._ids(None, "pyt api", 3), [4, 2, 3])
+        self.assertEqual(self.ranker.score(1, "Développement", "Python docs"),
+                         CATEGORY_BONUS + KEYWORD_BONUS)
+        # Insensible aux accents, mots sans tags compris
+        self.assertEqual(self._ids(None, "Reunion hebdo", 1), [4])
+
+    def test_incremental_updates(self):
+        """Test que les modifications sont prises en compte sans rechargement."""
+        self.ranker.upsert(2, "Email Python", "Développement", "email", 3)
+        self.assertEqual(self._ids("Développement", "python", 1), [2])
+
+        self.ranker.add_usage(1, 10)
+        self.assertEqual(self._ids(None, "", 1), [1])
+
+        self.ranker.remove(1)
+        self.ranker.upsert(5, "Nouveau", None, "python", 0)
+        self.assertEqual(len(self.ranker), 4)
+        self.assertEqual(self._ids("Développement", "python", 10), [2, 3, 4, 5])
+        self.assertEqual(self._ids(None, "", 10), [4, 2, 3, 5])
+
+    def test_top_k_matches_full_scoring(self):
+        """Test que le top k indexé est identique à un tri complet des scores."""
+        rng = random.Random(42)
+        ranker = ContextRanker(use_numpy=False)
+        ranker.load(make_rows(399))
+        for i in range(1, 400, 7):
+            ranker.add_usage(i, rng.randrange(3))
+        for i in range(2, 400, 11):
+            ranker.remove(i)
+
+        for category, title in CONTEXTS:
+            expected = sorted(
+                (i for i in range(1, 400) if ranker.score(i, category, title) is not None),
+                key=lambda i: (ranker.score(i, category, title), ranker._prompts[i].usage_count, i),
+                reverse=True
+            )[:15]
+            self.assertEqual([p.id for p in ranker.top_k(category, title, 15)], expected)
+
+    @unittest.skipUnless(NUMPY_AVAILABLE, "NumPy non installé")
+    def test_vectorized_matches_python(self):
+        """Test que le calcul NumPy donne exactement le classement Python."""
+        rng = random.Random(7)
+        python_ranker = ContextRanker(use_numpy=False)
+        numpy_ranker = ContextRanker(vectorize_min_prompts=0)
+        rankers = (python_ranker, numpy_ranker)
+        for ranker in rankers:
+            ranker.load(make_rows(500))
+
+        def check():
+            for category, title in CONTEXTS:
+                for k in (1, 10, 600):
+                    self.assertEqual(numpy_ranker.top_k(category, title, k),
+                                     python_ranker.top_k(category, title, k), (category, title, k))
+
+        check()
+        self.assertIsNotNone(numpy_ranker._snapshot)
+
+        # Modifications après l'instantané : usage en place, autres notées à part
+        for step in range(40):
+            prompt_id, usage_count = rng.randrange(1, 520), rng.randrange(3) + step
+            for ranker in rankers:
+                if step % 4 == 0:
+                    ranker.remove(prompt_id)
+                elif step % 4 == 1:
+                    ranker.upsert(prompt_id, "Nouveau python", "Design", "docker", usage_count)
+                else:
+                    ranker.add_usage(prompt_id, step)
+            check()
+
+        # Au-delà du seuil de prompts modifiés, l'instantané est reconstruit
+        for prompt_id in range(1, 400):
+            for ranker in rankers:
+                ranker.upsert(prompt_id, "Réunion", "Marketing", None, prompt_id % 9)
+        check()
+        self.assertFalse(numpy_ranker._stale_ids)
+
+class TestContextManagerRanking(unittest.TestCase):
+    """Tests du classement contextuel tenu à jour par ContextManager."""
+
+    def setUp(self):
+        self.test_db = tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.db')
+        self.test_db.close()
+        self.db = DatabaseManager(self.test_db.name)
+        self.python_id = self.db.add_prompt("Python API", "Contenu", "Développement", "python")
+        self.cm = ContextManager(self.db, window_backend=None)
+        self.context = {"category": "Développement", "window_title": ""}
+
+    def tearDown(self):
+        self.db.close()
+        for suffix in ("", "-wal", "-shm", ".usage"):
+            if os.path.exists(self.test_db.name + suffix):
+                os.unlink(self.test_db.name + suffix)
+
+    def test_changes_during_load_are_kept(self):
+        """Test qu'une modification faite pendant la lecture de l'instantané n'est pas perdue."""
+        snapshot = self.db.get_prompt_metadata
+        added = []
+
+        def snapshot_then_modify():
+            rows = snapshot()
+            added.append(self.db.add_prompt("Docker", "Contenu", "Développement", "docker"))
+            self.db.update_prompt(self.python_id, title="Rust API")
+            self.db.increment_usage(self.python_id)
+            return rows
+
+        with mock.patch.object(self.db, "get_prompt_metadata", side_effect=snapshot_then_modify):
+            prompts = self.cm.get_contextual_prompts(context=self.context)
+        self.assertEqual([(row.id, row.title, row.usage_count) for row in prompts],
+                         [(self.python_id, "Rust API", 1), (added[0], "Docker", 0)])
+
+        # Les modifications suivantes sont appliquées directement
+        self.db.increment_usage(added[0])
+        self.db.increment_usage(added[0])
+        self.assertEqual(self.cm.get_contextual_prompts(context=self.context)[0].id, added[0])
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -6,7 +6,10 @@ Testez les fonctionnalités principales de la base de données.
 import unittest
 import os
 import tempfile
-from database import DatabaseManager
+import sqlite3
+import threading
+import io
+from database import DatabaseManager, SCHEMA_MIGRATIONS, build_fts_query, read_prompt_records
 
 
 class TestDatabaseManager(unittest.TestCase):
@@ -21,9 +24,11 @@ class TestDatabaseManager(unittest.TestCase):
     
     def tearDown(self):
         """Nettoie après chaque test."""
-        # Supprimer la base de données temporaire
-        if os.path.exists(self.test_db.name):
-            os.unlink(self.test_db.name)
+        # Fermer les connexions puis supprimer la base temporaire (et les fichiers WAL)
+        self.db.close()
+        for suffix in ("", "-wal", "-shm", ".usage"):
+            if os.path.exists(self.test_db.name + suffix):
+                os.unlink(self.test_db.name + suffix)
     
     def test_add_prompt(self):
         """Test d'ajout d'un prompt."""
@@ -97,6 +102,24 @@ class TestDatabaseManager(unittest.TestCase):
         self.assertEqual(prompt[1], "Modifié")
         self.assertEqual(prompt[2], "Contenu modifié")
     
+    def test_update_prompt_partial(self):
+        """Test que seules les colonnes fournies sont écrites, sans relecture."""
+        prompt_id = self.db.add_prompt("Titre", "Contenu", "Catégorie", "tag")
+        
+        statements = []
+        self.db.get_connection().set_trace_callback(statements.append)
+        self.assertTrue(self.db.update_prompt(prompt_id, category="Nouvelle"))
+        self.db.get_connection().set_trace_callback(None)
+        
+        # Les déclencheurs FTS apparaissent aussi dans la trace : ne garder que nos requêtes
+        queries = {sql for sql in statements if sql.lstrip().upper().startswith(("SELECT", "UPDATE"))}
+        self.assertEqual(queries, {f"UPDATE prompts SET category = 'Nouvelle' WHERE id = {prompt_id}"})
+        self.assertEqual(self.db.get_prompt_by_id(prompt_id)[1:5], ("Titre", "Contenu", "Nouvelle", "tag"))
+        
+        self.assertFalse(self.db.update_prompt(9999, title="Absent"))
+        self.assertTrue(self.db.update_prompt(prompt_id))
+        self.assertFalse(self.db.update_prompt(9999))
+    
     def test_delete_prompt(self):
         """Test de suppression d'un prompt."""
         # Ajouter un prompt
@@ -197,6 +220,557 @@ class TestDatabaseManager(unittest.TestCase):
         self.assertEqual(prompts[1][0], id1)
         self.assertEqual(prompts[2][0], id2)
 
+    
+    def test_connection_reused(self):
+        """Test que la connexion est réutilisée entre les appels d'un même thread."""
+        conn = self.db.get_connection()
+        self.db.add_prompt("Prompt", "Contenu")
+        self.db.get_all_prompts()
+        
+        self.assertIs(self.db.get_connection(), conn)
+        journal_mode = conn.execute("PRAGMA journal_mode").fetchone()[0]
+        self.assertEqual(journal_mode.lower(), "wal")
+    
+    def test_connection_per_thread(self):
+        """Test que chaque thread obtient sa propre connexion."""
+        main_conn = self.db.get_connection()
+        self.db.add_prompt("Prompt", "Contenu")
+        seen = {}
+        
+        def worker():
+            seen["conn"] = self.db.get_connection()
+            seen["count"] = len(self.db.get_all_prompts())
+        
+        thread = threading.Thread(target=worker)
+        thread.start()
+        thread.join()
+        
+        self.assertIsNot(seen["conn"], main_conn)
+        self.assertEqual(seen["count"], 1)
+    
+    def test_close_and_reopen(self):
+        """Test que close() ferme les connexions et qu'un nouvel appel en rouvre une."""
+        conn = self.db.get_connection()
+        self.db.add_prompt("Prompt", "Contenu")
+        self.db.close()
+        
+        self.assertIsNot(self.db.get_connection(), conn)
+        self.assertEqual(len(self.db.get_all_prompts()), 1)
+
+    
+    def test_search_accent_insensitive(self):
+        """Test que la recherche ignore les accents (corpus français)."""
+        self.db.add_prompt("Guide", "Bonnes pratiques", "Développement", "")
+        self.db.add_prompt("Autre", "Sans rapport", "Marketing", "")
+        
+        results = self.db.search_prompts("developpement")
+        self.assertEqual(len(results), 1)
+        self.assertEqual(results[0][3], "Développement")
+    
+    def test_search_prefix_and_all_words(self):
+        """Test des requêtes préfixes : tous les mots doivent correspondre."""
+        self.db.add_prompt("Python API", "Créer une API", "Dev", "python")
+        self.db.add_prompt("Python Debug", "Debugger", "Dev", "python")
+        
+        self.assertEqual(len(self.db.search_prompts("pyth")), 2)
+        self.assertEqual(len(self.db.search_prompts("pyth deb")), 1)
+    
+    def test_search_ranks_title_matches_first(self):
+        """Test du classement bm25 : une correspondance dans le titre passe devant."""
+        self.db.add_prompt("Rédaction", "Un texte qui parle de docker en passant", "Dev", "")
+        docker_id = self.db.add_prompt("Docker Compose", "Fichier de configuration", "Dev", "")
+        
+        results = self.db.search_prompts("docker")
+        self.assertEqual(results[0][0], docker_id)
+        self.assertEqual(len(results[0]), 6)
+    
+    def test_search_fts_synced_on_update_and_delete(self):
+        """Test que l'index plein texte suit les modifications et suppressions."""
+        prompt_id = self.db.add_prompt("Ancien titre", "Contenu")
+        self.db.update_prompt(prompt_id, title="Nouveau titre")
+        
+        self.assertEqual(len(self.db.search_prompts("ancien")), 0)
+        self.assertEqual(len(self.db.search_prompts("nouveau")), 1)
+        
+        self.db.delete_prompt(prompt_id)
+        self.assertEqual(len(self.db.search_prompts("nouveau")), 0)
+    
+    def test_search_special_characters(self):
+        """Test que la syntaxe FTS5 saisie par l'utilisateur ne provoque pas d'erreur."""
+        self.db.add_prompt("C++ tips", "Astuces", "Dev", "")
+        
+        self.assertEqual(len(self.db.search_prompts('c++ "tips')), 1)
+        self.assertEqual(len(self.db.search_prompts("++")), 1)
+        self.assertIsNone(build_fts_query("++"))
+    
+    def test_fts_migration_of_existing_database(self):
+        """Test qu'une ancienne base sans index plein texte est migrée automatiquement."""
+        self.db.close()
+        os.unlink(self.test_db.name)
+        conn = sqlite3.connect(self.test_db.name)
+        conn.execute("""
+            CREATE TABLE prompts (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                title TEXT NOT NULL,
+                content TEXT NOT NULL,
+                category TEXT,
+                tags TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                usage_count INTEGER DEFAULT 0
+            )
+        """)
+        conn.execute("INSERT INTO prompts (title, content) VALUES ('Ancien prompt', 'Déjà là')")
+        conn.commit()
+        conn.close()
+        
+        self.db = DatabaseManager(self.test_db.name)
+        
+        self.assertTrue(self.db.fts_enabled)
+        self.assertEqual(len(self.db.search_prompts("deja")), 1)
+        
+        # Les migrations versionnées ont été appliquées en place
+        conn = self.db.get_connection()
+        self.assertEqual(conn.execute("PRAGMA user_version").fetchone()[0], len(SCHEMA_MIGRATIONS))
+        indexes = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        self.assertTrue({"idx_prompts_ranking", "idx_prompts_category"} <= indexes)
+    
+    def test_migrations_are_applied_once(self):
+        """Test qu'une base déjà à jour n'est pas migrée de nouveau."""
+        self.db.close()
+        conn = sqlite3.connect(self.test_db.name)
+        conn.execute("DROP INDEX idx_prompts_category")
+        conn.commit()
+        conn.close()
+        
+        self.db = DatabaseManager(self.test_db.name)
+        
+        indexes = {row[0] for row in self.db.get_connection().execute(
+            "SELECT name FROM sqlite_master WHERE type = 'index'")}
+        self.assertNotIn("idx_prompts_category", indexes)
+    
+    def _query_plans(self, method, *args):
+        """Exécute une méthode et retourne le plan de chacun de ses SELECT."""
+        conn = self.db.get_connection()
+        statements = []
+        conn.set_trace_callback(statements.append)
+        try:
+            method(*args)
+        finally:
+            conn.set_trace_callback(None)
+        
+        plans = {}
+        for statement in statements:
+            if statement.lstrip().upper().startswith("SELECT"):
+                plans[statement] = " | ".join(
+                    row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + statement))
+        self.assertTrue(plans)
+        return plans
+    
+    def test_listing_queries_use_indexes(self):
+        """Test que les listes triées par usage ne trient plus toute la table."""
+        for i in range(20):
+            self.db.add_prompt(f"Prompt {i}", "Contenu", f"Cat{i % 3}")
+        
+        for method, args in ((self.db.get_all_prompts, ()),
+                             (self.db.list_prompts, ()),
+                             (self.db.list_prompts, (True,)),
+                             (self.db.get_prompt_metadata, ()),
+                             (self.db.get_categories, ())):
+            for statement, plan in self._query_plans(method, *args).items():
+                self.assertNotIn("TEMP B-TREE", plan, statement)
+        
+        # Les projections sans contenu sont servies par l'index seul
+        for method in (self.db.list_prompts, self.db.get_prompt_metadata):
+            for plan in self._query_plans(method).values():
+                self.assertIn("COVERING INDEX idx_prompts_ranking", plan)
+
+    
+    def test_interrupt_other_thread(self):
+        """Test qu'une requête longue d'un autre thread peut être interrompue."""
+        started = threading.Event()
+        outcome = {}
+        
+        def worker():
+            outcome["thread_id"] = threading.get_ident()
+            conn = self.db.get_connection()
+            started.set()
+            try:
+                conn.execute("""
+                    WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n)
+                    SELECT count(*) FROM n
+                """).fetchone()
+            except sqlite3.OperationalError as e:
+                outcome["error"] = str(e)
+        
+        thread = threading.Thread(target=worker)
+        thread.start()
+        started.wait()
+        # Réessayer tant que la requête n'a pas démarré
+        while thread.is_alive():
+            self.db.interrupt(outcome["thread_id"])
+            thread.join(0.05)
+        
+        self.assertIn("interrupt", outcome["error"])
+
+    
+    def test_list_prompts_projection(self):
+        """Test que les listes ne transportent pas le contenu complet."""
+        long_content = "Contenu très long. " * 1000
+        prompt_id = self.db.add_prompt("Long", long_content, "Dev", "tag")
+        self.db.increment_usage(prompt_id)
+        
+        summary = self.db.list_prompts()[0]
+        self.assertEqual(summary, (prompt_id, "Long", "Dev", 1, None))
+        self.assertEqual(summary.title, "Long")
+        
+        with_snippet = self.db.list_prompts(with_snippet=True)[0]
+        self.assertTrue(long_content.startswith(with_snippet.snippet))
+        self.assertLess(len(with_snippet.snippet), 200)
+    
+    def test_search_prompt_summaries(self):
+        """Test que la recherche légère renvoie les mêmes prompts que search_prompts."""
+        self.db.add_prompt("Python API", "Créer une API en Python", "Dev", "python,api")
+        self.db.add_prompt("Email", "Email pour marketing", "Marketing", "email")
+        self.db.add_prompt("Python Debug", "Debugger Python", "Dev", "python,debug")
+        
+        for query in ("python", "marketing", "++"):
+            expected = [row[0] for row in self.db.search_prompts(query)]
+            self.assertEqual([row.id for row in self.db.search_prompt_summaries(query)], expected)
+        
+        summary = self.db.search_prompt_summaries("marketing", with_snippet=True)[0]
+        self.assertIn("marketing", summary.snippet)
+    
+    def test_get_prompt_metadata_and_search_texts(self):
+        """Test des projections utilisées par le classement et le filtrage en mémoire."""
+        id1 = self.db.add_prompt("Titre 1", "Contenu 1", "Dev", "a,b")
+        id2 = self.db.add_prompt("Titre 2", "Contenu 2")
+        
+        self.assertEqual(set(self.db.get_prompt_metadata()),
+                         {(id1, "Titre 1", "Dev", "a,b", 0), (id2, "Titre 2", None, None, 0)})
+        self.assertEqual(set(self.db.get_search_texts([id1, id2, 999])),
+                         {(id1, "Titre 1", "Contenu 1", "a,b", "Dev"), (id2, "Titre 2", "Contenu 2", None, None)})
+
+    
+    def test_prompt_cache_hits_and_invalidation(self):
+        """Test du cache LRU : lectures répétées servies en mémoire, invalidées à l'écriture."""
+        prompt_id = self.db.add_prompt("Titre", "Contenu")
+        
+        self.db.get_prompt_by_id(prompt_id)
+        self.db.get_prompt_by_id(prompt_id)
+        stats = self.db.prompt_cache.stats()
+        self.assertEqual((stats['hits'], stats['misses']), (1, 1))
+        
+        self.db.update_prompt(prompt_id, title="Nouveau")
+        self.assertEqual(self.db.get_prompt_by_id(prompt_id)[1], "Nouveau")
+        
+        self.db.increment_usage(prompt_id)
+        self.assertEqual(self.db.get_prompt_by_id(prompt_id)[5], 1)
+        
+        self.db.delete_prompt(prompt_id)
+        self.assertIsNone(self.db.get_prompt_by_id(prompt_id))
+    
+    def test_prompt_cache_eviction_and_prefetch(self):
+        """Test de l'éviction LRU et du préchargement des voisins."""
+        db = DatabaseManager(self.test_db.name, cache_size=2)
+        ids = [db.add_prompt(f"Prompt {i}", f"Contenu {i}") for i in range(4)]
+        
+        db.prefetch_prompts(ids[:3])
+        self.assertEqual(len(db.prompt_cache), 2)
+        self.assertEqual(db.prompt_cache.missing(ids), [ids[0], ids[3]])
+        
+        self.assertEqual(db.get_prompt_by_id(ids[2])[1], "Prompt 2")
+        self.assertEqual(db.prompt_cache.stats()['misses'], 0)
+        db.close()
+
+    
+    def _stored_usage(self, prompt_id):
+        """Lit usage_count directement en base, sans passer par DatabaseManager."""
+        conn = sqlite3.connect(self.test_db.name)
+        usage = conn.execute("SELECT usage_count FROM prompts WHERE id = ?", (prompt_id,)).fetchone()[0]
+        conn.close()
+        return usage
+    
+    def test_usage_write_behind(self):
+        """Test que les utilisations sont écrites en une fois, et visibles avant."""
+        prompt_id = self.db.add_prompt("Populaire", "Contenu")
+        for _ in range(3):
+            self.db.increment_usage(prompt_id)
+        
+        self.assertEqual(self._stored_usage(prompt_id), 0)
+        self.assertEqual(self.db.get_prompt_by_id(prompt_id)[5], 3)
+        self.assertEqual(self.db.list_prompts()[0].usage_count, 3)
+        
+        self.assertEqual(self.db.flush_usage(), 3)
+        self.assertEqual(self._stored_usage(prompt_id), 3)
+        self.assertEqual(self.db.get_prompt_by_id(prompt_id)[5], 3)
+    
+    def test_usage_flushed_on_close(self):
+        """Test que close() écrit les compteurs en attente."""
+        prompt_id = self.db.add_prompt("Populaire", "Contenu")
+        self.db.increment_usage(prompt_id)
+        self.db.close()
+        
+        self.assertEqual(self._stored_usage(prompt_id), 1)
+    
+    def test_usage_journal_replay(self):
+        """Test qu'un arrêt brutal ne perd pas les utilisations journalisées."""
+        id1 = self.db.add_prompt("Prompt 1", "Contenu")
+        id2 = self.db.add_prompt("Prompt 2", "Contenu")
+        self.db.increment_usage(id1)
+        self.db.flush_usage()
+        self.db.increment_usage(id1)
+        self.db.increment_usage(id2)
+        
+        self._simulate_crash(self.db)
+        # Un événement déjà écrit en base ne doit pas être rejoué
+        with open(self.db.usage_journal_path, "a", encoding="utf-8") as journal:
+            journal.write(f"1 {id1}\n")
+        
+        recovered = DatabaseManager(self.test_db.name)
+        self.assertEqual(recovered.get_prompt_by_id(id1)[5], 2)
+        self.assertEqual(recovered.get_prompt_by_id(id2)[5], 1)
+        
+        # Le journal est repris sans doublon à la réouverture suivante
+        recovered.increment_usage(id2)
+        recovered.close()
+        self.assertEqual(self._stored_usage(id2), 2)
+        self.assertEqual(DatabaseManager(self.test_db.name).get_prompt_by_id(id1)[5], 2)
+    
+    @staticmethod
+    def _simulate_crash(db: DatabaseManager):
+        """Simule un arrêt brutal : compteurs en mémoire perdus, verrou du journal libéré."""
+        db._pending_usage.clear()
+        db._usage_journal.close()
+        db._usage_journal = None
+    
+    def test_usage_journal_single_owner(self):
+        """Test qu'un second gestionnaire sur la même base ne rejoue pas le journal de l'instance active."""
+        prompt_id = self.db.add_prompt("Populaire", "Contenu")
+        for _ in range(4):
+            self.db.increment_usage(prompt_id)
+        
+        other = DatabaseManager(self.test_db.name)
+        self.assertIsNone(other._usage_journal)
+        other.increment_usage(prompt_id)
+        other.close()
+        self.assertEqual(self._stored_usage(prompt_id), 1)
+        
+        self.db.flush_usage()
+        self.assertEqual(self._stored_usage(prompt_id), 5)
+    
+    def test_usage_journal_numbering_without_file(self):
+        """Test que la numérotation reprend après celle de la base si le journal a disparu."""
+        prompt_id = self.db.add_prompt("Populaire", "Contenu")
+        for _ in range(5):
+            self.db.increment_usage(prompt_id)
+        self.db.close()
+        os.unlink(self.test_db.name + ".usage")
+        
+        db = DatabaseManager(self.test_db.name)
+        for _ in range(3):
+            db.increment_usage(prompt_id)
+        self._simulate_crash(db)
+        
+        self.assertEqual(DatabaseManager(self.test_db.name).get_prompt_by_id(prompt_id)[5], 8)
+
+    
+    def test_import_prompts_dedup(self):
+        """Test de l'import en masse avec dédoublonnage titre + contenu."""
+        self.db.add_prompt("Existant", "Contenu existant")
+        records = [
+            {"title": "Existant", "content": "Contenu existant"},
+            {"title": "Nouveau", "content": "Contenu", "category": "Cat", "usage_count": "4"},
+            {"title": "Nouveau", "content": "Contenu"},
+            {"title": "Nouveau", "content": "Autre contenu", "tags": ""},
+            {"title": "", "content": "Sans titre"},
+        ]
+        
+        imported, skipped = self.db.import_prompts(iter(records), chunk_size=2)
+        
+        self.assertEqual((imported, skipped), (2, 3))
+        prompts = self.db.get_all_prompts()
+        self.assertEqual(len(prompts), 3)
+        self.assertEqual(prompts[0][1:6], ("Nouveau", "Contenu", "Cat", None, 4))
+        # Les prompts importés sont indexés pour la recherche
+        self.assertEqual(len(self.db.search_prompts("autre")), 1)
+    
+    def test_export_import_round_trip(self):
+        """Test qu'un export JSONL ou CSV se réimporte à l'identique."""
+        self.db.add_prompt("Émoji ✨", "Ligne 1\nLigne 2, \"citée\"", "Catégorie", "a,b")
+        self.db.add_prompt("Sans catégorie", "Contenu")
+        self.db.increment_usage(1)
+        
+        for fmt in ("jsonl", "csv"):
+            stream = io.StringIO(newline="")
+            self.assertEqual(self.db.export_prompts(stream, fmt), 2)
+            
+            other_db = DatabaseManager(":memory:")
+            stream.seek(0)
+            self.assertEqual(other_db.import_prompts(read_prompt_records(stream, fmt)), (2, 0))
+            self.assertEqual(list(other_db.iter_prompts()), list(self.db.iter_prompts()), fmt)
+            other_db.close()
+    
+    def test_import_skips_bad_row(self):
+        """Test qu'une ligne invalide au milieu du fichier est ignorée sans interrompre l'import."""
+        for fmt, lines in (
+            ("jsonl", ['{"title": "P1", "content": "c"}',
+                       '{"title": "P2", "content": "c", "usage_count": "beaucoup"}',
+                       '{"title": "P3", "content": "c", "usage_count": 2}']),
+            ("csv", ["title,content,usage_count", "P1,c,", "P2,c,beaucoup", "P3,c,2"]),
+        ):
+            db = DatabaseManager(":memory:")
+            stream = io.StringIO("\n".join(lines) + "\n", newline="")
+            
+            self.assertEqual(db.import_prompts(read_prompt_records(stream, fmt), chunk_size=1), (2, 1))
+            self.assertEqual([(p[1], p[5]) for p in db.get_all_prompts()], [("P3", 2), ("P1", 0)], fmt)
+            db.close()
+    
+    def test_iter_prompts_is_lazy(self):
+        """Test que iter_prompts lit les prompts par lots à la demande."""
+        self.db.import_prompts({"title": f"P{i}", "content": "c"} for i in range(5))
+        
+        records = self.db.iter_prompts(batch_size=2)
+        self.assertEqual(next(records)["title"], "P0")
+        self.assertEqual([record["title"] for record in records], ["P1", "P2", "P3", "P4"])
+        
+        with self.assertRaises(ValueError):
+            self.db.export_prompts(io.StringIO(), "xml")
+    
+    def test_iter_prompts_does_not_write(self):
+        """Test que iter_prompts n'écrit les compteurs en attente que sur demande (export)."""
+        prompt_id = self.db.add_prompt("Populaire", "Contenu")
+        self.db.increment_usage(prompt_id)
+        
+        list(self.db.iter_prompts(fields=("id", "title")))
+        self.assertEqual(self._stored_usage(prompt_id), 0)
+        
+        self.db.export_prompts(io.StringIO())
+        self.assertEqual(self._stored_usage(prompt_id), 1)
+
+    
+    def test_change_listeners(self):
+        """Test que les abonnés sont prévenus de chaque modification."""
+        events = []
+        self.db.add_change_listener(lambda event, prompt_id: events.append((event, prompt_id)))
+        
+        prompt_id = self.db.add_prompt("Test", "Contenu")
+        self.db.update_prompt(prompt_id, title="Nouveau")
+        self.db.increment_usage(prompt_id)
+        self.db.delete_prompt(prompt_id)
+        self.db.import_prompts([{"title": "Importé", "content": "Contenu"}])
+        
+        self.assertEqual(events, [("added", prompt_id), ("updated", prompt_id), ("usage", prompt_id),
+                                  ("deleted", prompt_id), ("imported", None)])
+
+    def test_categories_cached(self):
+        """Test que les catégories sont mises en cache et recalculées après modification."""
+        prompt_id = self.db.add_prompt("Test", "Contenu", category="B")
+        self.db.add_prompt("Test 2", "Contenu", category="A")
+
+        statements = []
+        self.db.get_connection().set_trace_callback(statements.append)
+        self.assertEqual(self.db.get_categories(), ["A", "B"])
+        self.db.get_categories().append("Modifiée")  # Copie : le cache n'est pas touché
+        self.db.increment_usage(prompt_id)
+        self.assertEqual(self.db.get_categories(), ["A", "B"])
+        self.assertEqual(sum("DISTINCT category" in sql for sql in statements), 1)
+
+        self.db.update_prompt(prompt_id, category="C")
+        self.assertEqual(self.db.get_categories(), ["A", "C"])
+        self.db.delete_prompt(prompt_id)
+        self.assertEqual(self.db.get_categories(), ["A"])
+        self.db.import_prompts([{"title": "Importé", "content": "Contenu", "category": "D"}])
+        self.assertEqual(self.db.get_categories(), ["A", "D"])
+        self.db.get_connection().set_trace_callback(None)
+
+
+    def test_tags_normalized(self):
+        """Test que prompt_tags suit la colonne tags (ajout, modification, suppression, import)."""
+        first = self.db.add_prompt("API", "Contenu", tags="API, rapide,  Python ,")
+        second = self.db.add_prompt("Script", "Contenu", tags="python,api")
+        self.db.import_prompts([{"title": "Importé", "content": "Contenu", "tags": 'shell,"cité"'}])
+
+        self.assertEqual(self.db.get_tag_counts(), [("api", 2), ("python", 2), ("\"cité\"", 1),
+                                                    ("rapide", 1), ("shell", 1)])
+        self.assertEqual(self.db.get_tag_counts(prefix="Ra"), [("rapide", 1)])
+        self.assertEqual(self.db.get_tag_counts(limit=1), [("api", 2)])
+
+        self.db.update_prompt(first, tags="python")
+        self.assertEqual(dict(self.db.get_tag_counts()).get("api"), 1)
+        self.assertNotIn("rapide", dict(self.db.get_tag_counts()))
+        self.db.delete_prompt(second)
+        self.assertEqual(dict(self.db.get_tag_counts())["python"], 1)
+        self.assertNotIn("api", dict(self.db.get_tag_counts()))
+
+    def test_find_prompts_by_tag(self):
+        """Test de la recherche exacte ou par préfixe sur les tags."""
+        api = self.db.add_prompt("API", "Contenu", tags="api")
+        rapid = self.db.add_prompt("Rapide", "Contenu", tags="rapide")
+        apis = self.db.add_prompt("APIs", "Contenu", tags="apis, rest")
+        self.db.increment_usage(apis)
+
+        self.assertEqual([p.id for p in self.db.find_prompts_by_tag(" API ")], [api])
+        self.assertEqual([p.id for p in self.db.find_prompts_by_tag("api", prefix=True)], [apis, api])
+        self.assertEqual([p.id for p in self.db.find_prompts_by_tag("rap", prefix=True)], [rapid])
+        self.assertEqual(self.db.find_prompts_by_tag(""), [])
+        
+        # Servi par les index de tags et prompt_tags, sans parcourir prompts
+        for plan in self._query_plans(self.db.find_prompts_by_tag, "api", True).values():
+            self.assertIn("idx_prompt_tags_tag", plan)
+            self.assertNotIn("SCAN p", plan)
+
+    def test_tags_migration_backfill(self):
+        """Test que la migration remplit prompt_tags depuis une base existante."""
+        self.db.add_prompt("Un", "Contenu", tags="Email, vente")
+        self.db.add_prompt("Deux", "Contenu", tags="email")
+        self.db.close()
+        conn = sqlite3.connect(self.test_db.name)
+        conn.executescript("""
+            DROP TRIGGER prompts_tags_insert;
+            DROP TRIGGER prompts_tags_update;
+            DROP TRIGGER prompts_tags_delete;
+            DROP TABLE prompt_tags;
+            DROP TABLE tags;
+            PRAGMA user_version = 1;
+        """)
+        conn.close()
+
+        self.db = DatabaseManager(self.test_db.name)
+
+        self.assertEqual(self.db.get_tag_counts(), [("email", 2), ("vente", 1)])
+        conn = self.db.get_connection()
+        self.assertEqual(conn.execute("PRAGMA user_version").fetchone()[0], len(SCHEMA_MIGRATIONS))
+
+    def test_tags_with_control_characters(self):
+        """Test qu'un caractère de contrôle dans un tag ne fait pas perdre les autres."""
+        prompt_id = self.db.add_prompt("Un", "Contenu", tags='foo\x01bar,baz,a"b\\c')
+        self.assertEqual([row[0] for row in self.db.find_prompts_by_tag("baz")], [prompt_id])
+        self.assertEqual(sorted(name for name, _ in self.db.get_tag_counts()),
+                         ['a"b\\c', "baz", "foo\x01bar"])
+
+        self.db.update_prompt(prompt_id, tags="x\x1fy, vente")
+        self.assertEqual([row[0] for row in self.db.find_prompts_by_tag("vente")], [prompt_id])
+
+    def test_tags_migration_backfill_control_characters(self):
+        """Test que la migration remplit tous les tags d'un prompt qui contient un caractère de contrôle."""
+        prompt_id = self.db.add_prompt("Un", "Contenu", tags="foo\x01bar,baz")
+        self.db.close()
+        conn = sqlite3.connect(self.test_db.name)
+        conn.executescript("""
+            DROP TRIGGER prompts_tags_insert;
+            DROP TRIGGER prompts_tags_update;
+            DROP TRIGGER prompts_tags_delete;
+            DROP TABLE prompt_tags;
+            DROP TABLE tags;
+            PRAGMA user_version = 1;
+        """)
+        conn.close()
+
+        self.db = DatabaseManager(self.test_db.name)
+
+        self.assertEqual([row[0] for row in self.db.find_prompts_by_tag("baz")], [prompt_id])
+        self.assertEqual(dict(self.db.get_tag_counts()), {"foo\x01bar": 1, "baz": 1})
+
 
 def run_tests():
     """Lance tous les tests."""
@@ -0,0 +1,232 @@
+"""
+Tests unitaires pour la recherche approximative.
+"""
+
+import itertools
+import os
+import random
+import tempfile
+import unittest
+from unittest import mock
+
+import fuzzy_search
+from database import DatabaseManager
+from fuzzy_search import (FuzzyIndex, fuzzy_terms, max_typos, prefix_distance, prefix_distances,
+                          prefix_matches)
+from search_session import SearchSession, fuzzy_query
+
+
+def reference_prefix_distance(term: str, word: str) -> int:
+    """Distance de Damerau-Levenshtein restreinte entre term et le meilleur début de word (matrice complète)."""
+    rows = [[0] * (len(word) + 1) for _ in range(len(term) + 1)]
+    for i in range(len(term) + 1):
+        rows[i][0] = i
+    for j in range(len(word) + 1):
+        rows[0][j] = j
+    for i in range(1, len(term) + 1):
+        for j in range(1, len(word) + 1):
+            rows[i][j] = min(rows[i - 1][j] + 1, rows[i][j - 1] + 1,
+                             rows[i - 1][j - 1] + (term[i - 1] != word[j - 1]))
+            if i > 1 and j > 1 and term[i - 1] == word[j - 2] and term[i - 2] == word[j - 1]:
+                rows[i][j] = min(rows[i][j], rows[i - 2][j - 2] + 1)
+    return min(rows[-1])
+
+
+class TestPrefixDistance(unittest.TestCase):
+    """Tests de la distance d'édition bit à bit."""
+
+    def test_examples(self):
+        """Test de fautes courantes."""
+        self.assertEqual(prefix_distance("pyhton", "python"), 1)   # Inversion
+        self.assertEqual(prefix_distance("emial", "email"), 1)
+        self.assertEqual(prefix_distance("pytn", "python"), 1)     # Lettre manquante
+        self.assertEqual(prefix_distance("pyth", "python"), 0)     # Début de mot
+        self.assertEqual(prefix_distance("markting", "marketing"), 1)
+        self.assertEqual(prefix_distance("", "python"), 0)
+
+    def test_matches_reference(self):
+        """Test que le calcul bit à bit (avec reprise sur préfixe commun) égale la matrice complète."""
+        rng = random.Random(0)
+        for _ in range(300):
+            term = "".join(rng.choice("abc") for _ in range(rng.randint(1, 8)))
+            words = sorted("".join(rng.choice("abc") for _ in range(rng.randint(0, 10)))
+                           for _ in range(10))
+            expected = [reference_prefix_distance(term, word) for word in words]
+            self.assertEqual(prefix_distances(term, words), expected, term)
+
+    def test_prefix_matches_reference(self):
+        """Test que le parcours des préfixes du vocabulaire trouve exactement les mots à limit fautes près."""
+        rng = random.Random(0)
+        for _ in range(300):
+            term = "".join(rng.choice("abc") for _ in range(rng.randint(2, 6)))
+            words = sorted({"".join(rng.choice("abc") for _ in range(rng.randint(1, 8))) for _ in range(20)})
+            limit = rng.randint(1, 2)
+            distances = {word: reference_prefix_distance(term, word) for word in words}
+            expected = {word: distance for word, distance in distances.items() if distance <= limit}
+            self.assertEqual(prefix_matches(term, words, limit), expected, term)
+
+    def test_limit(self):
+        """Test qu'une limite ne change pas les distances qui la respectent."""
+        self.assertEqual(prefix_distance("stratgie", "stratégiquement", 2),
+                         prefix_distance("stratgie", "stratégiquement"))
+
+
+class TestFuzzyIndex(unittest.TestCase):
+    """Tests pour la classe FuzzyIndex."""
+
+    def setUp(self):
+        """Prépare un index avec quelques prompts."""
+        self.index = FuzzyIndex()
+        self.index.load([
+            (1, "Python API", "Développement", "python,api", 3),
+            (2, "Email Marketing", "Marketing", "email", 10),
+            (3, "Rapide résumé", "Rédaction", "rapide", 0),
+            (4, "Pythonic code review", "Développement", "review", 1),
+        ])
+
+    def ids(self, query: str, limit: int = 50):
+        return [prompt.id for prompt in self.index.search(query, limit)]
+
+    def test_fuzzy_terms(self):
+        """Test des mots pris en compte (normalisés, sans doublon ni lettre seule)."""
+        self.assertEqual(fuzzy_terms("Python a PYTHON résumé"), ["python", "resume"])
+        self.assertEqual(max_typos("api"), 0)
+        self.assertEqual(max_typos("pyhton"), 1)
+        self.assertEqual(max_typos("stratgies"), 2)
+
+    def test_typos(self):
+        """Test que les fautes de frappe sont tolérées."""
+        self.assertEqual(self.ids("pyhton"), [1, 4])
+        self.assertEqual(self.ids("emial markting"), [2])
+        self.assertEqual(self.ids("resume rapdie"), [3])
+        self.assertEqual(self.ids("xyzzy"), [])
+
+    def test_typo_at_start_of_short_term(self):
+        """Test qu'une faute en début d'un mot de 4 ou 5 lettres est tolérée (aucun trigramme commun garanti)."""
+        for query in ("pyth", "ptyh", "xyth", "ypth", "yptho"):
+            with self.subTest(query=query):
+                self.assertEqual(self.ids(query), [1, 4])
+
+    def test_short_terms_are_exact(self):
+        """Test qu'un mot court doit commencer un mot du prompt, sans faute."""
+        self.assertEqual(self.ids("ap"), [1])
+        self.assertEqual(self.ids("pa"), [])
+        self.assertEqual(self.ids("a"), [])
+
+    def test_ranking(self):
+        """Test que les correspondances exactes passent avant les approchées, puis l'usage."""
+        self.assertEqual(self.ids("python"), [1, 4])         # Mot entier avant préfixe
+        self.assertEqual(self.ids("pyth"), [1, 4])           # Ex æquo : le plus utilisé
+        self.index.add_usage(4, 5)
+        self.assertEqual(self.ids("pyth"), [4, 1])
+        self.assertEqual(self.ids("pyth", limit=1), [4])
+
+    def test_incremental_updates(self):
+        """Test des ajouts, modifications et suppressions."""
+        self.index.upsert(5, "Traduction anglaise", "Rédaction", "", 0)
+        self.assertEqual(self.ids("tradcution"), [5])
+        self.index.upsert(5, "Traduction allemande", "Rédaction", "", 0)
+        self.assertEqual(self.ids("anglaise"), [])
+        self.assertEqual(self.ids("allemnade"), [5])
+        self.index.remove(1)
+        self.assertEqual(self.ids("pyhton"), [4])
+        self.assertEqual(self.ids("api"), [])
+        self.assertEqual(len(self.index), 4)
+
+    def test_large_result_sets(self):
+        """Test que le classement des grands ensembles (seuils, parcours par usage) égale un tri complet."""
+        rng = random.Random(0)
+        words = ["python", "pythons", "pytest", "pyramide", "api", "apis", "rapide"]
+        rows = [(i, " ".join(rng.sample(words, 2)), None, "", rng.randrange(20))
+                for i in range(1, 3001)]
+        index = FuzzyIndex()
+        index.load(rows)
+
+        for query, ratio in itertools.product(("py", "pyth", "pyhton", "api pyth", "apis pytest", "rapdie"),
+                                              (fuzzy_search.CANDIDATE_CHECK_RATIO, 0)):
+            # Référence : score de chaque prompt, puis tri complet
+            expected = []
+            for prompt_id, title, _, _, usage_count in rows:
+                score = 0
+                for term in fuzzy_terms(query):
+                    qualities = [(len(term) - prefix_distance(term, word)) / len(term)
+                                 + (fuzzy_search.WHOLE_WORD_BONUS if word == term else 0)
+                                 for word in title.split()
+                                 if prefix_distance(term, word) <= max_typos(term)]
+                    if not qualities:
+                        break
+                    score += max(qualities)
+                else:
+                    expected.append((score, usage_count, prompt_id))
+            expected = [prompt_id for _, _, prompt_id in sorted(expected, reverse=True)[:50]]
+            # Ratio 0 : les mots suivants sont toujours vérifiés prompt par prompt
+            with mock.patch.object(fuzzy_search, "CANDIDATE_CHECK_RATIO", ratio):
+                self.assertEqual([prompt.id for prompt in index.search(query)], expected, query)
+
+
+class TestFuzzySearchSession(unittest.TestCase):
+    """Tests de la recherche approximative depuis SearchSession."""
+
+    def setUp(self):
+        """Prépare une base temporaire avec quelques prompts."""
+        self.test_db = tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.db')
+        self.test_db.close()
+        self.db = DatabaseManager(self.test_db.name)
+        self.python_id = self.db.add_prompt("Python API", "Créer une API", "Développement", "python,api")
+        self.db.add_prompt("Email Marketing", "Email pour marketing", "Marketing", "email")
+        self.session = SearchSession(self.db)
+
+    def tearDown(self):
+        """Nettoie après chaque test."""
+        self.db.close()
+        for suffix in ("", "-wal", "-shm", ".usage"):
+            if os.path.exists(self.test_db.name + suffix):
+                os.unlink(self.test_db.name + suffix)
+
+    def test_prefix_selects_fuzzy_mode(self):
+        """Test que le préfixe ~ lance la recherche approximative."""
+        self.assertEqual(fuzzy_query("pyhton"), "~pyhton")
+        self.assertEqual(fuzzy_query("~pyhton"), "~pyhton")
+        self.assertEqual(self.session.search("pyhton"), [])
+        self.assertEqual([row.id for row in self.session.search("~pyhton")], [self.python_id])
+        self.assertEqual(self.session.fuzzy_queries, 1)
+
+        # Sans mot assez long, recherche exacte
+        self.assertEqual(len(self.session.search("~e")), 1)
+        self.assertEqual(self.session.fuzzy_queries, 1)
+
+    def test_index_follows_database(self):
+        """Test que l'index approximatif suit les modifications de la base."""
+        self.session.search("~pyhton")
+        new_id = self.db.add_prompt("Traduction", "Traduire", "Rédaction", "")
+        self.assertEqual([row.id for row in self.session.search("~tradcution")], [new_id])
+
+        self.db.increment_usage(self.python_id)
+        self.assertEqual(self.session.search("~pyhton")[0].usage_count, 1)
+
+        self.db.update_prompt(self.python_id, title="Rust API", tags="rust,api")
+        self.assertEqual(self.session.search("~pyhton"), [])
+        self.db.delete_prompt(new_id)
+        self.assertEqual(self.session.search("~tradcution"), [])
+
+        self.db.import_prompts([{"title": "Résumé", "content": "Résumer"}])
+        self.assertEqual([row.title for row in self.session.search("~rsume")], ["Résumé"])
+
+    def test_changes_during_load_are_kept(self):
+        """Test qu'une modification faite pendant la construction de l'index n'est pas perdue."""
+        snapshot = self.db.get_prompt_metadata
+        added = []
+
+        def snapshot_then_modify():
+            rows = snapshot()
+            added.append(self.db.add_prompt("Traduction", "Traduire", "Rédaction", ""))
+            self.db.increment_usage(self.python_id)
+            return rows
+
+        with mock.patch.object(self.db, "get_prompt_metadata", side_effect=snapshot_then_modify):
+            self.assertEqual(self.session.search("~pyhton")[0].usage_count, 1)
+        self.assertEqual([row.id for row in self.session.search("~tradcution")], added)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
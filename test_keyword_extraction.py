@@ -0,0 +1,115 @@
+"""
+Tests unitaires pour l'extraction de mots-clés (TF-IDF).
+"""
+
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from context_manager import ContextManager
+from database import DatabaseManager
+from keyword_extraction import KeywordExtractor, extract_terms
+
+
+class TestExtractTerms(unittest.TestCase):
+    """Tests du découpage en mots."""
+
+    def test_stopwords_short_words_and_numbers(self):
+        """Test que les mots vides, courts et numériques sont ignorés."""
+        terms = extract_terms("Écrire une fonction Python avec des tests pour 2024, puis tester la fonction.")
+        self.assertEqual(list(terms), ["écrire", "fonction", "python", "tests", "tester"])
+        self.assertEqual(terms["fonction"], 2)
+
+
+class TestKeywordExtractor(unittest.TestCase):
+    """Tests pour la classe KeywordExtractor."""
+
+    def test_frequency_without_corpus(self):
+        """Test que sans bibliothèque, les mots sont classés par fréquence."""
+        extractor = KeywordExtractor()
+        text = "docker docker docker image image conteneur"
+        self.assertEqual(extractor.keywords(text, 2), ["docker", "image"])
+
+    def test_distinctive_words_win(self):
+        """Test qu'un mot présent partout passe après un mot rare."""
+        extractor = KeywordExtractor()
+        extractor.load((i, f"Prompt numéro {i} : générer du code") for i in range(50))
+        keywords = extractor.keywords("Générer du code Kubernetes, générer du code", 2)
+        self.assertEqual(keywords[0], "kubernetes")
+
+    def test_incremental_updates_match_full_load(self):
+        """Test que upsert/remove donnent les mêmes fréquences qu'un rechargement."""
+        documents = {1: "python api rest", 2: "python debug", 3: "email marketing"}
+        incremental = KeywordExtractor()
+        for prompt_id, text in documents.items():
+            incremental.upsert(prompt_id, text)
+
+        incremental.upsert(2, "python profiler")
+        incremental.remove(3)
+        incremental.remove(99)
+        documents[2] = "python profiler"
+        del documents[3]
+
+        reloaded = KeywordExtractor()
+        reloaded.load(documents.items())
+        self.assertEqual(len(incremental), 2)
+        for term in ("python", "debug", "profiler", "email", "rest"):
+            self.assertEqual(incremental.document_frequency(term), reloaded.document_frequency(term), term)
+        self.assertEqual(incremental.document_frequency("python"), 2)
+        self.assertNotIn("debug", incremental._document_frequency)
+
+    def test_large_text(self):
+        """Test d'un long texte collé (plusieurs Ko)."""
+        extractor = KeywordExtractor()
+        text = "Analyse des journaux serveur nginx et latence. " * 400
+        self.assertEqual(extractor.keywords(text, 3), ["analyse", "journaux", "serveur"])
+
+
+class TestContextManagerKeywords(unittest.TestCase):
+    """Tests des suggestions de tags de ContextManager."""
+
+    def setUp(self):
+        self.test_db = tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.db')
+        self.test_db.close()
+        self.db = DatabaseManager(self.test_db.name)
+        for i in range(10):
+            self.db.add_prompt(f"Python {i}", "Écrire du code python propre", "Dev", "python")
+        self.cm = ContextManager(self.db, window_backend=None)
+
+    def tearDown(self):
+        self.db.close()
+        for suffix in ("", "-wal", "-shm", ".usage"):
+            if os.path.exists(self.test_db.name + suffix):
+                os.unlink(self.test_db.name + suffix)
+
+    def test_keywords_follow_library_changes(self):
+        """Test que les fréquences suivent les ajouts et suppressions."""
+        text = "python python flask"
+        self.assertEqual(self.cm.extract_keywords_from_text(text, 1), ["flask"])
+        self.assertEqual(len(self.cm.keyword_extractor), 10)
+
+        prompt_id = self.db.add_prompt("Flask", "Application flask", "Dev", "flask")
+        self.assertEqual(self.cm.keyword_extractor.document_frequency("flask"), 1)
+        self.db.update_prompt(prompt_id, content="Application web", tags="web")
+        self.assertEqual(self.cm.keyword_extractor.document_frequency("flask"), 1)  # Titre
+        self.db.delete_prompt(prompt_id)
+        self.assertEqual(self.cm.keyword_extractor.document_frequency("flask"), 0)
+        self.assertEqual(len(self.cm.keyword_extractor), 10)
+
+    def test_changes_during_load_are_kept(self):
+        """Test qu'un prompt ajouté pendant la lecture de la bibliothèque est compté."""
+        iter_prompts = self.db.iter_prompts
+
+        def read_then_add(*args, **kwargs):
+            yield from iter_prompts(*args, **kwargs)
+            self.db.add_prompt("Flask", "Application flask", "Dev", "flask")
+
+        with mock.patch.object(self.db, "iter_prompts", side_effect=read_then_add):
+            self.cm.extract_keywords_from_text("flask", 1)
+        self.assertEqual(len(self.cm.keyword_extractor), 11)
+        self.assertEqual(self.cm.keyword_extractor.document_frequency("flask"), 1)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,90 @@
+"""
+Tests unitaires pour les modèles de prompts à variables.
+"""
+
+import os
+import tempfile
+import unittest
+
+from database import DatabaseManager
+from prompt_templates import CompiledTemplate, TemplateEngine, context_fills
+
+
+class TestCompiledTemplate(unittest.TestCase):
+    """Tests pour la classe CompiledTemplate."""
+
+    def test_variables_and_render(self):
+        """Test de l'analyse et du remplissage."""
+        template = CompiledTemplate("Email pour [PRODUIT] : {json} [PRODUIT], [NOM CLIENT] [note] [1]")
+        self.assertEqual(template.variables, ("PRODUIT", "NOM CLIENT"))
+        self.assertEqual(template.render({"PRODUIT": "PromptMaster"}),
+                         "Email pour PromptMaster : {json} PromptMaster, [NOM CLIENT] [note] [1]")
+
+    def test_without_variables(self):
+        """Test d'un texte sans variable (accolades conservées)."""
+        template = CompiledTemplate("def f(): return {}")
+        self.assertEqual(template.variables, ())
+        self.assertEqual(template.render({}), "def f(): return {}")
+
+    def test_render_many(self):
+        """Test du remplissage en série."""
+        template = CompiledTemplate("Article sur [SUJET] pour [CIBLE]")
+        fills = [{"SUJET": f"sujet {i}", "CIBLE": "devs"} for i in range(300)]
+        variants = template.render_many(fills)
+        self.assertEqual(len(variants), 300)
+        self.assertEqual(variants[42], "Article sur sujet 42 pour devs")
+
+    def test_context_fills(self):
+        """Test des valeurs déduites de la sélection et de la fenêtre active."""
+        context = {'app_name': 'Code', 'window_title': 'main.py - Visual Studio Code'}
+        template = CompiledTemplate("Analysez [CODE] dans [APPLICATION] ([FENETRE]) pour [PUBLIC]")
+        self.assertEqual(context_fills(template, "x = 1", context),
+                         {"CODE": "x = 1", "APPLICATION": "Code", "FENETRE": "main.py - Visual Studio Code"})
+        self.assertEqual(context_fills(CompiledTemplate("Promouvoir [PRODUIT]"), "Widget"), {"PRODUIT": "Widget"})
+        self.assertEqual(context_fills(CompiledTemplate("Promouvoir [PRODUIT]"), None, context), {})
+
+
+class TestTemplateEngine(unittest.TestCase):
+    """Tests pour la classe TemplateEngine."""
+
+    def setUp(self):
+        self.test_db = tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.db')
+        self.test_db.close()
+        self.db = DatabaseManager(self.test_db.name)
+        self.engine = TemplateEngine(self.db)
+
+    def tearDown(self):
+        self.engine.close()
+        self.db.close()
+        for suffix in ("", "-wal", "-shm", ".usage"):
+            if os.path.exists(self.test_db.name + suffix):
+                os.unlink(self.test_db.name + suffix)
+
+    def test_compiled_once_and_invalidated_on_update(self):
+        """Test que le modèle est compilé une fois puis recompilé après modification."""
+        prompt_id = self.db.add_prompt("Email", "Promouvoir [PRODUIT]")
+        self.assertEqual(self.engine.variables(prompt_id), ("PRODUIT",))
+        self.assertEqual(self.engine.render(prompt_id, {"PRODUIT": "X"}), "Promouvoir X")
+        self.assertEqual(self.engine.compilations, 1)
+
+        self.db.update_prompt(prompt_id, content="Promouvoir [PRODUIT] auprès de [CIBLE]")
+        self.assertEqual(self.engine.variables(prompt_id), ("PRODUIT", "CIBLE"))
+        self.assertEqual(self.engine.compilations, 2)
+
+        self.db.increment_usage(prompt_id)
+        self.engine.variables(prompt_id)
+        self.assertEqual(self.engine.compilations, 2)
+
+        self.db.delete_prompt(prompt_id)
+        self.assertIsNone(self.engine.render(prompt_id, {}))
+        self.assertEqual(self.engine.render_batch(prompt_id, [{}]), [])
+
+    def test_render_batch(self):
+        """Test de la génération de variantes."""
+        prompt_id = self.db.add_prompt("Bug", "Analysez ce bug : [DESCRIPTION]")
+        variants = self.engine.render_batch(prompt_id, ({"DESCRIPTION": f"bug {i}"} for i in range(3)))
+        self.assertEqual(variants, [f"Analysez ce bug : bug {i}" for i in range(3)])
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
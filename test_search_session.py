@@ -0,0 +1,87 @@
+"""
+Tests unitaires pour la session de recherche incrémentale.
+"""
+
+import unittest
+import os
+import tempfile
+from database import DatabaseManager
+from search_session import SearchSession, fold_text, tokenize
+
+
+class TestSearchSession(unittest.TestCase):
+    """Tests pour la classe SearchSession."""
+
+    def setUp(self):
+        """Prépare une base temporaire avec quelques prompts."""
+        self.test_db = tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.db')
+        self.test_db.close()
+        self.db = DatabaseManager(self.test_db.name)
+        self.db.add_prompt("Python API", "Créer une API en Python", "Développement", "python,api")
+        self.db.add_prompt("Python Debug", "Debugger un script", "Développement", "python,debug")
+        self.db.add_prompt("Pytest fixtures", "Écrire des fixtures", "Tests", "pytest")
+        self.db.add_prompt("Email Marketing", "Email pour marketing", "Marketing", "email")
+        self.session = SearchSession(self.db)
+
+    def tearDown(self):
+        """Nettoie après chaque test."""
+        self.db.close()
+        for suffix in ("", "-wal", "-shm", ".usage"):
+            if os.path.exists(self.test_db.name + suffix):
+                os.unlink(self.test_db.name + suffix)
+
+    def test_fold_text(self):
+        """Test de la normalisation sans accents ni casse."""
+        self.assertEqual(fold_text("Développement"), "developpement")
+        self.assertEqual(tokenize("Écrire des fixtures, API_REST"), ["ecrire", "des", "fixtures", "api", "rest"])
+
+    def test_narrowing_uses_cache(self):
+        """Test qu'une saisie qui s'allonge est filtrée en mémoire."""
+        self.assertEqual(len(self.session.search("py")), 3)
+        self.assertEqual(len(self.session.search("pyth")), 2)
+        self.assertEqual(len(self.session.search("python deb")), 1)
+
+        self.assertEqual(self.session.db_queries, 1)
+        self.assertEqual(self.session.narrowed_queries, 2)
+
+    def test_narrowing_matches_database(self):
+        """Test que le filtrage en mémoire donne les mêmes prompts que la base."""
+        self.session.search("p")
+        for query in ("py", "pyt", "pytest", "python a", "python api"):
+            expected = {row[0] for row in self.db.search_prompts(query)}
+            self.assertEqual({row[0] for row in self.session.search(query)}, expected, query)
+
+    def test_shorter_query_hits_cache_or_database(self):
+        """Test du retour arrière : préfixe déjà vu en cache, sinon base."""
+        self.session.search("pyth")
+        self.session.search("python")
+        self.assertEqual(len(self.session.search("pyth")), 2)
+        self.assertEqual(self.session.cache_hits, 1)
+
+        self.session.search("py")
+        self.assertEqual(self.session.db_queries, 2)
+
+    def test_new_query_hits_database(self):
+        """Test qu'une recherche sans rapport interroge la base."""
+        self.session.search("python")
+        self.assertEqual(len(self.session.search("email")), 1)
+        self.assertEqual(self.session.db_queries, 2)
+
+    def test_large_result_sets_are_not_filtered(self):
+        """Test qu'au-delà de max_filter_rows, la base est interrogée."""
+        session = SearchSession(self.db, max_filter_rows=1)
+        session.search("py")
+        session.search("pyth")
+        self.assertEqual(session.db_queries, 2)
+
+    def test_invalidate(self):
+        """Test que invalidate() prend en compte les modifications."""
+        self.session.search("python")
+        self.db.add_prompt("Python async", "asyncio", "Développement", "python")
+        self.session.invalidate()
+
+        self.assertEqual(len(self.session.search("python")), 3)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,326 @@
+"""
+Tests unitaires pour la recherche sémantique hors ligne.
+"""
+
+import os
+import sqlite3
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+from database import DatabaseManager, SEMANTIC_AVAILABLE
+from search_session import SearchSession, semantic_query
+
+if SEMANTIC_AVAILABLE:
+    import numpy as np
+    import semantic_search
+    from semantic_search import VectorIndex, VectorStore, embed_texts, reciprocal_rank_fusion
+
+VECTOR_SUFFIXES = ("", "-wal", "-shm", ".usage", ".vectors", ".vectors.ids", ".vectors.lock")
+
+
+@unittest.skipUnless(SEMANTIC_AVAILABLE, "NumPy non installé")
+class TestEmbeddings(unittest.TestCase):
+    """Tests des vecteurs par hachage de n-grammes."""
+
+    def test_unit_vectors(self):
+        """Test que les vecteurs sont unitaires, déterministes, et nuls sans texte."""
+        vectors = embed_texts(["Traduction anglaise", "", "Traduction anglaise"])
+        self.assertEqual(vectors.shape, (3, semantic_search.EMBEDDING_DIM))
+        self.assertAlmostEqual(float(np.linalg.norm(vectors[0])), 1.0, places=5)
+        self.assertFalse(vectors[1].any())
+        np.testing.assert_array_equal(vectors[0], vectors[2])
+
+    def test_normalization(self):
+        """Test que la casse et les accents n'ont pas d'effet (comme l'index FTS5)."""
+        vectors = embed_texts(["Résumé de RÉUNION", "resume de reunion"])
+        np.testing.assert_allclose(vectors[0], vectors[1])
+
+    def test_related_texts_are_closer(self):
+        """Test qu'une reformulation est plus proche du bon prompt que des autres."""
+        prompts = ["Traduction anglaise", "Revue de code Python", "Résumé de réunion", "Article de blog"]
+        queries = ["traduire en anglais", "relire mon code python", "compte rendu de la réunion",
+                   "écrire un billet de blog"]
+        similarities = embed_texts(queries) @ embed_texts(prompts).T
+        self.assertEqual(np.argmax(similarities, axis=1).tolist(), [0, 1, 2, 3])
+
+    def test_reciprocal_rank_fusion(self):
+        """Test de la fusion par rangs réciproques."""
+        self.assertEqual(reciprocal_rank_fusion([[1, 2, 3], [3, 4]]), [3, 1, 2, 4])
+        self.assertEqual(reciprocal_rank_fusion([[1, 2], [2, 1]]), [1, 2])  # Égalité : 1er classement
+        self.assertEqual(reciprocal_rank_fusion([[], [5]]), [5])
+
+
+@unittest.skipUnless(SEMANTIC_AVAILABLE, "NumPy non installé")
+class TestVectorIndex(unittest.TestCase):
+    """Tests du stockage projeté en mémoire et de l'index IVF."""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "prompts.vectors")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    @staticmethod
+    def clustered_vectors(count: int, seed: int = 0) -> "np.ndarray":
+        """Vecteurs unitaires groupés autour de centres aléatoires."""
+        rng = np.random.default_rng(seed)
+        centers = rng.standard_normal((64, semantic_search.EMBEDDING_DIM))
+        vectors = centers[rng.integers(0, 64, count)] + 0.5 * rng.standard_normal(
+            (count, semantic_search.EMBEDDING_DIM))
+        return (vectors / np.linalg.norm(vectors, axis=1, keepdims=True)).astype(np.float32)
+
+    def test_store_persists_and_grows(self):
+        """Test que les vecteurs et empreintes survivent à la fermeture, au-delà de la capacité initiale."""
+        vectors = self.clustered_vectors(100)
+        with mock.patch.object(semantic_search, "INITIAL_CAPACITY", 16):
+            store = VectorStore(self.path)
+            for prompt_id in range(1, 101):
+                store.put(prompt_id, bytes([prompt_id]) * 16, vectors[prompt_id - 1])
+            store.delete(50)
+            self.assertGreaterEqual(store.capacity, 100)
+            store.close()
+
+            store = VectorStore(self.path)
+        self.assertEqual(len(store), 99)
+        self.assertIsNone(store.digest(50))
+        self.assertEqual(store.digest(7), bytes([7]) * 16)
+        np.testing.assert_allclose(store.vectors[store.row_of[7]], vectors[6], atol=1e-3)
+
+        # Une ligne libérée est réutilisée avant d'agrandir le fichier
+        capacity = store.capacity
+        store.put(101, bytes(16), vectors[0])
+        self.assertEqual(store.capacity, capacity)
+        store.close()
+
+    def test_store_is_locked(self):
+        """Test qu'une seule instance à la fois écrit dans le fichier de vecteurs."""
+        vectors = self.clustered_vectors(2)
+        store = VectorStore(self.path)
+        store.put(1, bytes(16), vectors[0])
+
+        other = VectorStore(self.path)
+        self.assertIsNone(other.path)
+        other.put(2, bytes(16), vectors[1])
+        other.close()
+        store.close()
+
+        store = VectorStore(self.path)
+        self.assertEqual(store.path, self.path)
+        self.assertEqual(list(store.row_of), [1])
+        store.close()
+
+    def test_inconsistent_file_is_recreated(self):
+        """Test qu'un fichier tronqué est recréé vide au lieu d'être mal lu."""
+        store = VectorStore(self.path)
+        store.put(1, bytes(16), self.clustered_vectors(1)[0])
+        store.close()
+        with open(self.path, "r+b") as f:
+            f.truncate(100)
+        self.assertEqual(len(VectorStore(self.path)), 0)
+
+    def test_ivf_recall(self):
+        """Test que l'index IVF retrouve presque tous les vrais plus proches voisins."""
+        vectors = self.clustered_vectors(6000)
+        index = VectorIndex()
+        index.upsert_many(list(range(1, 6001)), [bytes(16)] * 6000, vectors)
+        self.assertIsNotNone(index.centroids)
+
+        queries = self.clustered_vectors(50, seed=1)
+        found = 0
+        for query in queries:
+            exact = np.argsort(-(vectors @ query), kind="stable")[:10] + 1
+            approximate = [prompt_id for prompt_id, _ in index.search(query, 10)]
+            found += len(set(exact.tolist()) & set(approximate))
+        self.assertGreaterEqual(found / 500, 0.9)
+
+    def test_incremental_updates(self):
+        """Test des ajouts, modifications et suppressions après calcul des centres."""
+        vectors = self.clustered_vectors(5001)
+        index = VectorIndex()
+        index.upsert_many(list(range(1, 5001)), [bytes(16)] * 5000, vectors[:5000])
+
+        index.upsert(9999, b"n" * 16, vectors[5000])
+        self.assertEqual(index.search(vectors[5000], 1)[0][0], 9999)
+        self.assertEqual(index.digest(9999), b"n" * 16)
+
+        index.upsert(9999, b"m" * 16, vectors[3])
+        self.assertEqual({prompt_id for prompt_id, _ in index.search(vectors[3], 2)}, {4, 9999})
+
+        index.remove(9999)
+        index.remove(4)
+        self.assertNotIn(4, [prompt_id for prompt_id, _ in index.search(vectors[3], 10)])
+        self.assertEqual(len(index), 4999)
+
+    def test_retrain_when_library_doubles(self):
+        """Test que les centres sont calculés au seuil puis recalculés quand la bibliothèque double."""
+        with mock.patch.object(semantic_search, "IVF_MIN_VECTORS", 100):
+            vectors = self.clustered_vectors(250)
+            index = VectorIndex()
+            index.upsert_many(list(range(1, 100)), [bytes(16)] * 99, vectors[:99])
+            self.assertIsNone(index.centroids)
+            index.upsert(100, bytes(16), vectors[99])
+            self.assertEqual(len(index.centroids), 10)
+            index.upsert_many(list(range(101, 201)), [bytes(16)] * 100, vectors[100:200])
+            self.assertEqual(len(index.centroids), 14)
+
+
+@unittest.skipUnless(SEMANTIC_AVAILABLE, "NumPy non installé")
+class TestSemanticDatabaseSearch(unittest.TestCase):
+    """Tests de la recherche sémantique depuis DatabaseManager et SearchSession."""
+
+    def setUp(self):
+        """Prépare une base temporaire avec quelques prompts."""
+        self.test_db = tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.db')
+        self.test_db.close()
+        self.db = DatabaseManager(self.test_db.name)
+        self.translation_id = self.db.add_prompt(
+            "Traduction anglaise", "Traduisez ce texte en anglais : [TEXTE]", "Rédaction", "langues")
+        self.review_id = self.db.add_prompt(
+            "Revue de code", "Relisez ce code Python et signalez les bugs", "Développement", "python")
+        self.db.add_prompt("Email Marketing", "Email pour promouvoir [PRODUIT]", "Marketing", "email")
+
+    def tearDown(self):
+        """Nettoie après chaque test."""
+        self.db.close()
+        for suffix in VECTOR_SUFFIXES:
+            if os.path.exists(self.test_db.name + suffix):
+                os.unlink(self.test_db.name + suffix)
+
+    def ids(self, query: str):
+        """IDs trouvés par la recherche mêlée, une fois les vecteurs à jour."""
+        self.db.enable_semantic_search()
+        self.db.semantic_index.ensure_synced()
+        return [row[0] for row in self.db.search_prompts(query, semantic=True)]
+
+    def test_blended_search(self):
+        """Test que les voisins sémantiques complètent les résultats par mots-clés."""
+        self.assertEqual(self.db.search_prompts("traduire en anglais"), [])
+        self.assertEqual(self.ids("traduire en anglais"), [self.translation_id])
+
+        # Correspondance exacte et sémantique : en tête
+        self.assertEqual(self.ids("code python")[0], self.review_id)
+        summaries = self.db.search_prompt_summaries("relire mon code", with_snippet=True, semantic=True)
+        self.assertEqual(summaries[0].id, self.review_id)
+        self.assertTrue(summaries[0].snippet.startswith("Relisez"))
+
+    def test_index_follows_database(self):
+        """Test que les vecteurs suivent add_prompt, update_prompt, delete_prompt et les imports."""
+        self.ids("traduire")
+        new_id = self.db.add_prompt("Résumé de réunion", "Résumez cette réunion", "Productivité", "")
+        self.assertIn(new_id, self.ids("résumer la réunion"))
+
+        self.db.update_prompt(self.translation_id, title="Traduction allemande",
+                              content="Traduisez ce texte en allemand")
+        self.assertNotIn(self.translation_id, self.ids("anglais"))
+        self.assertIn(self.translation_id, self.ids("traduire en allemand"))
+
+        self.db.delete_prompt(new_id)
+        self.assertNotIn(new_id, self.ids("résumer la réunion"))
+
+        self.db.import_prompts([{"title": "Article de blog", "content": "Rédigez un article"}])
+        self.assertEqual(len(self.ids("écrire un billet de blog")), 1)
+
+    def test_vectors_are_reused_after_restart(self):
+        """Test qu'au redémarrage seuls les prompts modifiés entre-temps sont vectorisés."""
+        self.ids("traduire")
+        self.assertEqual(self.db.semantic_index.embedded, 3)
+        self.db.close()
+
+        # Modification sans recherche sémantique active
+        db = DatabaseManager(self.test_db.name)
+        db.update_prompt(self.review_id, content="Relisez ce code Rust")
+        db.close()
+
+        self.db = DatabaseManager(self.test_db.name)
+        self.assertEqual(self.ids("traduire en anglais"), [self.translation_id])
+        self.assertEqual(self.db.semantic_index.embedded, 1)
+
+    def test_initial_sync_in_background(self):
+        """Test que la vectorisation initiale se fait dans son propre thread, avec sa connexion."""
+        threads = []
+        iter_prompts = self.db.iter_prompts
+
+        def recording_iter_prompts(*args, **kwargs):
+            threads.append(threading.get_ident())
+            return iter_prompts(*args, **kwargs)
+
+        with mock.patch.object(self.db, "iter_prompts", recording_iter_prompts):
+            self.assertTrue(self.db.enable_semantic_search())
+            self.db.semantic_index._sync_thread.join()
+        self.assertEqual(threads, [self.db.semantic_index._sync_thread.ident])
+        self.assertEqual(self.db.semantic_index.embedded, 3)
+        self.assertEqual(self.ids("traduire en anglais"), [self.translation_id])
+
+    def test_interrupted_sync_is_resumed(self):
+        """Test qu'un parcours interrompu (OperationalError) est refait à la recherche suivante."""
+        index = semantic_search.SemanticIndex(self.db)
+        iter_prompts = self.db.iter_prompts
+
+        def interrupted_iter_prompts(*args, **kwargs):
+            for position, prompt in enumerate(iter_prompts(*args, **kwargs)):
+                if position == 1:
+                    raise sqlite3.OperationalError("interrupted")
+                yield prompt
+
+        with mock.patch.object(self.db, "iter_prompts", interrupted_iter_prompts):
+            with self.assertRaises(sqlite3.OperationalError):
+                index.sync()
+        self.assertEqual(len(index.index), 0)
+        self.assertTrue(index.building)
+
+        index.ensure_synced()
+        self.assertEqual([prompt_id for prompt_id, _ in index.search("traduire en anglais")],
+                         [self.translation_id])
+        self.assertEqual(len(index.index), 3)
+        index.close()
+
+    def test_search_does_not_wait_for_sync(self):
+        """Test qu'une recherche pendant la vectorisation répond sans attendre, avec les résultats par mots-clés."""
+        release = threading.Event()
+        embed = semantic_search.SemanticIndex._embed
+
+        def slow_embed(index, batch):
+            release.wait(5)
+            embed(index, batch)
+
+        with mock.patch.object(semantic_search.SemanticIndex, "_embed", slow_embed):
+            self.db.enable_semantic_search()
+            self.assertTrue(self.db.semantic_index_building())
+            session = SearchSession(self.db)
+            self.assertTrue(session.is_partial("?traduire"))
+            self.assertFalse(session.is_partial("traduire"))
+            self.assertFalse(session.is_partial("? "))
+            self.assertEqual([row[0] for row in self.db.search_prompts("code python", semantic=True)],
+                             [self.review_id])
+            self.assertEqual(self.db.search_prompts("traduire en anglais", semantic=True), [])
+            release.set()
+            self.db.semantic_index.ensure_synced()
+        self.assertFalse(self.db.semantic_index_building())
+        self.assertFalse(session.is_partial("?traduire"))
+        self.assertEqual(self.ids("traduire en anglais"), [self.translation_id])
+
+    def test_search_session_prefix(self):
+        """Test que le préfixe ? lance la recherche sémantique."""
+        session = SearchSession(self.db)
+        self.ids("traduire")
+        self.assertEqual(semantic_query("traduire"), "?traduire")
+        self.assertEqual(semantic_query("?traduire"), "?traduire")
+        self.assertEqual(session.search("traduire en anglais"), [])
+        self.assertEqual([row.id for row in session.search("?traduire en anglais")], [self.translation_id])
+        self.assertEqual(session.semantic_queries, 1)
+
+    def test_search_session_empty_semantic_query(self):
+        """Test qu'un ? seul est traité comme une recherche vide."""
+        session = SearchSession(self.db)
+        expected = [row.id for row in session.search("")]
+        self.assertEqual([row.id for row in session.search("?")], expected)
+        self.assertEqual([row.id for row in session.search("? ")], expected)
+        self.assertEqual(session.semantic_queries, 0)
+        self.assertIsNone(self.db.semantic_index)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,91 @@
+"""
+Tests du coût d'import au démarrage (python -X importtime).
+PromptMaster est lancé à l'ouverture de session : les modules lourds ne
+doivent être chargés qu'au premier raccourci ou en arrière-plan.
+"""
+
+import os
+import subprocess
+import sys
+import unittest
+from importlib.util import find_spec
+from typing import Dict
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# Modules qui ne doivent pas être importés au démarrage
+LAZY_MODULES = ("numpy", "pyperclip", "pynput", "win32gui", "win32process",
+                "win32clipboard", "psutil", "qfluentwidgets")
+
+# Budgets d'import cumulés (millisecondes, meilleur de IMPORT_RUNS essais)
+CONTEXT_MANAGER_BUDGET_MS = 80
+MAIN_BUDGET_MS = 400  # Qt compris
+
+IMPORT_RUNS = 3
+
+
+def import_times(module: str) -> Dict[str, float]:
+    """
+    Importe un module dans un nouveau processus avec -X importtime.
+
+    Args:
+        module: Nom du module à importer
+
+    Returns:
+        Dict nom de module -> durée cumulée de son import, en millisecondes
+    """
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            cwd=ROOT, capture_output=True, text=True, check=True)
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        try:
+            times[name.strip()] = int(cumulative) / 1000
+        except ValueError:
+            continue  # Ligne d'en-tête
+    return times
+
+
+def best_import_time(module: str) -> float:
+    """Durée cumulée d'import d'un module, la meilleure de IMPORT_RUNS essais (ms)."""
+    return min(import_times(module)[module] for _ in range(IMPORT_RUNS))
+
+
+class TestStartupImports(unittest.TestCase):
+    """Tests des imports au démarrage."""
+
+    def assertLazy(self, module: str):
+        """Vérifie qu'importer module ne charge aucun module lourd."""
+        imported = import_times(module)
+        self.assertIn(module, imported)
+        loaded = sorted(name for name in imported if name.split(".")[0] in LAZY_MODULES)
+        self.assertEqual(loaded, [], f"{module} importe des modules lourds au démarrage")
+
+    def test_context_modules_are_lazy(self):
+        """Test que le contexte n'importe numpy, pywin32, pynput... qu'à l'usage."""
+        for module in ("context_manager", "context_poller", "clipboard_capture", "window_context"):
+            with self.subTest(module=module):
+                self.assertLazy(module)
+
+    def test_context_manager_import_budget(self):
+        """Test du budget d'import de context_manager."""
+        self.assertLess(best_import_time("context_manager"), CONTEXT_MANAGER_BUDGET_MS)
+
+    @unittest.skipUnless(find_spec("PySide6"), "PySide6 non installé")
+    def test_main_is_lazy(self):
+        """Test que main n'importe ni l'interface ni pynput."""
+        self.assertLazy("main")
+        imported = import_times("main")
+        for module in ("gui", "context_manager", "database"):
+            self.assertNotIn(module, imported)
+
+    @unittest.skipUnless(find_spec("PySide6"), "PySide6 non installé")
+    def test_main_import_budget(self):
+        """Test du budget d'import de main."""
+        self.assertLess(best_import_time("main"), MAIN_BUDGET_MS)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,41 @@
+"""
+Tests unitaires pour la mesure de latence.
+"""
+
+import unittest
+from timing import LatencyRecorder
+
+
+class TestLatencyRecorder(unittest.TestCase):
+    """Tests pour la classe LatencyRecorder."""
+
+    def test_percentiles(self):
+        """Test des percentiles par rang le plus proche."""
+        recorder = LatencyRecorder("test")
+        self.assertIsNone(recorder.percentile(50))
+        self.assertEqual(recorder.summary()['count'], 0)
+
+        for ms in range(100, 0, -1):
+            recorder.record(ms / 1000)
+        summary = recorder.summary()
+        self.assertEqual(summary['count'], 100)
+        self.assertAlmostEqual(summary['p50'], 0.050)
+        self.assertAlmostEqual(summary['p99'], 0.099)
+        self.assertAlmostEqual(summary['max'], 0.100)
+        self.assertIn("p99 99.0 ms", recorder.report())
+
+    def test_sliding_window_and_measure(self):
+        """Test que seules les dernières mesures sont gardées."""
+        recorder = LatencyRecorder("test", maxlen=3)
+        for seconds in (9.0, 1.0, 2.0, 3.0):
+            recorder.record(seconds)
+        self.assertEqual(recorder.summary()['max'], 3.0)
+
+        with recorder.measure():
+            pass
+        self.assertEqual(len(recorder), 3)
+        self.assertLess(recorder.percentile(0), 0.01)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
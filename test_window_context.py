@@ -0,0 +1,102 @@
+"""
+Tests unitaires pour le cache de contexte de la fenêtre active.
+"""
+
+import unittest
+from window_context import ActiveWindowContext, UNKNOWN_CONTEXT
+
+
+class FakeWindowBackend:
+    """Fenêtre active simulée, qui compte les appels système."""
+
+    def __init__(self):
+        self.window = (1, "main.py - Visual Studio Code")
+        self.pids = {1: 100, 2: 100, 3: 200}
+        self.names = {100: "Code.exe", 200: "chrome.exe"}
+        self.calls = {"foreground_window": 0, "window_pid": 0, "process_name": 0}
+
+    def foreground_window(self):
+        self.calls["foreground_window"] += 1
+        return self.window
+
+    def window_pid(self, hwnd):
+        self.calls["window_pid"] += 1
+        return self.pids[hwnd]
+
+    def process_name(self, pid):
+        self.calls["process_name"] += 1
+        return self.names.get(pid)
+
+
+class TestActiveWindowContext(unittest.TestCase):
+    """Tests pour la classe ActiveWindowContext."""
+
+    def setUp(self):
+        """Prépare un cache sur une fenêtre simulée."""
+        self.backend = FakeWindowBackend()
+        self.categorized = []
+
+        def categorize(process_name, window_title):
+            self.categorized.append((process_name, window_title))
+            return "Développement" if process_name == "Code.exe" else None
+
+        self.categorize = categorize
+
+    def test_ttl_reuses_context(self):
+        """Test que les appels rapprochés ne refont aucun appel système."""
+        context = ActiveWindowContext(self.backend, self.categorize, ttl=60)
+        first = context.get()
+        for _ in range(3):
+            self.assertEqual(context.get(), first)
+
+        self.assertEqual(first['app_name'], "Code")
+        self.assertEqual(first['category'], "Développement")
+        self.assertEqual(self.backend.calls["foreground_window"], 1)
+        self.assertEqual(context.hits, 3)
+
+    def test_unchanged_window_is_revalidated(self):
+        """Test qu'après le TTL, une fenêtre inchangée n'est pas recalculée."""
+        context = ActiveWindowContext(self.backend, self.categorize, ttl=0)
+        context.get()
+        context.get()
+
+        self.assertEqual(self.backend.calls["foreground_window"], 2)
+        self.assertEqual(self.backend.calls["window_pid"], 1)
+        self.assertEqual((context.revalidations, context.resolutions), (1, 1))
+
+    def test_window_change_invalidates(self):
+        """Test qu'un changement de fenêtre ou de titre recalcule le contexte."""
+        context = ActiveWindowContext(self.backend, self.categorize, ttl=0)
+        context.get()
+
+        self.backend.window = (1, "README.md - Visual Studio Code")
+        self.assertEqual(context.get()['window_title'], "README.md - Visual Studio Code")
+        self.backend.window = (2, "Terminal")
+        context.get()
+        self.backend.window = (3, "GitHub - Chrome")
+        self.assertEqual(context.get()['process_name'], "chrome.exe")
+
+        self.assertEqual(context.resolutions, 4)
+        # Le nom du processus est lu une fois par PID
+        self.assertEqual(self.backend.calls["process_name"], 2)
+        self.assertEqual(self.categorized[-1], ("chrome.exe", "GitHub - Chrome"))
+
+    def test_invalidate_and_errors(self):
+        """Test de invalidate() et du contexte inconnu en cas d'erreur."""
+        context = ActiveWindowContext(self.backend, self.categorize, ttl=60)
+        context.get()
+        context.invalidate()
+        context.get()
+        self.assertEqual(context.resolutions, 2)
+
+        context.invalidate()
+        self.backend.window = (4, "Fenêtre disparue")
+        self.assertEqual(context.get(), UNKNOWN_CONTEXT)
+
+        self.backend.pids[5] = 300  # Processus inaccessible
+        self.backend.window = (5, "Sans processus")
+        self.assertEqual(context.get()['app_name'], "Unknown")
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
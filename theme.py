@@ -0,0 +1,232 @@
+"""
+Thèmes de PromptMaster.
+Chaque thème est une seule feuille de style, appliquée une fois à
+l'application : Qt l'analyse une seule fois au lieu de réanalyser les styles
+de chaque widget à chaque fenêtre ou dialogue construit.
+
+Les règles ciblent les widgets par objectName (setObjectName) ; les
+widgets n'appellent plus setStyleSheet eux-mêmes.
+"""
+
+from PySide6.QtWidgets import QApplication
+
+
+DRACULA_STYLESHEET = """
+    /* Fenêtre principale */
+    QWidget#container {
+        background-color: #282a36;
+        border-radius: 12px;
+        border: 2px solid #44475a;
+    }
+
+    QLabel#title {
+        color: #f8f8f2;
+        font-size: 22px;
+        font-weight: bold;
+        padding: 5px;
+    }
+
+    QLabel#contextLabel {
+        color: #8be9fd;
+        font-size: 11px;
+        padding: 5px;
+        background-color: #44475a;
+        border-radius: 4px;
+    }
+
+    QLineEdit#searchInput {
+        background-color: #44475a;
+        border: 2px solid #6272a4;
+        border-radius: 8px;
+        padding: 12px;
+        font-size: 16px;
+        color: #f8f8f2;
+    }
+
+    QLineEdit#searchInput:focus {
+        border: 2px solid #bd93f9;
+    }
+
+    QPushButton#fuzzyButton {
+        background-color: #44475a;
+        border: 2px solid #6272a4;
+        border-radius: 8px;
+        padding: 10px 14px;
+        font-size: 16px;
+        color: #f8f8f2;
+    }
+
+    QPushButton#fuzzyButton:checked {
+        background-color: #bd93f9;
+        border: 2px solid #bd93f9;
+        color: #282a36;
+    }
+
+    QSplitter#mainSplitter {
+        background-color: transparent;
+    }
+
+    QListView#resultsList {
+        background-color: #1e1f29;
+        border: 1px solid #44475a;
+        border-radius: 8px;
+        padding: 5px;
+        color: #f8f8f2;
+        font-size: 14px;
+    }
+
+    QListView#resultsList::item {
+        padding: 12px;
+        border-radius: 6px;
+        margin: 2px;
+    }
+
+    QListView#resultsList::item:hover {
+        background-color: #44475a;
+    }
+
+    QListView#resultsList::item:selected {
+        background-color: #bd93f9;
+        color: #282a36;
+        font-weight: bold;
+    }
+
+    QWidget#previewContainer {
+        background-color: #1e1f29;
+        border: 1px solid #44475a;
+        border-radius: 8px;
+    }
+
+    QLabel#previewTitle {
+        color: #50fa7b;
+        font-size: 16px;
+        font-weight: bold;
+    }
+
+    QLabel#previewMeta {
+        color: #8be9fd;
+        font-size: 11px;
+    }
+
+    QFrame#separator {
+        background-color: #44475a;
+    }
+
+    QTextEdit#previewContent {
+        background-color: #282a36;
+        border: 1px solid #44475a;
+        border-radius: 6px;
+        padding: 10px;
+        color: #f8f8f2;
+        font-size: 13px;
+        line-height: 1.6;
+    }
+
+    QLabel#footer {
+        color: #6272a4;
+        font-size: 10px;
+        padding: 5px;
+    }
+
+    QPushButton#addButton {
+        background-color: #50fa7b;
+        color: #282a36;
+        border: none;
+        border-radius: 6px;
+        padding: 8px 16px;
+        font-weight: bold;
+        font-size: 13px;
+    }
+
+    QPushButton#addButton:hover {
+        background-color: #5fff87;
+    }
+
+    QPushButton#addButton:pressed {
+        background-color: #3de064;
+    }
+
+    /* Dialogue d'édition */
+    QDialog#promptEditor {
+        background-color: #282a36;
+    }
+
+    QDialog#promptEditor QLabel#fieldLabel {
+        color: #f8f8f2;
+        font-weight: bold;
+    }
+
+    QDialog#promptEditor QLineEdit,
+    QDialog#promptEditor QComboBox,
+    QDialog#promptEditor QTextEdit {
+        background-color: #44475a;
+        border: 2px solid #6272a4;
+        border-radius: 6px;
+        padding: 8px;
+        color: #f8f8f2;
+        font-size: 14px;
+    }
+
+    QDialog#promptEditor QPushButton#suggestButton {
+        background-color: #6272a4;
+        color: white;
+        border: none;
+        border-radius: 4px;
+        padding: 4px 8px;
+        font-size: 11px;
+    }
+
+    QDialog#promptEditor QPushButton#deleteButton,
+    QDialog#promptEditor QPushButton#cancelButton,
+    QDialog#promptEditor QPushButton#saveButton {
+        color: white;
+        border: none;
+        border-radius: 6px;
+        padding: 10px 20px;
+        font-weight: bold;
+    }
+
+    QDialog#promptEditor QPushButton#deleteButton {
+        background-color: #ff5555;
+    }
+
+    QDialog#promptEditor QPushButton#cancelButton {
+        background-color: #6272a4;
+    }
+
+    QDialog#promptEditor QPushButton#saveButton {
+        background-color: #50fa7b;
+        color: #282a36;
+    }
+"""
+
+# Feuilles de style disponibles, par nom
+THEMES = {
+    'dracula': DRACULA_STYLESHEET,
+}
+
+# Propriété de l'application qui retient le thème appliqué
+THEME_PROPERTY = "promptmasterTheme"
+
+
+def apply_theme(app: QApplication, name: str = 'dracula') -> bool:
+    """
+    Applique un thème à toute l'application.
+
+    Sans effet si le thème est déjà appliqué : plusieurs fenêtres peuvent
+    l'appeler sans faire réanalyser la feuille de style.
+
+    Args:
+        app: Application Qt
+        name: Nom du thème (clé de THEMES)
+
+    Returns:
+        True si la feuille de style a été (ré)appliquée
+    """
+    if name not in THEMES:
+        raise ValueError(f"Thème inconnu : {name}")
+    if app.property(THEME_PROPERTY) == name:
+        return False
+    app.setStyleSheet(THEMES[name])
+    app.setProperty(THEME_PROPERTY, name)
+    return True
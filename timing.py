@@ -0,0 +1,88 @@
+"""
+Mesure de latence pour PromptMaster.
+Garde les dernières durées d'une opération et en donne les percentiles
+(p50, p99) pour suivre les temps de réponse perçus par l'utilisateur.
+"""
+
+import math
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+
+
+def nearest_rank(sorted_samples: List[float], p: float) -> float:
+    """p-ième percentile (méthode du rang le plus proche) d'une liste triée non vide."""
+    rank = math.ceil(p / 100 * len(sorted_samples))
+    return sorted_samples[min(max(rank, 1), len(sorted_samples)) - 1]
+
+
+class LatencyRecorder:
+    """Fenêtre glissante des dernières durées d'une opération."""
+
+    def __init__(self, name: str, maxlen: int = 1000):
+        """
+        Initialise l'enregistreur.
+
+        Args:
+            name: Nom de l'opération mesurée (affiché par report)
+            maxlen: Nombre de mesures conservées
+        """
+        self.name = name
+        self._samples = deque(maxlen=maxlen)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float):
+        """Ajoute une durée, en secondes."""
+        with self._lock:
+            self._samples.append(seconds)
+
+    @contextmanager
+    def measure(self) -> Iterator[None]:
+        """Mesure la durée du bloc with."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(time.perf_counter() - start)
+
+    def percentile(self, p: float) -> Optional[float]:
+        """
+        Retourne le p-ième percentile (rang le plus proche), ou None sans mesure.
+
+        Args:
+            p: Percentile entre 0 et 100
+        """
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return None
+        return nearest_rank(samples, p)
+
+    def summary(self) -> Dict[str, float]:
+        """
+        Statistiques des mesures conservées.
+
+        Returns:
+            Dict avec count, p50, p99 et max (secondes ; 0.0 sans mesure)
+        """
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return {'count': 0, 'p50': 0.0, 'p99': 0.0, 'max': 0.0}
+        return {
+            'count': len(samples),
+            'p50': nearest_rank(samples, 50),
+            'p99': nearest_rank(samples, 99),
+            'max': samples[-1],
+        }
+
+    def report(self) -> str:
+        """Résumé lisible : nom, nombre de mesures, p50/p99/max en millisecondes."""
+        stats = self.summary()
+        return (f"{self.name} : {stats['count']} mesure(s), p50 {stats['p50'] * 1e3:.1f} ms, "
+                f"p99 {stats['p99'] * 1e3:.1f} ms, max {stats['max'] * 1e3:.1f} ms")
+
+    def __len__(self) -> int:
+        return len(self._samples)
@@ -0,0 +1,185 @@
+"""
+Contexte de la fenêtre active pour PromptMaster.
+Résout la fenêtre au premier plan (titre, processus, catégorie) et garde le
+résultat quelques instants : les différentes parties de l'interface qui
+l'interrogent pendant un même affichage ne refont pas les appels système.
+"""
+
+import threading
+import time
+from datetime import datetime
+from importlib.util import find_spec
+from typing import Callable, Dict, Optional, Tuple
+
+# pywin32 et psutil ne sont importés qu'au premier appel de Win32WindowBackend
+WINDOWS_SUPPORT = all(find_spec(name) is not None for name in ("win32gui", "win32process", "psutil"))
+if not WINDOWS_SUPPORT:
+    print("⚠️ win32gui non disponible. Installez pywin32 pour le support complet du contexte.")
+
+
+# Durée (secondes) pendant laquelle un contexte est réutilisé sans vérification
+CONTEXT_TTL = 0.5
+
+# Nombre de noms de processus gardés en cache (pid -> nom)
+PROCESS_NAME_CACHE_SIZE = 256
+
+# Contexte renvoyé quand la fenêtre active ne peut pas être déterminée
+UNKNOWN_CONTEXT = {
+    'app_name': 'Unknown',
+    'window_title': '',
+    'process_name': 'unknown',
+    'category': None
+}
+
+
+class Win32WindowBackend:
+    """Accès à la fenêtre active via pywin32 et psutil (Windows)."""
+
+    def foreground_window(self) -> Tuple[int, str]:
+        """Retourne (handle, titre) de la fenêtre au premier plan."""
+        import win32gui
+        hwnd = win32gui.GetForegroundWindow()
+        return hwnd, win32gui.GetWindowText(hwnd)
+
+    def window_pid(self, hwnd: int) -> int:
+        """Retourne le PID du processus propriétaire d'une fenêtre."""
+        import win32process
+        _, pid = win32process.GetWindowThreadProcessId(hwnd)
+        return pid
+
+    def process_name(self, pid: int) -> Optional[str]:
+        """Retourne le nom de l'exécutable d'un processus, ou None."""
+        import psutil
+        try:
+            return psutil.Process(pid).name()
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            return None
+
+
+class StubWindowBackend:
+    """
+    Fenêtre active simulée, pour les tests et les systèmes sans pywin32.
+
+    Les fenêtres sont déclarées avec set_foreground(), qui remplace la
+    fenêtre au premier plan.
+    """
+
+    def __init__(self):
+        self._window: Tuple[int, str] = (0, "")
+        self._pids: Dict[int, int] = {}
+        self._process_names: Dict[int, str] = {}
+
+    def set_foreground(self, hwnd: int, window_title: str, process_name: Optional[str] = None,
+                       pid: Optional[int] = None):
+        """Place une fenêtre au premier plan (process_name None : processus inaccessible)."""
+        pid = hwnd if pid is None else pid
+        self._window = (hwnd, window_title)
+        self._pids[hwnd] = pid
+        if process_name is not None:
+            self._process_names[pid] = process_name
+
+    def foreground_window(self) -> Tuple[int, str]:
+        return self._window
+
+    def window_pid(self, hwnd: int) -> int:
+        return self._pids.get(hwnd, 0)
+
+    def process_name(self, pid: int) -> Optional[str]:
+        return self._process_names.get(pid)
+
+
+class ActiveWindowContext:
+    """
+    Contexte de la fenêtre active, mis en cache.
+
+    - Pendant ttl secondes, le dernier contexte est renvoyé tel quel.
+    - Ensuite, seuls le handle et le titre de la fenêtre sont relus : s'ils
+      n'ont pas changé, le contexte est conservé.
+    - Sinon il est recalculé ; le nom du processus est lu dans un cache par PID.
+    """
+
+    def __init__(self, backend, categorize: Callable[[str, str], Optional[str]],
+                 ttl: float = CONTEXT_TTL):
+        """
+        Initialise le cache de contexte.
+
+        Args:
+            backend: Accès à la fenêtre active (voir Win32WindowBackend)
+            categorize: Fonction (nom du processus, titre) -> catégorie ou None
+            ttl: Durée de réutilisation sans vérification, en secondes
+        """
+        self.backend = backend
+        self.categorize = categorize
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._context: Optional[Dict] = None
+        self._window: Optional[Tuple[int, str]] = None  # (hwnd, titre) du contexte en cache
+        self._expires = 0.0
+        self._process_names: Dict[int, str] = {}
+
+        # Statistiques
+        self.hits = 0           # Contexte renvoyé sans appel système
+        self.revalidations = 0  # Fenêtre relue, inchangée
+        self.resolutions = 0    # Contexte recalculé
+
+    def get(self) -> Dict:
+        """
+        Retourne le contexte de la fenêtre active.
+
+        Returns:
+            Dict avec app_name, window_title, process_name, category, timestamp
+        """
+        with self._lock:
+            now = time.monotonic()
+            if self._context is not None and now < self._expires:
+                self.hits += 1
+                return dict(self._context)
+
+            try:
+                window = self.backend.foreground_window()
+                if self._context is not None and window == self._window:
+                    self.revalidations += 1
+                else:
+                    self._context = self._resolve(*window)
+                    self._window = window
+                    self.resolutions += 1
+            except Exception as e:
+                print(f"Erreur lors de la récupération du contexte : {e}")
+                self._context = None
+                return dict(UNKNOWN_CONTEXT)
+
+            self._expires = now + self.ttl
+            return dict(self._context)
+
+    def invalidate(self):
+        """Force le recalcul du contexte au prochain appel."""
+        with self._lock:
+            self._context = None
+            self._window = None
+
+    def _resolve(self, hwnd: int, window_title: str) -> Dict:
+        """Calcule le contexte d'une fenêtre."""
+        process_name = self._process_name(self.backend.window_pid(hwnd))
+        if process_name:
+            app_name = process_name.replace('.exe', '').title()
+        else:
+            process_name, app_name = 'unknown', 'Unknown'
+
+        return {
+            'app_name': app_name,
+            'window_title': window_title,
+            'process_name': process_name,
+            'category': self.categorize(process_name, window_title),
+            'timestamp': datetime.now()
+        }
+
+    def _process_name(self, pid: int) -> Optional[str]:
+        """Nom du processus, lu une seule fois par PID."""
+        name = self._process_names.get(pid)
+        if name is None:
+            name = self.backend.process_name(pid)
+            if name is not None:
+                if len(self._process_names) >= PROCESS_NAME_CACHE_SIZE:
+                    self._process_names.clear()
+                self._process_names[pid] = name
+        return name